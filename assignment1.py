@@ -4,6 +4,10 @@ students = []
 grades = []
 categories = []
 
+#Lower bounds of each category above "Needs Improvement", used by the bulk analytics
+CATEGORY_THRESHOLDS = [70, 80, 90]
+CATEGORY_NAMES = ["Needs Improvement", "Average", "Good", "Excellent"]
+
 #Function to categorize the grades
 def category(grade):
     if 90 <= grade <= 100:
@@ -38,20 +42,15 @@ def add_student():
     grades.append(grade)
     categories.append(category(grade))
 
-num_students = int(input("How many students do you want to add? "))
-
-for i in range(num_students):
-    add_student()
-
-#Adding the table format using the .ljust() for alignment
-print('\nName        Grade       Category')
-print("----------------------------------")
-
-for i in range(len(students)):
-    print(f"{students[i].ljust(12)} {str(grades[i]).ljust(10)} {categories[i]}") # .ljust() for alignment
-
-
+if __name__ == "__main__":
+    num_students = int(input("How many students do you want to add? "))
 
+    for i in range(num_students):
+        add_student()
 
+    #Adding the table format using the .ljust() for alignment
+    print('\nName        Grade       Category')
+    print("----------------------------------")
 
-        
\ No newline at end of file
+    for i in range(len(students)):
+        print(f"{students[i].ljust(12)} {str(grades[i]).ljust(10)} {categories[i]}") # .ljust() for alignment
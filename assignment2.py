@@ -1,3 +1,7 @@
+from order_log import OrderLog, build_order
+from screen import screen
+from table_render import ProductTableCache, receipt_table
+
 LOGO = f"""{'=' * 60}
 ✲  Walmart | Save money. Live better.
 {'=' * 60}"""
@@ -120,39 +124,18 @@ products = {
     ]
 }
 
-def tabulate_products(products):
-    for category, product_list in products.items():
-        print(f"\n----------- {category.upper()} ----------")
-
-        # Determine the maximum width for each column
-        col_widths = {
-            "Index": 5,    # Fixed width for index
-            "Name": max(len(product["name"]) for product in product_list),
-            "Brand": max(len(product["brand"]) for product in product_list),
-            "Price": 8,    # Fixed width for price
-            "Quantity": 8  # Fixed width for quantity
-        }
-        
-        # Print the header row
-        header = " | ".join(key.ljust(col_widths[key]) for key in col_widths)
-        print(header)
-        print("-" * len(header))  # Separator line
-
-        # Print the product rows
-        for product in product_list:
-            row_data = {
-                "Index": str(product["index"]),
-                "Name": product["name"],
-                "Brand": product["brand"],
-                "Price": f"${product['price']:.2f}",
-                "Quantity": str(product["quantity"])
-            }
-            
-            row = " | ".join(row_data[key].ljust(col_widths[key]) for key in col_widths)
-            print(row)
-
-# Example usage:
-tabulate_products(products)
+product_tables = ProductTableCache()
+
+def tabulate_products(products, page=0, page_size=None, stream=None):
+    # All categories are built in one frame and written to stream (the terminal by default) at once
+    with screen.frame(clear=False, stream=stream) as out:
+        for category, product_list in products.items():
+            print(f"\n----------- {category.upper()} ----------", file=out)
+
+            # Column widths are cached per category and only grow when new products show up
+            table = product_tables.get(category, product_list)
+            table.render(product_list, out, page=page, page_size=page_size)
+
 
 # item_name = []
 # item_price = []
@@ -165,24 +148,30 @@ def calculate_tax(price):
     return round(price * tax_rate, 2)  # Rounds tax to 2 decimal places
 
 # # Function to handle shopping process
-def shopping():
+def shopping(ask=input, inventory=None, log=None, watcher=None, stream=None):
+    # ask supplies the answer to each prompt, so a scripted session can replace input()
+    # stream receives the product tables and the receipt; None means the terminal
+    if inventory is None:
+        inventory = products
     cart = {}
+    order = None
+    receipt = receipt_table()
     total_before_tax = 0
     while True:
-        category = input("Enter a category (groceries, appliances, clothes): ").strip().lower()
+        category = ask("Enter a category (groceries, appliances, clothes): ").strip().lower()
 
-        while category not in products:
+        while category not in inventory:
             print("Invalid category. Please choose from groceries, appliances, or clothes.")
-            category = input("Enter a category (groceries, appliances, clothes): ").strip().lower()
+            category = ask("Enter a category (groceries, appliances, clothes): ").strip().lower()
         
         print(f"\nHere are the {category} in our store: ")
-        tabulate_products({f"{category}":products[category]})
-        item = input("Enter the index of the item you want to buy or ('C'/'c') if you want to choose a different category: ")
-        while (item != 'C' and item != 'c') and (not item.isdigit() or int(item) >= len(products[category])):
+        tabulate_products({f"{category}":inventory[category]}, stream=stream)
+        item = ask("Enter the index of the item you want to buy or ('C'/'c') if you want to choose a different category: ")
+        while (item != 'C' and item != 'c') and (not item.isdigit() or int(item) >= len(inventory[category])):
             print("\nINVALID ITEM INDEX. PLEASE ENTER A VALID INDEX")
             print(f"\nHere are the {category} in our store: ")
-            tabulate_products({f"{category}":products[category]})
-            item = input("Enter the index of the item you want to buy or ('C'/'c') if you want to choose a different category: ")# C and c are same for category change
+            tabulate_products({f"{category}":inventory[category]}, stream=stream)
+            item = ask("Enter the index of the item you want to buy or ('C'/'c') if you want to choose a different category: ")# C and c are same for category change
 
         if item == 'C' or item == 'c':
             continue
@@ -190,10 +179,10 @@ def shopping():
 
 
         # check if the item is available
-        available_quantity = products[category][item]["quantity"]
+        available_quantity = inventory[category][item]["quantity"]
         if available_quantity <= 0:
             print("Item is out of stock.")
-            ask_continue = input("Do you want to choose a different item or category, or continue shopping? (item/category/continue): ").strip().lower()
+            ask_continue = ask("Do you want to choose a different item or category, or continue shopping? (item/category/continue): ").strip().lower()
             if ask_continue == "item":
                 continue
             elif ask_continue == "category":
@@ -204,26 +193,26 @@ def shopping():
                 print("Invalid input. Please enter 'item', 'category', or 'continue'.")
                 continue
 
-        print(f"Available quantity for {products[category][item]['name']}: {available_quantity}")
+        print(f"Available quantity for {inventory[category][item]['name']}: {available_quantity}")
 
 
-        quantity = input("Enter the quantity you want to buy: ")
+        quantity = ask("Enter the quantity you want to buy: ")
         while not quantity.isdigit() or int(quantity) <= 0:
             print("\nInvalid quantity. Please enter a positive number.")
-            quantity = input("Enter the quantity you want to buy: ")
+            quantity = ask("Enter the quantity you want to buy: ")
         quantity = int(quantity)
 
          # Check if the user enter more quantity than the available qauntity
         if quantity > available_quantity:
             print(f"Insufficient quantity in stock. Available quantity: {available_quantity}.")
-            ask_continue = input("Do you want to continue shopping or buy less? (continue(c)/buy less(l)): ").strip().lower()
+            ask_continue = ask("Do you want to continue shopping or buy less? (continue(c)/buy less(l)): ").strip().lower()
             if ask_continue == "continue" or ask_continue == "c":
                 continue
             elif ask_continue == "buy less" or ask_continue == "l":
-                quantity = input(f"Enter a quantity less than or equal to {available_quantity}: ")
+                quantity = ask(f"Enter a quantity less than or equal to {available_quantity}: ")
                 while not quantity.isdigit() or int(quantity) <= 0 or int(quantity) > available_quantity:
                     print(f"\nInvalid quantity. Please enter a positive number less than or equal to {available_quantity}.")
-                    quantity = input(f"Enter a quantity less than or equal to {available_quantity}: ")
+                    quantity = ask(f"Enter a quantity less than or equal to {available_quantity}: ")
                 quantity = int(quantity)
             else:
                 print("Invalid input. Please enter 'continue()' or 'buy less'.")
@@ -232,96 +221,113 @@ def shopping():
 
  
 
-        brand = products[category][item]["brand"]
-        item_name = products[category][item]["name"]
-        item_price = products[category][item]["price"]
+        brand = inventory[category][item]["brand"]
+        item_name = inventory[category][item]["name"]
+        item_price = inventory[category][item]["price"]
 
         # calculate tax
         tax = calculate_tax(item_price)
         total_price_with_tax = item_price + tax
         previous_total = item_price * quantity
 
-        if products[category][item]["quantity"] <= 0:
+        if inventory[category][item]["quantity"] <= 0:
             print("Item is out of stock.")
             return
-        elif quantity > products[category][item]["quantity"]:
+        elif quantity > inventory[category][item]["quantity"]:
             print("Insufficient quantity in stock.")
             return
         else:
             # Deduct item from stock
-            products[category][item]["quantity"] -= quantity
+            if watcher is None:
+                inventory[category][item]["quantity"] -= quantity
+            elif not watcher.sell((category, item), quantity):
+                # A concurrent sale got there first; the watcher's lock makes the check exact
+                print("Insufficient quantity in stock.")
+                return
             # total quantity with tax
             total_price_with_tax = total_price_with_tax * quantity
             total_before_tax += previous_total
-            # Add item to cart with category
-            cart[item_name] = {
-                "price": total_price_with_tax,
-                "brand": brand,
-                "quantity": quantity,
-                "category": category  # Add category to track items
-            }
+            # Add item to cart with category; buying the same item again adds to its line
+            entry = cart.get(item_name)
+            if entry is None:
+                entry = cart[item_name] = {
+                    "name": item_name,
+                    "price": 0,
+                    "subtotal": 0,
+                    "brand": brand,
+                    "quantity": 0,
+                    "category": category  # Add category to track items
+                }
+            else:
+                receipt.remove_row(entry)
+            entry["price"] += total_price_with_tax
+            entry["subtotal"] += previous_total
+            entry["quantity"] += quantity
+            # Receipt column widths are kept up to date as the cart changes
+            receipt.add_row(entry)
             print(f"\n{quantity} {item_name}(s) added to cart.")
             current_total = sum(item['price'] for item in cart.values())
             print(f"Current total: ${current_total:.2f}")
 
-        ask_continue = input("Do you want to continue shopping? (yes/no): ").strip().lower()
+        ask_continue = ask("Do you want to continue shopping? (yes/no): ").strip().lower()
         if ask_continue == "no":
             break
         elif ask_continue != "yes":
             print("Invalid input. Please enter 'yes' or 'no'.")
             continue
 
-    # Print receipt
-    print("\n" + "="*60)
-    print("\u2732  Walmart Receipt")
-    print("="*60)
+    # Print receipt; the whole receipt reaches the stream in one write
+    with screen.frame(clear=False, stream=stream) as out:
+        print("\n" + "="*60, file=out)
+        print("\u2732  Walmart Receipt", file=out)
+        print("="*60, file=out)
 
-    if not cart:
-        print("No items purchased.")
-    else:
-        # Group items by category
-        categorized_items = {"groceries": [], "appliances": [], "clothes": []}
-        
-        # Determine maximum widths for each column
-        name_width = max(len(item) for item in cart.keys())
-        brand_width = max(len(item['brand']) for item in cart.values())
-        
-        for item_name, details in cart.items():
-            categorized_items[details['category']].append((item_name, details))
-
-        # Print items by category
-        for category in categorized_items:
-            if categorized_items[category]:  # Only print categories that have items
-                print(f"\n----------- {category.upper()} -----------")
-                
-                # Print header
-                header = (
-                    f"{'Item'.ljust(name_width)} | "
-                    f"{'Brand'.ljust(brand_width)} | "
-                    f"{'Quantity'.ljust(8)} | "
-                    f"{'Price'.ljust(10)}"
-                )
-                print(header)
-                print("-" * len(header))
-
-                # Print items in this category
-                for item_name, details in categorized_items[category]:
-                    row = (
-                        f"{item_name.ljust(name_width)} | "
-                        f"{details['brand'].ljust(brand_width)} | "
-                        f"{str(details['quantity']).ljust(8)} | "
-                        f"${details['price']:.2f}".ljust(10)
-                    )
-                    print(row)
-
-        # Print totals
-        print("\n" + "="*60)
-        print(f"Total price before tax: ${total_before_tax:.2f}")
-        print(f"Total price after tax: ${current_total:.2f}")
-        print(f"Tax amount: ${(current_total - total_before_tax):.2f}")
-        print(f"Number of items purchased: {len(cart)}")
-        print("="*60)
-        print("Thank you for shopping with Walmart!")
-        print("="*60)
-        
-shopping()
+        if not cart:
+            print("No items purchased.", file=out)
+        else:
+            # Group items by category
+            categorized_items = {"groceries": [], "appliances": [], "clothes": []}
+
+            for item_name, details in cart.items():
+                categorized_items[details['category']].append(details)
+
+            # Print items by category
+            for category in categorized_items:
+                if categorized_items[category]:  # Only print categories that have items
+                    print(f"\n----------- {category.upper()} -----------", file=out)
+                    receipt.render(categorized_items[category], out)
+
+            # Print totals
+            print("\n" + "="*60, file=out)
+            print(f"Total price before tax: ${total_before_tax:.2f}", file=out)
+            print(f"Total price after tax: ${current_total:.2f}", file=out)
+            print(f"Tax amount: ${(current_total - total_before_tax):.2f}", file=out)
+            print(f"Number of items purchased: {len(cart)}", file=out)
+            print("="*60, file=out)
+            print("Thank you for shopping with Walmart!", file=out)
+            print("="*60, file=out)
+    if cart:
+        # Record the order for reconciliation; the write happens on the logger thread
+        order = build_order(cart, total_before_tax, current_total)
+        if log is not None:
+            log.record(order)
+    return order
+
+
+def run_session(actions, inventory=None, log=None, watcher=None, stream=None):
+    """Run shopping() non-interactively, answering each prompt from a scripted list"""
+    script = iter(actions)
+
+    def ask(prompt=""):
+        try:
+            return next(script)
+        except StopIteration:
+            raise RuntimeError(f"Session script ran out of answers at prompt: {prompt!r}")
+
+    return shopping(ask, inventory, log, watcher, stream)
+
+
+if __name__ == "__main__":
+    tabulate_products(products)
+    order_log = OrderLog("orders.jsonl")
+    shopping(log=order_log)
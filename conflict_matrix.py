@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from course_times import Section
+
+# One slot per minute: coarser slots would have to round meeting edges, and rounding either way
+# gets back-to-back or barely overlapping meetings wrong
+SLOTS_PER_DAY = 24 * 60
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+
+def slot_row(section: Section) -> np.ndarray:
+    """Week of one-minute slots, True wherever the section meets"""
+    row = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    for meeting in section.meetings:
+        # Same half-open [start, end) interval as Meeting.overlaps
+        for day in meeting.days:
+            row[day * SLOTS_PER_DAY + meeting.start:day * SLOTS_PER_DAY + meeting.end] = True
+    return row
+
+
+def to_ints(bits: np.ndarray) -> List[int]:
+    """Each row of a boolean matrix as a Python int bitset, bit i = column i"""
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+class ConflictMatrix:
+    """Precomputed section-by-section conflicts, stored as one bitset per section"""
+    def __init__(self, sections: Iterable[Section], same_course_conflicts: bool = True,
+                 block_size: int = 2048):
+        self.sections: List[Section] = list(sections)
+        self.index: Dict[str, int] = {section.key: i for i, section in enumerate(self.sections)}
+        count = len(self.sections)
+
+        # Many sections share a meeting pattern, so slots and conflicts are computed per pattern
+        pattern_index: Dict[tuple, int] = {}
+        pattern_of = np.empty(count, dtype=np.int64)
+        representatives: List[Section] = []
+        for i, section in enumerate(self.sections):
+            pattern = tuple(sorted((m.days, m.start, m.end) for m in section.meetings))
+            if pattern not in pattern_index:
+                pattern_index[pattern] = len(representatives)
+                representatives.append(section)
+            pattern_of[i] = pattern_index[pattern]
+
+        patterns = np.zeros((len(representatives), SLOTS_PER_WEEK), dtype=bool)
+        for i, section in enumerate(representatives):
+            patterns[i] = slot_row(section)
+        pattern_masks = to_ints(patterns)
+        self.slot_masks = [pattern_masks[p] for p in pattern_of]
+
+        # Slots nobody uses add nothing to the product
+        weights = patterns[:, patterns.any(axis=0)].astype(np.float32)
+        pattern_conflicts = np.zeros((len(patterns), len(patterns)), dtype=bool)
+        for start in range(0, len(patterns), block_size):
+            block = weights[start:start + block_size]
+            pattern_conflicts[start:start + block_size] = block @ weights.T > 0
+
+        # Expand pattern conflicts to section bitsets once per pattern, not once per section
+        pattern_rows: List[int] = []
+        for start in range(0, len(patterns), block_size):
+            pattern_rows.extend(to_ints(pattern_conflicts[start:start + block_size][:, pattern_of]))
+
+        course_masks: Dict[str, int] = {}
+        if same_course_conflicts:
+            for i, section in enumerate(self.sections):
+                course_masks[section.course_id] = course_masks.get(section.course_id, 0) | 1 << i
+        self.rows: List[int] = [pattern_rows[p] | course_masks.get(section.course_id, 0)
+                                for p, section in zip(pattern_of, self.sections)]
+
+    @classmethod
+    def from_courses(cls, courses: dict, **kwargs) -> "ConflictMatrix":
+        """Treat each EnrollmentSystem course as a single section keyed by its course ID"""
+        matrix = cls((Section.from_time(course_id, "01", course.time)
+                      for course_id, course in courses.items()), **kwargs)
+        matrix.index.update({section.course_id: i for i, section in enumerate(matrix.sections)})
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def schedule_mask(self, section_keys: Iterable[str]) -> int:
+        """Bitset of sections, used as the student's current schedule"""
+        mask = 0
+        for key in section_keys:
+            mask |= 1 << self.index[key]
+        return mask
+
+    def occupied_slots(self, section_keys: Iterable[str]) -> int:
+        mask = 0
+        for key in section_keys:
+            mask |= self.slot_masks[self.index[key]]
+        return mask
+
+    def conflicts(self, schedule_mask: int, candidate: str) -> bool:
+        """Does the candidate clash with anything in the schedule: a single AND"""
+        return bool(self.rows[self.index[candidate]] & schedule_mask)
+
+    def slot_conflicts(self, occupied: int, candidate: str) -> bool:
+        # Same check against the student's occupied time slots instead of section bits
+        return bool(self.slot_masks[self.index[candidate]] & occupied)
+
+    def conflicting_sections(self, schedule_mask: int, candidate: str) -> List[Section]:
+        overlap = self.rows[self.index[candidate]] & schedule_mask
+        result = []
+        while overlap:
+            low = overlap & -overlap
+            result.append(self.sections[low.bit_length() - 1])
+            overlap ^= low
+        return result
+
+    def open_sections(self, schedule_mask: int) -> List[Section]:
+        return [section for section, row in zip(self.sections, self.rows) if not row & schedule_mask]
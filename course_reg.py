@@ -1,9 +1,18 @@
 import csv
 import hashlib
 import os
-from typing import Set
+from typing import Iterable, Optional, Set
 from datetime import datetime
 
+from course_times import meetings_conflict, parse_meetings
+from enrollment_graph import COURSE, STUDENT, EnrollmentGraph, LinkSet
+from instrumentation import timed
+from persistence import CsvStore
+from screen import screen
+from sessions import SessionManager
+from snapshot import load_enrollment_snapshot, save_enrollment_snapshot, snapshot_is_current
+
+@timed("course_reg.hash_password")
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -12,49 +21,86 @@ def verify_password(stored_hash: str, provided_password: str) -> bool:
     """Verify a password against its hash"""
     return stored_hash == hash_password(provided_password)
 
-def parse_time_range(time_range: str):
-        parts = time_range.split('-')
-        if len(parts) != 2:
-            return None, None
-        start_str = parts[0].strip()  
-        end_str = parts[1].strip()    
-        try:
-            start_time = datetime.strptime(start_str, "%I:%M %p")
-            end_time = datetime.strptime(end_str, "%I:%M %p")
-            return start_time, end_time
-        except ValueError:
-            return None, None
-        
 class Student:
-    def __init__(self, student_id: str, name: str, password: str):
-        self.student_id = student_id
+    # A view over the student's row in the enrollment graph; the ID string is the interned one
+    __slots__ = ("graph", "index", "name", "password")
+
+    def __init__(self, student_id: str, name: str, password: str, graph: Optional[EnrollmentGraph] = None):
+        self.graph = graph if graph is not None else EnrollmentGraph()
+        self.index = self.graph.intern(STUDENT, student_id)
         self.name = name
         self.password = password
-        self.registered_courses: Set[str] = set()
+
+    @property
+    def student_id(self) -> str:
+        return self.graph.name(STUDENT, self.index)
+
+    @property
+    def registered_courses(self) -> Set[str]:
+        return LinkSet(self.graph, STUDENT, self.index)
+
+    @registered_courses.setter
+    def registered_courses(self, course_ids: Iterable[str]):
+        self.graph.set_links(STUDENT, self.index, course_ids)
 
     def __repr__(self) -> str:
         return f"Student(ID: {self.student_id}, Name: {self.name}, Password: {self.password})"
 
 class Course:
-    def __init__(self, course_id: str, name: str, instructor: str, max_students: int = 30, time: str = ""):
-        self.course_id = course_id
+    __slots__ = ("graph", "index", "name", "instructor", "max_students", "time")
+
+    def __init__(self, course_id: str, name: str, instructor: str, max_students: int = 30, time: str = "",
+                 graph: Optional[EnrollmentGraph] = None):
+        self.graph = graph if graph is not None else EnrollmentGraph()
+        self.index = self.graph.intern(COURSE, course_id)
         self.name = name
         self.instructor = instructor
         self.max_students = max_students
         self.time = time
-        self.enrolled_students: Set[str] = set()
+
+    @property
+    def course_id(self) -> str:
+        return self.graph.name(COURSE, self.index)
+
+    @property
+    def enrolled_students(self) -> Set[str]:
+        return LinkSet(self.graph, COURSE, self.index)
+
+    @enrolled_students.setter
+    def enrolled_students(self, student_ids: Iterable[str]):
+        self.graph.set_links(COURSE, self.index, student_ids)
 
     def __str__(self) -> str:
         return f"Course(ID: {self.course_id}, Name: {self.name}, Instructor: {self.instructor}, Time: {self.time})"
 
 class EnrollmentSystem:
-    def __init__(self):
+    def __init__(self, store: Optional[CsvStore] = None, snapshot: Optional[str] = None,
+                 sessions: Optional[SessionManager] = None, directory: str = ".", output=None):
+        # Every CSV lives in directory
+        self.directory = directory
+        # Stream for result and error messages; None means sys.stdout
+        self.output = output
+        # Writes are coalesced and flushed atomically by the store's background thread
+        self.store = store or CsvStore()
+        self.sessions = sessions or SessionManager()
+        # Both directions of enrollment live here; Student and Course objects are views into it
+        self.graph = EnrollmentGraph()
         self.students = {}
         self.courses = {}
-        self.load_data()
+        # Bumped on every enroll/drop so cached schedules know when seats may have changed
+        self.version = 0
+        # A snapshot older than the CSVs would lose every change saved since it was taken
+        if snapshot and snapshot_is_current(snapshot, (self.path('students.csv'), self.path('courses.csv'))):
+            # Records are decoded from the memory-mapped file on first access
+            self.students, self.courses = load_enrollment_snapshot(snapshot, self.graph)
+        else:
+            self.load_data()
         if not self.courses:
             self.initialize_courses()
 
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
     def initialize_courses(self):
         courses = [
             ("CS101", "Introduction to Programming", "Dr. Smith", 30, "10:00 AM - 11:30 AM"),
@@ -68,85 +114,94 @@ class EnrollmentSystem:
             ("CS109", "Machine Learning", "Dr. Taylor", 30, "3:00 PM - 4:30 PM")
         ]
         for course_id, name, instructor, max_students, time in courses:
-            self.courses[course_id] = Course(course_id, name, instructor, max_students, time)
+            self.courses[course_id] = Course(course_id, name, instructor, max_students, time, self.graph)
     
+    @timed("enrollment.get_time_conflict")
     def get_time_conflict(self, student_id: str, new_course_id: str):
         student = self.students[student_id]
         new_course = self.courses[new_course_id]
         
         # If the new course has no time set, assume no conflict.
-        if not new_course.time:
+        new_meetings = parse_meetings(new_course.time)
+        if not new_meetings:
             return None
 
-        new_start, new_end = parse_time_range(new_course.time)
-        if not new_start or not new_end:
-            return None
-
-        # Check each already registered course for overlap
+        # Check each already registered course for overlapping meeting blocks
         for course_id in student.registered_courses:
             enrolled_course = self.courses[course_id]
-            if not enrolled_course.time:
-                continue
-            exist_start, exist_end = parse_time_range(enrolled_course.time)
-            if not exist_start or not exist_end:
-                continue
-            # Check for overlapping intervals:
-            if new_start < exist_end and new_end > exist_start:
+            if meetings_conflict(new_meetings, parse_meetings(enrolled_course.time)):
                 return enrolled_course  # Return the conflicting course
         return None
     
+    @timed("enrollment.register_student")
     def register_student(self, student_id: str, name: str, password: str) -> bool:
         if student_id in self.students:
-            print("Error: Student ID already exists")
+            print("Error: Student ID already exists", file=self.output)
             return False
         hashed_password = hash_password(password)
-        self.students[student_id] = Student(student_id, name, hashed_password)
+        self.students[student_id] = Student(student_id, name, hashed_password, self.graph)
         self.save_students()
-        print(f"Successfully registered student: {name}")
+        print(f"Successfully registered student: {name}", file=self.output)
         return True
 
-    def view_available_courses(self):
-        print("\nAvailable Courses:")
-        print("-" * 60)
+    @timed("enrollment.login")
+    def login(self, student_id: str, password: str) -> Optional[str]:
+        """Session token for the student, or None if the ID or password is wrong"""
+        if student_id in self.students and verify_password(self.students[student_id].password, password):
+            return self.sessions.create(student_id)
+        return None
+
+    def logout(self, token: str) -> bool:
+        return self.sessions.end(token)
+
+    def current_student(self, token: Optional[str]) -> Optional[str]:
+        return self.sessions.get(token)
+
+    def view_available_courses(self, file=None):
+        file = self.output if file is None else file
+        print("\nAvailable Courses:", file=file)
+        print("-" * 60, file=file)
         for course in self.courses.values():
             available_slots = course.max_students - len(course.enrolled_students)
-            print(f"Course ID: {course.course_id}")
-            print(f"Name: {course.name}")
-            print(f"Instructor: {course.instructor}")
-            print(f"Time: {course.time}")
-            print(f"Available slots: {available_slots}")
-            print("-" * 60)
-
+            print(f"Course ID: {course.course_id}", file=file)
+            print(f"Name: {course.name}", file=file)
+            print(f"Instructor: {course.instructor}", file=file)
+            print(f"Time: {course.time}", file=file)
+            print(f"Available slots: {available_slots}", file=file)
+            print("-" * 60, file=file)
+
+    @timed("enrollment.enroll_student")
     def enroll_student(self, student_id: str, course_id: str) -> bool:
         if student_id not in self.students:
-            print("Error: Student not found")
+            print("Error: Student not found", file=self.output)
             return False
 
         if course_id not in self.courses:
-            print("Error: Course not found")
+            print("Error: Course not found", file=self.output)
             return False
 
         student = self.students[student_id]
         course = self.courses[course_id]
 
         if course_id in student.registered_courses:
-            print("Error: Student already enrolled in this course")
+            print("Error: Student already enrolled in this course", file=self.output)
             return False
 
         if len(course.enrolled_students) >= course.max_students:
-            print("Error: Course is full")
+            print("Error: Course is full", file=self.output)
             return False
         
         # Check for a time conflict using the new method.
         conflict_course = self.get_time_conflict(student_id, course_id)
         if conflict_course:
-            print(f"Error: Time conflict with your registered course '{conflict_course.course_id}'.")
-            print(f"'{conflict_course.course_id}' is currently held at {conflict_course.time}.")
+            print(f"Error: Time conflict with your registered course '{conflict_course.course_id}'.", file=self.output)
+            print(f"'{conflict_course.course_id}' is currently held at {conflict_course.time}.", file=self.output)
             return False
 
+        # Adds both directions of the link
         student.registered_courses.add(course_id)
-        course.enrolled_students.add(student_id)
-        print(f"Successfully enrolled {student.name} in {course.name}")
+        self.version += 1
+        print(f"Successfully enrolled {student.name} in {course.name}", file=self.output)
         self.save_enrollment(student_id, course_id)
         self.save_students()
         self.save_courses()
@@ -154,21 +209,22 @@ class EnrollmentSystem:
         return True
 
 
+    @timed("enrollment.drop_course")
     def drop_course(self, student_id: str, course_id: str) -> bool:
         if student_id not in self.students or course_id not in self.courses:
-            print("Error: Invalid student ID or course ID")
+            print("Error: Invalid student ID or course ID", file=self.output)
             return False
 
         student = self.students[student_id]
         course = self.courses[course_id]
 
         if course_id not in student.registered_courses:
-            print("Error: Student is not enrolled in this course")
+            print("Error: Student is not enrolled in this course", file=self.output)
             return False
 
         student.registered_courses.remove(course_id)
-        course.enrolled_students.remove(student_id)
-        print(f"Successfully dropped {course.name} for {student.name}")
+        self.version += 1
+        print(f"Successfully dropped {course.name} for {student.name}", file=self.output)
 
         self.save_students()
         self.save_courses()
@@ -176,147 +232,153 @@ class EnrollmentSystem:
         self.log_enrollment_action(student_id, course_id, "DROP")  # Log DROP
         return True
 
-    def view_student_schedule(self, student_id: str):
+    def view_student_schedule(self, student_id: str, file=None):
+        file = self.output if file is None else file
         if student_id not in self.students:
-            print("Error: Student not found")
+            print("Error: Student not found", file=file)
             return
 
         student = self.students[student_id]
-        print(f"\nSchedule for {student.name}:")
-        print("-" * 60)
+        print(f"\nSchedule for {student.name}:", file=file)
+        print("-" * 60, file=file)
         for course_id in student.registered_courses:
             course = self.courses[course_id]
-            print(f"Course: {course.name} (ID: {course.course_id})")
-            print(f"Instructor: {course.instructor}")
-            print(f"Time: {course.time}")
-            print("-" * 60)
+            print(f"Course: {course.name} (ID: {course.course_id})", file=file)
+            print(f"Instructor: {course.instructor}", file=file)
+            print(f"Time: {course.time}", file=file)
+            print("-" * 60, file=file)
     
-    def view_enrollment_history(self):
-        if not os.path.exists('enrollment_history.csv'):
-            print("No enrollment history found.")
+    def view_enrollment_history(self, file=None):
+        file = self.output if file is None else file
+        # Pending history rows must be on disk before reading the file back
+        self.store.flush()
+        if not os.path.exists(self.path('enrollment_history.csv')):
+            print("No enrollment history found.", file=file)
             return
 
-        print("\nEnrollment History:")
-        print("-" * 60)
-        with open('enrollment_history.csv', 'r') as file:
-            reader = csv.reader(file)
+        print("\nEnrollment History:", file=file)
+        print("-" * 60, file=file)
+        with open(self.path('enrollment_history.csv'), 'r') as history:
+            reader = csv.reader(history)
             for row in reader:
                 student_id, course_id, action, timestamp = row
-                print(f"Student ID: {student_id} | Course ID: {course_id} | Action: {action} | Time: {timestamp}")
-        print("-" * 60)
+                print(f"Student ID: {student_id} | Course ID: {course_id} | Action: {action} | Time: {timestamp}", file=file)
+        print("-" * 60, file=file)
 
+    @timed("enrollment.save_courses")
     def save_courses(self):
-        with open('courses.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            for course in self.courses.values():
-                writer.writerow([course.course_id, course.name, course.instructor, 
-                                course.max_students, course.time, ','.join(course.enrolled_students)])
+        self.store.replace(self.path('courses.csv'), lambda: ([course.course_id, course.name, course.instructor,
+                                                    course.max_students, course.time, ','.join(course.enrolled_students)]
+                                                   for course in self.courses.values()))
 
+    @timed("enrollment.save_enrollment")
     def save_enrollment(self, student_id: str, course_id: str):
-        with open('enrollments.csv', 'a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([student_id, course_id, datetime.now()])
+        self.store.append(self.path('enrollments.csv'), [student_id, course_id, datetime.now()])
     
+    @timed("enrollment.save_students")
     def save_students(self):
-        with open('students.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            for student in self.students.values():
-                writer.writerow([student.student_id, student.name, student.password, ','.join(student.registered_courses)])
+        self.store.replace(self.path('students.csv'), lambda: ([student.student_id, student.name, student.password, ','.join(student.registered_courses)]
+                                                    for student in self.students.values()))
       
+    @timed("enrollment.update_enrollments")
     def update_enrollments(self):
-        enrollments = []
-        for student in self.students.values():
-            for course_id in student.registered_courses:
-                enrollments.append([student.student_id, course_id, datetime.now()])
-
-        with open('enrollments.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            for enrollment in enrollments:
-                writer.writerow(enrollment)
+        self.store.replace(self.path('enrollments.csv'), lambda: ([student.student_id, course_id, datetime.now()]
+                                                                  for student in self.students.values()
+                                                                  for course_id in student.registered_courses))
     
+    @timed("enrollment.log_enrollment_action")
     def log_enrollment_action(self, student_id: str, course_id: str, action: str):
-        with open('enrollment_history.csv', 'a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([student_id, course_id, action, datetime.now()])
+        self.store.append(self.path('enrollment_history.csv'), [student_id, course_id, action, datetime.now()])
+
+    def save_snapshot(self, path: str = 'enrollment.snap'):
+        # Pending CSV writes land first, so the snapshot is the newest file
+        self.store.flush()
+        save_enrollment_snapshot(self, path)
 
+    @timed("enrollment.load_data")
     def load_data(self):
-        if os.path.exists('students.csv'):
-            with open('students.csv', 'r') as file:
+        if os.path.exists(self.path('students.csv')):
+            with open(self.path('students.csv'), 'r') as file:
                 reader = csv.reader(file)
                 for row in reader:
                     student_id, name, password, registered_courses = row
                     # Store the password as-is, it's already hashed
-                    student = Student(student_id, name, password)
+                    student = Student(student_id, name, password, self.graph)
                     if registered_courses:
-                        student.registered_courses = set(registered_courses.split(','))
+                        for course_id in registered_courses.split(','):
+                            self.graph.link(student.index, self.graph.intern(COURSE, course_id))
                     self.students[student_id] = student
 
-        if os.path.exists('courses.csv'):
-            with open('courses.csv', 'r') as file:
+        if os.path.exists(self.path('courses.csv')):
+            with open(self.path('courses.csv'), 'r') as file:
                 reader = csv.reader(file)
                 for row in reader:
                     if len(row) >= 6:  # Make sure we have at least 6 columns (including time)
                         course_id, name, instructor, max_students, time, enrolled_students = row
-                        course = Course(course_id, name, instructor, int(max_students), time)
-                        if enrolled_students:
-                            course.enrolled_students = set(enrolled_students.split(','))
+                        course = Course(course_id, name, instructor, int(max_students), time, self.graph)
                     else:  # Backward compatibility for files without time
                         course_id, name, instructor, max_students, enrolled_students = row
-                        course = Course(course_id, name, instructor, int(max_students))
-                        if enrolled_students:
-                            course.enrolled_students = set(enrolled_students.split(','))
+                        course = Course(course_id, name, instructor, int(max_students), graph=self.graph)
+                    # Links written from the students file already exist; this only adds missing ones
+                    if enrolled_students:
+                        for student_id in enrolled_students.split(','):
+                            self.graph.link(self.graph.intern(STUDENT, student_id), course.index)
                     self.courses[course_id] = course
 
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
-
 def pause():
     input("\nPress Enter to continue...")
 
-def print_title(title):
-    print("\n" + "=" * 60)
-    print(title.center(60))
-    print("=" * 60)
+def print_title(title, file=None):
+    print("\n" + "=" * 60, file=file)
+    print(title.center(60), file=file)
+    print("=" * 60, file=file)
 
-def show_banner():
-    print("\n" + "=" * 60)
+def show_banner(file=None):
+    print("\n" + "=" * 60, file=file)
     school = "GRAMBLING STATE UNIVERSITY"
-    print(school.center(60))
-    print_title("🏛️ University Course Registration System 🏛️")
+    print(school.center(60), file=file)
+    print_title("🏛️ University Course Registration System 🏛️", file)
 
 def main():
     system = EnrollmentSystem()
-    cur_student = None
+    token = None
 
     while True:
-        clear_screen()
-
-        if cur_student:
-            print_title("🏛️ University Course Registration System 🏛️")
-            print("Logged in as:", system.students[cur_student].name)
-            print("\n[ Main Menu ]")
-            print("1. 📚 View Available Courses")
-            print("2. 📝 Enroll in a Course")
-            print("3. ❌ Drop a Course")
-            print("4. 📅 View My Schedule")
-            print("5. 📜 View Enrollment History")
-            print("6. 🔓 Log Out")
-            print("7. 🚪 Exit")
-        else:
-            show_banner()
-            print("Please select an option:")
-            print("-" * 60)
-            print("1. 🆕 Register New Student")
-            print("2. 🔐 Log In")
-            print("3. 🚪 Exit")
+        cur_student = system.current_student(token)
+        if token and not cur_student:
+            token = None
+            print("⌛ Your session expired. Please log in again.")
+            pause()
+        # Every screen is built in memory and reaches the terminal in a single write
+        with screen.frame() as out:
+            if cur_student:
+                print_title("🏛️ University Course Registration System 🏛️", out)
+                print("Logged in as:", system.students[cur_student].name, file=out)
+                print("\n[ Main Menu ]", file=out)
+                print("1. 📚 View Available Courses", file=out)
+                print("2. 📝 Enroll in a Course", file=out)
+                print("3. ❌ Drop a Course", file=out)
+                print("4. 📅 View My Schedule", file=out)
+                print("5. 📜 View Enrollment History", file=out)
+                print("6. 🔓 Log Out", file=out)
+                print("7. 🚪 Exit", file=out)
+            else:
+                show_banner(out)
+                print("Please select an option:", file=out)
+                print("-" * 60, file=out)
+                print("1. 🆕 Register New Student", file=out)
+                print("2. 🔐 Log In", file=out)
+                print("3. 🚪 Exit", file=out)
 
         choice = input("\nEnter your choice: ").strip()
+        # The session may have expired while the menu sat waiting for input
+        if token and system.current_student(token) is None:
+            continue
 
         if not cur_student:
-            show_banner()
             if choice == '1':
-                clear_screen()
-                print_title("🆕 Register New Student")
+                with screen.frame() as out:
+                    print_title("🆕 Register New Student", out)
                 student_id = input("Enter student ID: ").strip()
                 name = input("Enter student name: ").strip()
                 password = input("Enter your password: ").strip()
@@ -327,34 +389,40 @@ def main():
                 pause()
 
             elif choice == '2':
-                clear_screen()
-                print_title("🔐 Student Log In")
+                with screen.frame() as out:
+                    print_title("🔐 Student Log In", out)
                 student_id = input("Enter student ID: ").strip()
                 password = input("Enter password: ").strip()
-                if student_id in system.students and verify_password(system.students[student_id].password, password):
-                    cur_student = student_id
+                token = system.login(student_id, password)
+                if token:
                     print("✅ Login successful!")
                 else:
                     print("❌ Invalid ID or password.")
                 pause()        
 
             elif choice == '3':
-                print("\nThank you for using the Course Registration System!")
+                with screen.frame(clear=False) as out:
+                    show_banner(out)
+                    print("\nThank you for using the Course Registration System!", file=out)
                 break
             else:
-                print("❌ Invalid choice. Please try again.")
+                with screen.frame(clear=False) as out:
+                    show_banner(out)
+                    print("❌ Invalid choice. Please try again.", file=out)
                 pause()
 
         else:
             if choice == '1':
-                clear_screen()
-                system.view_available_courses()
+                with screen.frame() as out:
+                    system.view_available_courses(out)
                 pause()
 
             elif choice == '2':
-                clear_screen()
-                system.view_available_courses()
+                with screen.frame() as out:
+                    system.view_available_courses(out)
                 course_id = input("\nEnter Course ID to enroll (or 'E' to exit): ").strip()
+                if system.current_student(token) is None:
+                    continue
                 if course_id.upper() != 'E':
                     if system.enroll_student(cur_student, course_id):
                         print("✅ Enrollment successful!")
@@ -363,10 +431,11 @@ def main():
                 pause()
 
             elif choice == '3':
-                clear_screen()
-                clear_screen()
-                system.view_student_schedule(cur_student)
+                with screen.frame() as out:
+                    system.view_student_schedule(cur_student, out)
                 course_id = input("\nEnter Course ID to drop (or 'E' to exit): ").strip()
+                if system.current_student(token) is None:
+                    continue
                 if course_id.upper() != 'E':
                     if system.drop_course(cur_student, course_id):
                         print("✅ Course dropped successfully!")
@@ -375,17 +444,18 @@ def main():
                 pause()
 
             elif choice == '4':
-                clear_screen()
-                system.view_student_schedule(student_id)
+                with screen.frame() as out:
+                    system.view_student_schedule(cur_student, out)
                 pause()
 
             elif choice == '5':
-                clear_screen()
-                system.view_enrollment_history()
+                with screen.frame() as out:
+                    system.view_enrollment_history(out)
                 pause()
 
             elif choice == '6':
-                cur_student = None
+                system.logout(token)
+                token = None
                 print("🔓 Logged out successfully.")
                 pause()
 
@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# Days are numbered from Monday; two-letter codes are matched before single letters
+DAY_CODES = [("Tu", 1), ("Th", 3), ("Sa", 5), ("Su", 6), ("M", 0), ("T", 1), ("W", 2),
+             ("R", 3), ("F", 4), ("S", 5), ("U", 6)]
+DAY_NAMES = ["M", "T", "W", "Th", "F", "Sa", "Su"]
+# A time with no meeting pattern (the old "10:00 AM - 11:30 AM" form) meets every weekday
+WEEKDAYS = (0, 1, 2, 3, 4)
+
+
+class Meeting:
+    """One weekly meeting block: a set of days and a start/end in minutes after midnight"""
+    __slots__ = ("days", "start", "end")
+
+    def __init__(self, days: Tuple[int, ...], start: int, end: int):
+        self.days = days
+        self.start = start
+        self.end = end
+
+    def overlaps(self, other: "Meeting") -> bool:
+        return (self.start < other.end and self.end > other.start
+                and not set(self.days).isdisjoint(other.days))
+
+    def __repr__(self) -> str:
+        days = "".join(DAY_NAMES[day] for day in self.days)
+        return f"Meeting({days} {format_minutes(self.start)} - {format_minutes(self.end)})"
+
+
+def parse_clock(text: str) -> Optional[int]:
+    try:
+        clock = datetime.strptime(text.strip(), "%I:%M %p")
+    except ValueError:
+        return None
+    return clock.hour * 60 + clock.minute
+
+
+def format_minutes(minutes: int) -> str:
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def parse_days(text: str) -> Optional[Tuple[int, ...]]:
+    days = set()
+    position = 0
+    while position < len(text):
+        for code, day in DAY_CODES:
+            if text.startswith(code, position):
+                days.add(day)
+                position += len(code)
+                break
+        else:
+            return None
+    return tuple(sorted(days))
+
+
+def parse_block(block: str) -> Meeting:
+    """Parse "MWF 10:00 AM - 10:50 AM" or the day-less "10:00 AM - 11:30 AM" """
+    text = block.strip()
+    days = WEEKDAYS
+    first, _, rest = text.partition(" ")
+    if first and not first[0].isdigit():
+        days = parse_days(first)
+        text = rest
+    parts = text.split('-')
+    if days is None or len(parts) != 2:
+        raise ValueError(f"Unrecognized meeting time {block.strip()!r}")
+    start, end = parse_clock(parts[0]), parse_clock(parts[1])
+    if start is None or end is None:
+        raise ValueError(f"Unrecognized meeting time {block.strip()!r}")
+    return Meeting(days, start, end)
+
+
+def parse_meetings(time: str) -> List[Meeting]:
+    """All meeting blocks of a Course.time string, separated by ';'
+
+    A time that is empty, "TBA" or has any block parse_block cannot read has no known meetings,
+    so it conflicts with nothing; parse_block itself raises for callers that want to validate.
+    """
+    if not time or time.strip().upper() == "TBA":
+        return []
+    try:
+        return [parse_block(block) for block in time.split(';') if block.strip()]
+    except ValueError:
+        return []
+
+
+def meetings_conflict(first: List[Meeting], second: List[Meeting]) -> Optional[Tuple[Meeting, Meeting]]:
+    for meeting in first:
+        for other in second:
+            if meeting.overlaps(other):
+                return meeting, other
+    return None
+
+
+class Section:
+    """A schedulable section of a course with its own meeting blocks"""
+    __slots__ = ("course_id", "section_id", "meetings")
+
+    def __init__(self, course_id: str, section_id: str, meetings: List[Meeting]):
+        self.course_id = course_id
+        self.section_id = section_id
+        self.meetings = meetings
+
+    @property
+    def key(self) -> str:
+        return f"{self.course_id}-{self.section_id}"
+
+    @classmethod
+    def from_time(cls, course_id: str, section_id: str, time: str) -> "Section":
+        return cls(course_id, section_id, parse_meetings(time))
+
+    def __repr__(self) -> str:
+        return f"Section(ID: {self.key}, Meetings: {self.meetings})"
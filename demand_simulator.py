@@ -0,0 +1,228 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from course_reg import Course, EnrollmentSystem
+from course_times import format_minutes
+from persistence import CsvStore, NullStore
+
+REASONS = ("full", "time conflict", "duplicate")
+
+
+class NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class DemandConfig:
+    """Synthetic opening-day demand; every trial redraws students but shares the catalog"""
+    def __init__(self, students: int = 500, courses: int = 0, seats: int = 30,
+                 min_courses: int = 3, max_courses: int = 5, alternates: int = 3,
+                 popularity: str = "zipf", skew: float = 1.0, window: float = 480.0,
+                 persist: bool = False, seed: int = 0):
+        self.students = students
+        # 0 keeps the nine default courses from EnrollmentSystem.initialize_courses
+        self.courses = courses
+        self.seats = seats
+        self.min_courses = min_courses
+        self.max_courses = max_courses
+        # Extra wish list entries a student falls back to when a preferred course is rejected
+        self.alternates = alternates
+        self.popularity = popularity
+        self.skew = skew
+        # Arrivals are spread over window simulated minutes after registration opens
+        self.window = window
+        self.persist = persist
+        self.seed = seed
+
+
+def build_catalog(system: EnrollmentSystem, config: DemandConfig):
+    if not config.courses:
+        return
+    rng = random.Random(config.seed)
+    patterns = ["MWF", "TTh", "MW"]
+    system.courses.clear()
+    for i in range(config.courses):
+        start = rng.randrange(8 * 60, 17 * 60, 60)
+        time_text = f"{rng.choice(patterns)} {format_minutes(start)} - {format_minutes(start + 50)}"
+        course_id = f"C{i:04d}"
+        system.courses[course_id] = Course(course_id, f"Course {i}", f"Dr. {i % 40}", config.seats,
+                                           time_text, system.graph)
+
+
+def course_weights(course_ids: List[str], config: DemandConfig) -> List[float]:
+    if config.popularity == "uniform":
+        return [1.0] * len(course_ids)
+    if config.popularity != "zipf":
+        raise ValueError(f"unknown popularity distribution {config.popularity!r}")
+    # Popularity rank is fixed by the config seed so every trial sees the same hot courses
+    ranks = list(range(1, len(course_ids) + 1))
+    random.Random(config.seed).shuffle(ranks)
+    return [1.0 / rank ** config.skew for rank in ranks]
+
+
+def wish_list(rng: random.Random, course_ids: List[str], weights: List[float], size: int) -> List[str]:
+    """Distinct courses drawn by weight, most wanted first"""
+    size = min(size, len(course_ids))
+    chosen: Dict[str, None] = {}
+    while len(chosen) < size:
+        for course_id in rng.choices(course_ids, weights, k=size - len(chosen)):
+            chosen[course_id] = None
+    return list(chosen)
+
+
+def rejection_reason(system: EnrollmentSystem, student_id: str, course_id: str) -> str:
+    # Same checks as enroll_student, in the same order; state is unchanged after a failed enroll.
+    # Wish lists only hold catalog courses, so "course not found" cannot happen here
+    course = system.courses[course_id]
+    if course_id in system.students[student_id].registered_courses:
+        return "duplicate"
+    if len(course.enrolled_students) >= course.max_students:
+        return "full"
+    return "time conflict" if system.get_time_conflict(student_id, course_id) else "unknown"
+
+
+def opening_day(system: EnrollmentSystem, config: DemandConfig, rng: random.Random) -> dict:
+    course_ids = list(system.courses)
+    weights = course_weights(course_ids, config)
+    arrivals = sorted(rng.uniform(0, config.window) for _ in range(config.students))
+    fill_time: Dict[str, Optional[float]] = dict.fromkeys(course_ids)
+    rejections = {reason: 0 for reason in REASONS}
+    rejected_by_course: Dict[str, int] = {}
+    attempts = enrolled = 0
+    busy = 0.0
+    for number, arrived in enumerate(arrivals):
+        student_id = f"S{number:06d}"
+        wanted = rng.randint(config.min_courses, config.max_courses)
+        choices = wish_list(rng, course_ids, weights, wanted + config.alternates)
+        # Students sometimes click enroll twice on their top course
+        if rng.random() < 0.05:
+            choices.insert(1, choices[0])
+        start = time.perf_counter()
+        system.register_student(student_id, student_id, "x")
+        busy += time.perf_counter() - start
+        got = 0
+        for course_id in choices:
+            if got == wanted:
+                break
+            attempts += 1
+            start = time.perf_counter()
+            ok = system.enroll_student(student_id, course_id)
+            busy += time.perf_counter() - start
+            if ok:
+                got += 1
+                enrolled += 1
+                course = system.courses[course_id]
+                if len(course.enrolled_students) == course.max_students:
+                    fill_time[course_id] = arrived
+                continue
+            reason = rejection_reason(system, student_id, course_id)
+            rejections[reason] = rejections.get(reason, 0) + 1
+            rejected_by_course[course_id] = rejected_by_course.get(course_id, 0) + 1
+    # busy only counts time inside EnrollmentSystem, not the simulator's own bookkeeping
+    return {"attempts": attempts, "enrolled": enrolled, "busy": busy,
+            "operations": attempts + config.students, "fill_time": fill_time,
+            "rejections": rejections, "rejected_by_course": rejected_by_course}
+
+
+def run_trial(config: DemandConfig, trial: int) -> dict:
+    """One opening day in a fresh system backed by a temp directory, so no real CSV is read or written"""
+    rng = random.Random(config.seed * 1000003 + trial)
+    with tempfile.TemporaryDirectory() as directory:
+        store = CsvStore() if config.persist else NullStore()
+        # The system prints a line per operation; the simulator only reports aggregates
+        system = EnrollmentSystem(store, directory=directory, output=NullWriter())
+        build_catalog(system, config)
+        result = opening_day(system, config, rng)
+        store.close()
+    result["trial"] = trial
+    return result
+
+
+def summarize(trials: List[dict], config: DemandConfig) -> dict:
+    courses = {}
+    for course_id in trials[0]["fill_time"]:
+        times = [t["fill_time"][course_id] for t in trials if t["fill_time"][course_id] is not None]
+        courses[course_id] = {
+            "fill_probability": len(times) / len(trials),
+            "median_fill_minutes": statistics.median(times) if times else None,
+            "earliest_fill_minutes": min(times) if times else None,
+            "mean_rejections": sum(t["rejected_by_course"].get(course_id, 0) for t in trials) / len(trials),
+        }
+    rejections: Dict[str, int] = {}
+    for trial in trials:
+        for reason, count in trial["rejections"].items():
+            rejections[reason] = rejections.get(reason, 0) + count
+    operations = sum(t["operations"] for t in trials)
+    busy = sum(t["busy"] for t in trials)
+    return {"trials": len(trials), "students": config.students, "courses": courses,
+            "rejections": rejections, "operations": operations,
+            "operations_per_second": operations / busy if busy else 0.0,
+            "mean_enrolled": sum(t["enrolled"] for t in trials) / len(trials)}
+
+
+def simulate(config: DemandConfig, trials: int = 20, workers: Optional[int] = None) -> dict:
+    """Run trials across a process pool (or inline with one worker) and aggregate them"""
+    if workers == 1:
+        results = [run_trial(config, trial) for trial in range(trials)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_trial, [config] * trials, range(trials)))
+    return summarize(results, config)
+
+
+def print_summary(summary: dict, top: int = 15):
+    print(f"{summary['trials']} trials x {summary['students']} students, "
+          f"{summary['mean_enrolled']:.0f} enrollments per trial")
+    print(f"Backend throughput: {summary['operations_per_second']:,.0f} operations/s "
+          f"({summary['operations']} register/enroll calls)")
+    print("Rejections: " + ", ".join(f"{reason} {count}" for reason, count in summary["rejections"].items()))
+    print()
+    print(f"{'Course':<8} {'P(full)':>8} {'Median fill':>12} {'Earliest':>9} {'Rejected':>9}")
+    ranked = sorted(summary["courses"].items(), key=lambda item: (-item[1]["fill_probability"],
+                                                                   item[1]["median_fill_minutes"] or 0))
+    for course_id, stats in ranked[:top]:
+        median = stats["median_fill_minutes"]
+        earliest = stats["earliest_fill_minutes"]
+        print(f"{course_id:<8} {stats['fill_probability']:>8.0%} "
+              f"{(f'{median:.0f} min' if median is not None else '-'):>12} "
+              f"{(f'{earliest:.0f} min' if earliest is not None else '-'):>9} "
+              f"{stats['mean_rejections']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate opening-day registration demand")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=0, help="generate this many courses (default: built-in nine)")
+    parser.add_argument("--seats", type=int, default=30)
+    parser.add_argument("--min-courses", type=int, default=3)
+    parser.add_argument("--max-courses", type=int, default=5)
+    parser.add_argument("--alternates", type=int, default=3)
+    parser.add_argument("--popularity", choices=["zipf", "uniform"], default="zipf")
+    parser.add_argument("--skew", type=float, default=1.0, help="zipf exponent")
+    parser.add_argument("--window", type=float, default=480.0, help="arrival window in minutes")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--persist", action="store_true", help="write CSVs to a temp directory per trial")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    config = DemandConfig(args.students, args.courses, args.seats, args.min_courses, args.max_courses,
+                          args.alternates, args.popularity, args.skew, args.window, args.persist, args.seed)
+    start = time.perf_counter()
+    summary = simulate(config, args.trials, args.workers)
+    print_summary(summary, args.top)
+    print(f"\nWall time: {time.perf_counter() - start:.2f} s with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import gc
+import random
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSet
+from typing import Dict, Iterable, Iterator, List, Optional
+
+STUDENT = 0
+COURSE = 1
+
+
+class IdTable:
+    """Interns string IDs as dense ints; each ID string is stored once"""
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __call__(self, name: str) -> int:
+        position = self.index.get(name)
+        if position is None:
+            position = self.index[name] = len(self.names)
+            self.names.append(name)
+        return position
+
+    def get(self, name: str) -> Optional[int]:
+        return self.index.get(name)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class EnrollmentGraph:
+    """Bipartite student/course graph with each side's links kept as a sorted uint32 array
+
+    link() and unlink() are the only writers and always update both directions together.
+    """
+    def __init__(self):
+        self.ids = (IdTable(), IdTable())
+        # links[STUDENT][s] holds the course ints of student s, links[COURSE][c] the student ints of course c
+        self.links: tuple = ([], [])
+
+    def intern(self, side: int, name: str) -> int:
+        position = self.ids[side](name)
+        rows = self.links[side]
+        while len(rows) <= position:
+            rows.append(array("I"))
+        return position
+
+    def name(self, side: int, position: int) -> str:
+        return self.ids[side].names[position]
+
+    def has(self, student: int, course: int) -> bool:
+        row = self.links[STUDENT][student]
+        i = bisect_left(row, course)
+        return i < len(row) and row[i] == course
+
+    def link(self, student: int, course: int) -> bool:
+        row = self.links[STUDENT][student]
+        i = bisect_left(row, course)
+        if i < len(row) and row[i] == course:
+            return False
+        row.insert(i, course)
+        other = self.links[COURSE][course]
+        other.insert(bisect_left(other, student), student)
+        return True
+
+    def unlink(self, student: int, course: int) -> bool:
+        row = self.links[STUDENT][student]
+        i = bisect_left(row, course)
+        if i == len(row) or row[i] != course:
+            return False
+        del row[i]
+        other = self.links[COURSE][course]
+        del other[bisect_left(other, student)]
+        return True
+
+    def _pair(self, side: int, position: int, other: int):
+        return (position, other) if side == STUDENT else (other, position)
+
+    def set_links(self, side: int, position: int, names: Iterable[str]):
+        """Replace every link of one student or course"""
+        for other in list(self.links[side][position]):
+            self.unlink(*self._pair(side, position, other))
+        for name in names:
+            self.link(*self._pair(side, position, self.intern(1 - side, name)))
+
+    def enrollments(self) -> int:
+        return sum(len(row) for row in self.links[STUDENT])
+
+
+class LinkSet(MutableSet):
+    """Set of course IDs (or student IDs) backed by one row of the graph"""
+    __slots__ = ("graph", "side", "position")
+
+    def __init__(self, graph: EnrollmentGraph, side: int, position: int):
+        self.graph = graph
+        self.side = side
+        self.position = position
+
+    def __contains__(self, name) -> bool:
+        other = self.graph.ids[1 - self.side].get(name)
+        if other is None:
+            return False
+        return self.graph.has(*self.graph._pair(self.side, self.position, other))
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.graph.ids[1 - self.side].names
+        return iter([names[other] for other in self.graph.links[self.side][self.position]])
+
+    def __len__(self) -> int:
+        return len(self.graph.links[self.side][self.position])
+
+    def add(self, name: str):
+        other = self.graph.intern(1 - self.side, name)
+        self.graph.link(*self.graph._pair(self.side, self.position, other))
+
+    def discard(self, name: str):
+        other = self.graph.ids[1 - self.side].get(name)
+        if other is not None:
+            self.graph.unlink(*self.graph._pair(self.side, self.position, other))
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+
+def measure(students: int = 100000, courses: int = 2000, per_student: int = 5, seed: int = 1):
+    """Bytes held by string sets on both sides versus the interned graph, for the same enrollments"""
+    rng = random.Random(seed)
+    course_ids = [f"CS{i:04d}" for i in range(courses)]
+    rows = [(f"S{i:06d}", ",".join(rng.sample(course_ids, per_student))) for i in range(students)]
+
+    def build_sets():
+        # What load_data used to build: split strings on both sides of the relation
+        registered = {student_id: set(courses_text.split(",")) for student_id, courses_text in rows}
+        enrolled: Dict[str, set] = {}
+        for student_id, courses_text in rows:
+            for course_id in courses_text.split(","):
+                enrolled.setdefault(course_id, set()).add(student_id)
+        return registered, enrolled
+
+    def build_graph():
+        graph = EnrollmentGraph()
+        for course_id in course_ids:
+            graph.intern(COURSE, course_id)
+        for student_id, courses_text in rows:
+            student = graph.intern(STUDENT, student_id)
+            for course_id in courses_text.split(","):
+                graph.link(student, graph.intern(COURSE, course_id))
+        return graph
+
+    results = {}
+    for label, build in (("string sets", build_sets), ("interned graph", build_graph)):
+        gc.collect()
+        tracemalloc.start()
+        built = build()
+        results[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del built
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare enrollment memory of string sets and the interned graph")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--per-student", type=int, default=5)
+    args = parser.parse_args()
+    results = measure(args.students, args.courses, args.per_student)
+    for label, size in results.items():
+        print(f"{label:>15}: {size / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import csv
+import os
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from instrumentation import timed
+from persistence import CsvStore
+from temp_term_project import TicketRequest
+
+
+def parse_counts(tokens: List[str]) -> Dict[str, int]:
+    # Same "VIP:3" token format as users.csv
+    counts = {}
+    for token in tokens:
+        ticket_type, number = token.split(":")
+        counts[ticket_type] = int(number)
+    return counts
+
+
+def format_counts(counts: Dict[str, int]) -> List[str]:
+    return [f"{ticket_type}:{number}" for ticket_type, number in counts.items()]
+
+
+class EventInfo:
+    def __init__(self, event_id: str, name: str, capacity: Dict[str, int], max_tickets: int = 10):
+        self.event_id = event_id
+        self.name = name
+        self.capacity = capacity
+        self.max_tickets = max_tickets
+
+    def __repr__(self) -> str:
+        return f"EventInfo(ID: {self.event_id}, Name: {self.name}, Capacity: {self.capacity})"
+
+
+class EventInventory:
+    """Availability, request queues and holdings of a single event"""
+    def __init__(self, info: EventInfo, directory: str, store: CsvStore,
+                 on_change: Optional[Callable[[str, str, int], None]] = None):
+        self.info = info
+        self.directory = directory
+        self.store = store
+        self.on_change = on_change
+        self.ticket_availability = dict(info.capacity)
+        self.ticket_requests = {ticket_type: deque() for ticket_type in info.capacity}
+        self.holdings: Dict[str, Dict[str, int]] = {}
+        self.load()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def load(self):
+        if os.path.exists(self.path("availability.csv")):
+            with open(self.path("availability.csv"), "r") as file:
+                for row in csv.reader(file):
+                    if len(row) >= 2:
+                        self.ticket_availability[row[0]] = int(row[1])
+        if os.path.exists(self.path("holdings.csv")):
+            with open(self.path("holdings.csv"), "r") as file:
+                for row in csv.reader(file):
+                    if len(row) >= 2:
+                        self.holdings[row[0]] = parse_counts(row[1:])
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.store.replace(self.path("availability.csv"), self.ticket_availability.items)
+        self.store.replace(self.path("holdings.csv"), lambda: ([user_id] + format_counts(tickets)
+                                                               for user_id, tickets in self.holdings.items()))
+
+    def log_transaction(self, user_id: str, ticket_type: str, action: str):
+        os.makedirs(self.directory, exist_ok=True)
+        self.store.append(self.path("transactions.csv"), [user_id, ticket_type, action, datetime.now()])
+
+    def held(self, user_id: str) -> int:
+        return sum(self.holdings.get(user_id, {}).values())
+
+    def sold(self, ticket_type: str) -> int:
+        return self.info.capacity[ticket_type] - self.ticket_availability[ticket_type]
+
+    def _changed(self, user_id: str):
+        if self.on_change:
+            self.on_change(user_id, self.info.event_id, self.held(user_id))
+
+    @timed("events.request_tickets")
+    def request_tickets(self, user_id: str, requested: Dict[str, int]) -> bool:
+        ticket_count = self.held(user_id)
+        if ticket_count >= self.info.max_tickets:
+            print(f"{user_id}, you have reached the max tickets limit.\n")
+            self.log_transaction(user_id, "/".join(self.info.capacity), "Max limit reached")
+            return False
+        for ticket_type, number in requested.items():
+            if ticket_type not in self.ticket_requests:
+                print(f"{user_id}, {self.info.name} has no {ticket_type} tickets.")
+                continue
+            while number > 0 and ticket_count < self.info.max_tickets:
+                # Queued requests already have a claim on the remaining tickets
+                if self.ticket_availability[ticket_type] - len(self.ticket_requests[ticket_type]) <= 0:
+                    print(f"{user_id}, no {ticket_type} tickets available.")
+                    self.log_transaction(user_id, ticket_type, "denied")
+                    break
+                self.ticket_requests[ticket_type].append(TicketRequest(user_id, ticket_type))
+                number -= 1
+                ticket_count += 1
+        return True
+
+    @timed("events.approve_tickets")
+    def approve_tickets(self) -> int:
+        """Grant queued requests in arrival order; returns how many were approved"""
+        approved = 0
+        changed: Set[str] = set()
+        for ticket_type, requests in self.ticket_requests.items():
+            while requests:
+                request = requests.popleft()
+                if self.held(request.user_id) >= self.info.max_tickets or self.ticket_availability[ticket_type] <= 0:
+                    self.log_transaction(request.user_id, ticket_type, "denied")
+                    continue
+                tickets = self.holdings.setdefault(request.user_id, {})
+                tickets[ticket_type] = tickets.get(ticket_type, 0) + 1
+                self.ticket_availability[ticket_type] -= 1
+                self.log_transaction(request.user_id, ticket_type, "approved")
+                changed.add(request.user_id)
+                approved += 1
+        if changed:
+            self.save()
+            for user_id in changed:
+                self._changed(user_id)
+        return approved
+
+    @timed("events.cancel_tickets")
+    def cancel_tickets(self, user_id: str, cancelled: Dict[str, int]) -> bool:
+        tickets = self.holdings.get(user_id, {})
+        # Validate everything before touching state so a bad entry leaves memory and disk in step
+        for ticket_type, number in cancelled.items():
+            if number < 0:
+                print(f"{user_id}, cannot cancel a negative number of {ticket_type} tickets.")
+                return False
+            if tickets.get(ticket_type, 0) < number:
+                print(f"{user_id}, you have no {ticket_type} tickets to cancel.")
+                return False
+        cancelled = {ticket_type: number for ticket_type, number in cancelled.items() if number}
+        if not cancelled:
+            return True
+        for ticket_type, number in cancelled.items():
+            tickets[ticket_type] -= number
+            self.ticket_availability[ticket_type] += number
+            for _ in range(number):
+                self.log_transaction(user_id, ticket_type, "cancelled")
+        if not any(tickets.values()):
+            self.holdings.pop(user_id, None)
+        self.save()
+        self._changed(user_id)
+        return True
+
+
+class EventCatalog:
+    """All events; per-event state is only read from disk when that event is first used"""
+    def __init__(self, root: str = "events", store: Optional[CsvStore] = None):
+        self.root = root
+        self.store = store or CsvStore()
+        self.events: Dict[str, EventInfo] = {}
+        self.inventories: Dict[str, EventInventory] = {}
+        self.user_events: Dict[str, Set[str]] = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(os.path.join(self.root, "events.csv")):
+            with open(os.path.join(self.root, "events.csv"), "r") as file:
+                for row in csv.reader(file):
+                    if len(row) >= 4:
+                        event_id, name, max_tickets = row[:3]
+                        self.events[event_id] = EventInfo(event_id, name, parse_counts(row[3:]), int(max_tickets))
+        if os.path.exists(os.path.join(self.root, "user_events.csv")):
+            with open(os.path.join(self.root, "user_events.csv"), "r") as file:
+                for row in csv.reader(file):
+                    if len(row) >= 2 and row[1]:
+                        self.user_events[row[0]] = set(row[1].split(','))
+
+    def save_events(self):
+        os.makedirs(self.root, exist_ok=True)
+        self.store.replace(os.path.join(self.root, "events.csv"),
+                           lambda: ([info.event_id, info.name, info.max_tickets] + format_counts(info.capacity)
+                                    for info in self.events.values()))
+
+    def save_user_events(self):
+        os.makedirs(self.root, exist_ok=True)
+        self.store.replace(os.path.join(self.root, "user_events.csv"),
+                           lambda: ([user_id, ','.join(sorted(event_ids))] for user_id, event_ids in self.user_events.items()))
+
+    def create_event(self, event_id: str, name: str, capacity: Dict[str, int], max_tickets: int = 10) -> bool:
+        if event_id in self.events:
+            print("Error: Event ID already exists")
+            return False
+        self.events[event_id] = EventInfo(event_id, name, dict(capacity), max_tickets)
+        self.save_events()
+        return True
+
+    def event(self, event_id: str) -> EventInventory:
+        inventory = self.inventories.get(event_id)
+        if inventory is None:
+            inventory = EventInventory(self.events[event_id], os.path.join(self.root, event_id),
+                                       self.store, self.holdings_changed)
+            self.inventories[event_id] = inventory
+        return inventory
+
+    def holdings_changed(self, user_id: str, event_id: str, held: int):
+        """Keep the user to events index in step after a user's holding for event_id changed"""
+        event_ids = self.user_events.setdefault(user_id, set())
+        if held:
+            event_ids.add(event_id)
+        else:
+            event_ids.discard(event_id)
+            if not event_ids:
+                del self.user_events[user_id]
+        self.save_user_events()
+
+    def tickets_for(self, user_id: str) -> Dict[str, Dict[str, int]]:
+        """A user's tickets across events, loading only the events they hold tickets for"""
+        return {event_id: dict(self.event(event_id).holdings.get(user_id, {}))
+                for event_id in sorted(self.user_events.get(user_id, ()))}
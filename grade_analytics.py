@@ -0,0 +1,143 @@
+import time
+
+import numpy as np
+
+from assignment1 import CATEGORY_NAMES, CATEGORY_THRESHOLDS
+
+MAX_GRADE = 100
+THRESHOLDS = np.array(CATEGORY_THRESHOLDS)
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def validate(grades) -> np.ndarray:
+    grades = np.asarray(grades)
+    if not grades.size:
+        return grades.astype(np.int64)
+    if grades.dtype.kind == "f":
+        # Casting would silently truncate 87.5 and turn NaN into garbage
+        if not np.isfinite(grades).all() or (np.floor(grades) != grades).any():
+            raise ValueError("Grades must be whole numbers")
+    elif grades.dtype.kind not in "iu":
+        raise ValueError("Grades must be whole numbers")
+    if grades.min() < 0 or grades.max() > MAX_GRADE:
+        raise ValueError("Grades must be between 0 and 100")
+    return grades.astype(np.int64, copy=False)
+
+
+def categorize(grades) -> np.ndarray:
+    """Category index for every grade (0 = Needs Improvement ... 3 = Excellent)"""
+    return np.searchsorted(THRESHOLDS, validate(grades), side="right")
+
+
+def category_labels(grades) -> np.ndarray:
+    return np.array(CATEGORY_NAMES)[categorize(grades)]
+
+
+def grade_histogram(grades) -> np.ndarray:
+    """Count of each grade 0..100; every statistic below is derived from this one pass"""
+    return np.bincount(validate(grades), minlength=MAX_GRADE + 1)
+
+
+def _value_at(cumulative: np.ndarray, rank: np.ndarray) -> np.ndarray:
+    # Grade holding the given 0-based rank in sorted order
+    return np.searchsorted(cumulative, rank, side="right")
+
+
+def histogram_stats(histogram: np.ndarray, percentiles=DEFAULT_PERCENTILES) -> dict:
+    """Count, mean, median and percentiles of the grades described by a 0..100 histogram"""
+    count = int(histogram.sum())
+    if count == 0:
+        return {"count": 0, "mean": None, "median": None,
+                "percentiles": {p: None for p in percentiles}}
+    values = np.arange(histogram.size)
+    cumulative = np.cumsum(histogram)
+
+    # Same linear interpolation as np.percentile on the raw grades
+    positions = np.array(percentiles, dtype=float) / 100 * (count - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    low_values = _value_at(cumulative, lower)
+    high_values = _value_at(cumulative, upper)
+    interpolated = low_values + (positions - lower) * (high_values - low_values)
+
+    middle = _value_at(cumulative, np.array([(count - 1) // 2, count // 2]))
+    return {
+        "count": count,
+        "mean": float((values * histogram).sum() / count),
+        "median": float(middle.mean()),
+        "percentiles": {p: float(v) for p, v in zip(percentiles, interpolated)},
+    }
+
+
+def summarize(grades, percentiles=DEFAULT_PERCENTILES, bin_width: int = 10) -> dict:
+    """Overall and per-category statistics and histograms for an array of grades"""
+    histogram = grade_histogram(grades)
+    return summarize_histogram(histogram, percentiles, bin_width)
+
+
+def summarize_histogram(histogram: np.ndarray, percentiles=DEFAULT_PERCENTILES,
+                        bin_width: int = 10) -> dict:
+    bounds = [0] + CATEGORY_THRESHOLDS + [MAX_GRADE + 1]
+    summary = {"overall": histogram_stats(histogram, percentiles), "categories": {}}
+    for name, low, high in zip(CATEGORY_NAMES, bounds, bounds[1:]):
+        # Zero out everything outside the category so grade values stay aligned
+        part = np.zeros_like(histogram)
+        part[low:high] = histogram[low:high]
+        stats = histogram_stats(part, percentiles)
+        stats["histogram"] = binned(part, bin_width, low, high)
+        summary["categories"][name] = stats
+    summary["overall"]["histogram"] = binned(histogram, bin_width, 0, MAX_GRADE + 1)
+    return summary
+
+
+def binned(histogram: np.ndarray, bin_width: int, low: int, high: int) -> dict:
+    result = {}
+    for start in range(low, high, bin_width):
+        end = min(start + bin_width, high)
+        result[f"{start}-{end - 1}"] = int(histogram[start:end].sum())
+    return result
+
+
+class GradeBook:
+    """Growable grade storage backed by a NumPy array instead of parallel lists"""
+    def __init__(self, capacity: int = 1024):
+        self.names = []
+        self._grades = np.empty(capacity, dtype=np.uint8)
+        self.size = 0
+
+    @property
+    def grades(self) -> np.ndarray:
+        return self._grades[:self.size]
+
+    def add(self, name: str, grade: int):
+        self.extend([name], [grade])
+
+    def extend(self, names, grades):
+        grades = validate(grades)
+        if len(names) != len(grades):
+            raise ValueError("Every grade needs a student name")
+        needed = self.size + len(grades)
+        if needed > self._grades.size:
+            grown = np.empty(max(needed, self._grades.size * 2), dtype=np.uint8)
+            grown[:self.size] = self.grades
+            self._grades = grown
+        self._grades[self.size:needed] = grades
+        self.names.extend(names)
+        self.size = needed
+
+    def categories(self) -> np.ndarray:
+        return category_labels(self.grades)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES) -> dict:
+        return summarize(self.grades, percentiles)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    sample = rng.integers(0, MAX_GRADE + 1, size=5_000_000)
+    start = time.perf_counter()
+    result = summarize(sample)
+    elapsed = time.perf_counter() - start
+    print(f"Summarized {sample.size:,} grades in {elapsed * 1000:.1f} ms")
+    for name, stats in result["categories"].items():
+        print(f"{name.ljust(18)} count={stats['count']:<9} mean={stats['mean']:.2f} median={stats['median']}")
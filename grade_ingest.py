@@ -0,0 +1,290 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+from assignment1 import category
+
+Record = Tuple[str, int]
+
+
+class GradeError(ValueError):
+    pass
+
+
+class ErrorLog:
+    """Count invalid rows but keep only the first few messages so memory stays bounded"""
+    def __init__(self, keep: int = 20):
+        self.keep = keep
+        self.count = 0
+        self.samples: List[str] = []
+
+    def append(self, problem: str):
+        self.count += 1
+        if len(self.samples) < self.keep:
+            self.samples.append(problem)
+
+
+def read_csv(path: str) -> Iterator[Tuple[int, str, str]]:
+    """Yield (line number, name, raw grade), skipping an optional name,grade header"""
+    with open(path, "r", newline="") as file:
+        reader = csv.reader(file)
+        for row in reader:
+            if not row:
+                continue
+            if reader.line_num == 1 and row[-1].strip().lower() == "grade":
+                continue
+            if len(row) < 2:
+                yield reader.line_num, row[0], ""
+            else:
+                yield reader.line_num, row[0], row[1]
+
+
+def report(problem: str, strict: bool, errors: ErrorLog):
+    if strict:
+        raise GradeError(problem)
+    errors.append(problem)
+
+
+def read_jsonl(path: str, strict: bool = False, errors: ErrorLog = None) -> Iterator[Tuple[int, str, str]]:
+    """Yield (line number, name, raw grade); malformed lines go to errors instead of ending the run"""
+    errors = ErrorLog() if errors is None else errors
+    with open(path, "r") as file:
+        for line_num, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                report(f"line {line_num}: invalid JSON ({error.msg})", strict, errors)
+                continue
+            if not isinstance(record, dict):
+                report(f"line {line_num}: expected an object, got {type(record).__name__}", strict, errors)
+                continue
+            yield line_num, record.get("name", ""), record.get("grade", "")
+
+
+def iter_json_array(file, read_size: int = 1 << 16) -> Iterator:
+    """Yield the items of the top-level JSON array in file, reading it read_size characters at a time
+
+    Only the item being decoded is held in memory. Raises json.JSONDecodeError with lineno
+    counted from the start of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    start = 0  # buffer[start:] has not been parsed yet
+    lines = 0  # newlines in the text already dropped from buffer
+    eof = False
+    expect = "["  # "[", then "item" or "]", then "," or "]", then "end"
+
+    def more() -> bool:
+        nonlocal buffer, start, lines, eof
+        chunk = "" if eof else file.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        lines += buffer.count("\n", 0, start)
+        buffer = buffer[start:] + chunk
+        start = 0
+        return True
+
+    def fail(message: str, position: int):
+        error = json.JSONDecodeError(message, buffer, position)
+        error.lineno += lines
+        raise error
+
+    while True:
+        while start < len(buffer) and buffer[start] in " \t\r\n":
+            start += 1
+        if start == len(buffer):
+            if more():
+                continue
+            if expect == "end":
+                return
+            fail("Expecting '['" if expect == "[" else "Expecting value", start)
+        char = buffer[start]
+        if expect == "[":
+            if char != "[":
+                fail("Expecting '['", start)
+            start += 1
+            expect = "item or ]"
+        elif expect in ("item or ]", "item"):
+            if expect == "item or ]" and char == "]":
+                start += 1
+                expect = "end"
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, start)
+            except json.JSONDecodeError as error:
+                # The item may just be cut off at the end of the buffer
+                if more():
+                    continue
+                error.lineno += lines
+                raise
+            # A number cut off by the end of the buffer still decodes, so only trust the item
+            # once the delimiter after it has been read
+            following = end
+            while following < len(buffer) and buffer[following] in " \t\r\n":
+                following += 1
+            if (following == len(buffer) or buffer[following] not in ",]") and more():
+                continue
+            start = end
+            expect = ", or ]"
+            yield item
+        elif expect == ", or ]":
+            if char not in ",]":
+                fail("Expecting ',' delimiter", start)
+            start += 1
+            expect = "item" if char == "," else "end"
+        else:
+            fail("Extra data", start)
+
+
+def read_json(path: str, strict: bool = False, errors: ErrorLog = None) -> Iterator[Tuple[int, str, str]]:
+    """A .json file holding one array of {"name", "grade"} objects; positions stand in for line numbers
+
+    The array is decoded one record at a time, so the file is never loaded whole.
+    """
+    errors = ErrorLog() if errors is None else errors
+    with open(path, "r") as file:
+        try:
+            for position, record in enumerate(iter_json_array(file), 1):
+                if not isinstance(record, dict):
+                    report(f"record {position}: expected an object, got {type(record).__name__}", strict, errors)
+                    continue
+                yield position, record.get("name", ""), record.get("grade", "")
+        except json.JSONDecodeError as error:
+            # Records before the error have already been yielded; nothing after it can be trusted
+            report(f"line {error.lineno}: invalid JSON ({error.msg})", strict, errors)
+
+
+def read_grades(path: str, strict: bool = False, errors: ErrorLog = None) -> Iterator[Tuple[int, str, str]]:
+    if path.endswith(".jsonl"):
+        return read_jsonl(path, strict, errors)
+    if path.endswith(".json"):
+        return read_json(path, strict, errors)
+    return read_csv(path)
+
+
+def parse_grade(raw) -> int:
+    """Whole-number grades only: 89.9 and True are rejected rather than truncated or coerced"""
+    if isinstance(raw, bool):
+        raise TypeError(raw)
+    if isinstance(raw, float):
+        if not raw.is_integer():
+            raise ValueError(raw)
+        return int(raw)
+    if isinstance(raw, (int, str)):
+        return int(raw)
+    raise TypeError(raw)
+
+
+def validate_chunk(rows: List[Tuple[int, str, str]], strict: bool, errors: ErrorLog) -> List[Record]:
+    """Check a chunk of rows for a text name and a whole-number grade between 0 and 100"""
+    valid = []
+    for line_num, name, raw_grade in rows:
+        if not isinstance(name, str):
+            problem = f"line {line_num}: name {name!r} is not text"
+        else:
+            try:
+                grade = parse_grade(raw_grade)
+            except (TypeError, ValueError):
+                problem = f"line {line_num}: grade {raw_grade!r} is not a whole number"
+            else:
+                if 0 <= grade <= 100:
+                    valid.append((name.strip(), grade))
+                    continue
+                problem = f"line {line_num}: grade {grade} is not between 0 and 100"
+        report(problem, strict, errors)
+    return valid
+
+
+def ingest(rows: Iterable[Tuple[int, str, str]], chunk_size: int = 10000,
+           strict: bool = False, errors: ErrorLog = None) -> Iterator[List[Tuple[str, int, str]]]:
+    """Yield chunks of (name, grade, category); only one chunk is in memory at a time"""
+    errors = ErrorLog() if errors is None else errors
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield [(name, grade, category(grade)) for name, grade in validate_chunk(chunk, strict, errors)]
+
+
+def write_table(chunks, out):
+    # Same layout as the interactive report in assignment1
+    out.write('\nName        Grade       Category\n')
+    out.write("----------------------------------\n")
+    for chunk in chunks:
+        out.write("".join(f"{name.ljust(12)} {str(grade).ljust(10)} {label}\n"
+                          for name, grade, label in chunk))
+
+
+def write_csv(chunks, out):
+    writer = csv.writer(out)
+    writer.writerow(["name", "grade", "category"])
+    for chunk in chunks:
+        writer.writerows(chunk)
+
+
+def write_jsonl(chunks, out):
+    for chunk in chunks:
+        out.write("".join(json.dumps({"name": name, "grade": grade, "category": label}) + "\n"
+                          for name, grade, label in chunk))
+
+
+WRITERS = {"table": write_table, "csv": write_csv, "jsonl": write_jsonl}
+
+
+def run(source: str, output: str = "-", fmt: str = "table", chunk_size: int = 10000,
+        strict: bool = False, buffer_size: int = 1 << 20) -> Tuple[int, ErrorLog]:
+    errors = ErrorLog()
+    counted = [0]
+
+    def counting(chunks):
+        for chunk in chunks:
+            counted[0] += len(chunk)
+            yield chunk
+
+    chunks = counting(ingest(read_grades(source, strict, errors), chunk_size, strict, errors))
+    if output == "-":
+        out = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, buffer_size),
+                               newline="", write_through=False)
+        try:
+            WRITERS[fmt](chunks, out)
+        finally:
+            out.flush()
+            out.detach()
+    else:
+        with open(output, "w", newline="", buffering=buffer_size) as out:
+            WRITERS[fmt](chunks, out)
+    return counted[0], errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Categorize a CSV or JSONL file of student grades")
+    parser.add_argument("source", help="CSV with name,grade columns, JSONL with name/grade keys, or a JSON array of them")
+    parser.add_argument("-o", "--output", default="-", help="output file, '-' for stdout")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), default="table")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--strict", action="store_true", help="stop at the first invalid grade")
+    args = parser.parse_args()
+
+    try:
+        count, errors = run(args.source, args.output, args.format, args.chunk_size, args.strict)
+    except GradeError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+    for problem in errors.samples:
+        print(f"Skipped {problem}", file=sys.stderr)
+    if errors.count > len(errors.samples):
+        print(f"... and {errors.count - len(errors.samples)} more invalid rows", file=sys.stderr)
+    print(f"Processed {count} students", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Tuple
+
+import numpy as np
+
+from grade_analytics import MAX_GRADE, summarize_histogram
+from grade_ingest import ErrorLog, read_grades, validate_chunk
+
+
+def shard_histogram(path: str, chunk_size: int = 50000) -> Tuple[np.ndarray, int, int]:
+    """Worker: grade histogram, valid row count and invalid row count for one file"""
+    histogram = np.zeros(MAX_GRADE + 1, dtype=np.int64)
+    errors = ErrorLog(keep=0)
+    rows = 0
+    # Malformed lines are counted by the reader, so one bad line no longer fails the whole pool
+    lines = read_grades(path, errors=errors)
+    while True:
+        raw = list(islice(lines, chunk_size))
+        if not raw:
+            break
+        # Only the histogram is needed here, so rows are validated without computing labels
+        grades = [grade for _, grade in validate_chunk(raw, False, errors)]
+        histogram += np.bincount(np.array(grades, dtype=np.int64), minlength=MAX_GRADE + 1)
+        rows += len(grades)
+    return histogram, rows, errors.count
+
+
+def categorize_files(paths: List[str], workers: int = None) -> dict:
+    """Shard files across a process pool and merge the partial histograms"""
+    histogram = np.zeros(MAX_GRADE + 1, dtype=np.int64)
+    rows = invalid = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Largest files first so one big shard doesn't finish last on its own
+        ordered = sorted(paths, key=os.path.getsize, reverse=True)
+        for part, part_rows, part_invalid in pool.map(shard_histogram, ordered):
+            histogram += part
+            rows += part_rows
+            invalid += part_invalid
+    summary = summarize_histogram(histogram)
+    summary["files"] = len(paths)
+    summary["rows"] = rows
+    summary["invalid"] = invalid
+    return summary
+
+
+def write_sample_files(directory: str, files: int, rows_per_file: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    paths = []
+    for number in range(files):
+        path = os.path.join(directory, f"grades_{number}.csv")
+        with open(path, "w") as file:
+            file.write("name,grade\n")
+            file.write("".join(f"student{number}_{i},{rng.randint(0, MAX_GRADE)}\n"
+                               for i in range(rows_per_file)))
+        paths.append(path)
+    return paths
+
+
+def benchmark(files: int, rows_per_file: int, max_workers: int):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_sample_files(directory, files, rows_per_file)
+        total = files * rows_per_file
+        baseline = None
+        print(f"{files} files x {rows_per_file:,} rows")
+        print("Workers  Seconds   Rows/s        Speedup")
+        counts = [1]
+        while counts[-1] * 2 < max_workers:
+            counts.append(counts[-1] * 2)
+        if max_workers > 1:
+            counts.append(max_workers)
+        for workers in counts:
+            start = time.perf_counter()
+            categorize_files(paths, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{str(workers).ljust(8)} {elapsed:<9.2f} {total / elapsed:<13,.0f} {baseline / elapsed:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Categorize grade files in parallel")
+    parser.add_argument("paths", nargs="*", help="CSV or JSONL grade files")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--benchmark", action="store_true", help="measure scaling from 1 to --workers")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.files, args.rows, args.workers)
+        return
+    summary = categorize_files(args.paths, args.workers)
+    print(f"Processed {summary['rows']} grades from {summary['files']} files ({summary['invalid']} invalid)")
+    for name, stats in summary["categories"].items():
+        mean = f"{stats['mean']:.2f}" if stats["count"] else "-"
+        print(f"{name.ljust(18)} {str(stats['count']).ljust(10)} mean {mean}")
+
+
+if __name__ == "__main__":
+    main()
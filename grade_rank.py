@@ -0,0 +1,137 @@
+import sys
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from assignment1 import category
+
+MAX_GRADE = 100
+
+
+class FenwickTree:
+    """Prefix sums over grade buckets 0..100 with O(log 101) updates and queries"""
+    def __init__(self, size: int = MAX_GRADE + 1):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Sum of buckets 0..index inclusive"""
+        if index < 0:
+            return 0
+        index = min(index, self.size - 1) + 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, count: int) -> int:
+        """Smallest bucket whose prefix sum reaches count (count is 1-based)"""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] < count:
+                position = nxt
+                count -= self.tree[nxt]
+            step >>= 1
+        return position
+
+
+class GradeIndex:
+    """Live leaderboard over integer grades: rank, percentile, top-k and range counts
+
+    Students are keyed by an ID (build_index uses the row position), since names need not be unique.
+    """
+    def __init__(self):
+        self.counts = FenwickTree()
+        self.grades: Dict[Hashable, int] = {}
+        self.names: Dict[Hashable, str] = {}
+        # Students in each bucket, kept so top-k can list them without sorting
+        self.buckets: List[Dict[Hashable, None]] = [{} for _ in range(MAX_GRADE + 1)]
+
+    def __len__(self) -> int:
+        return len(self.grades)
+
+    def set(self, student: Hashable, grade: int, name: Optional[str] = None):
+        # Checked before anything changes, so a bad grade leaves the index as it was
+        if not isinstance(grade, int) or isinstance(grade, bool):
+            raise ValueError("Error: Grade must be a whole number")
+        if not 0 <= grade <= MAX_GRADE:
+            raise ValueError("Error: Ensure your grade is between 0 and 100")
+        if student in self.grades:
+            self.remove(student)
+        self.grades[student] = grade
+        self.names[student] = str(student) if name is None else name
+        self.buckets[grade][student] = None
+        self.counts.add(grade, 1)
+
+    def remove(self, student: Hashable):
+        grade = self.grades.pop(student)
+        del self.names[student]
+        del self.buckets[grade][student]
+        self.counts.add(grade, -1)
+
+    def count_range(self, low: int, high: int) -> int:
+        """How many students scored between low and high inclusive"""
+        return self.counts.prefix(high) - self.counts.prefix(low - 1)
+
+    def rank(self, student: Hashable) -> int:
+        """1 for the top grade; students with equal grades share a rank"""
+        grade = self.grades[student]
+        return len(self.grades) - self.counts.prefix(grade) + 1
+
+    def percentile(self, student: Hashable) -> float:
+        """Percentage of students who scored strictly below this student"""
+        if not self.grades:
+            return 0.0
+        return 100.0 * self.counts.prefix(self.grades[student] - 1) / len(self.grades)
+
+    def grade_at_rank(self, rank: int) -> int:
+        """Grade of the student in position rank (1 = best)"""
+        if not 1 <= rank <= len(self.grades):
+            raise IndexError("rank out of range")
+        return self.counts.find(len(self.grades) - rank + 1)
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        result = []
+        grade = MAX_GRADE
+        while grade >= 0 and len(result) < k:
+            for student in self.buckets[grade]:
+                result.append((self.names[student], grade))
+                if len(result) == k:
+                    break
+            grade -= 1
+        return result
+
+
+def build_index(names, grades) -> GradeIndex:
+    """Index the assignment1 lists; each student is keyed by their row position"""
+    index = GradeIndex()
+    for position, (name, grade) in enumerate(zip(names, grades)):
+        index.set(position, grade, name)
+    return index
+
+
+def print_report(index: GradeIndex, out=None):
+    """The assignment1 Name/Grade/Category table with each student's rank"""
+    out = out or sys.stdout
+    lines = ['\nName        Grade       Category            Rank\n',
+             "------------------------------------------------\n"]
+    for student, grade in index.grades.items():
+        lines.append(f"{index.names[student].ljust(12)} {str(grade).ljust(10)} {category(grade).ljust(19)} "
+                     f"{index.rank(student)}/{len(index)}\n")
+    out.write("".join(lines))
+
+
+if __name__ == "__main__":
+    from assignment1 import add_student, grades, students
+
+    num_students = int(input("How many students do you want to add? "))
+    for i in range(num_students):
+        add_student()
+    print_report(build_index(students, grades))
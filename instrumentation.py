@@ -0,0 +1,169 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Upper bounds in seconds, Prometheus-style cumulative buckets
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Registry:
+    """Latency histograms and counters; every hook is a single flag check while disabled"""
+    def __init__(self):
+        self.enabled = os.environ.get("REGISTRATION_METRICS", "") not in ("", "0")
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "time": time.time(),
+                "counters": dict(self.counters),
+                "latency": {name: {"count": h.count, "sum": h.total,
+                                   "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts))}
+                            for name, h in self.histograms.items()},
+            }
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self.lock:
+            for name, value in sorted(self.counters.items()):
+                metric = name.replace(".", "_")
+                lines.append(f"# TYPE {metric}_total counter")
+                lines.append(f"{metric}_total {value}")
+            if self.histograms:
+                lines.append("# TYPE operation_seconds histogram")
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip([str(b) for b in BUCKETS] + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'operation_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'operation_seconds_sum{{operation="{name}"}} {histogram.total}')
+                lines.append(f'operation_seconds_count{{operation="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def enable():
+    registry.enabled = True
+
+
+def disable():
+    registry.enabled = False
+
+
+def timed(name: str):
+    """Record call count and latency of the decorated function under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+                registry.increment(f"{name}.calls")
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(name: str):
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start)
+        registry.increment(f"{name}.calls")
+
+
+@contextmanager
+def open_file(path: str, mode: str = "r", name: Optional[str] = None, **kwargs):
+    """open() that counts bytes written to the file when metrics are enabled"""
+    with open(path, mode, **kwargs) as file:
+        counting = registry.enabled and any(flag in mode for flag in "wax")
+        start = file.tell() if counting else 0
+        yield file
+        if counting:
+            file.flush()
+            registry.increment(f"{name or os.path.basename(path)}.bytes_written", file.tell() - start)
+
+
+def fsync(file, name: Optional[str] = None):
+    file.flush()
+    os.fsync(file.fileno())
+    if registry.enabled:
+        registry.increment(f"{name or os.path.basename(file.name)}.fsyncs")
+
+
+class JsonDumper:
+    """Background thread that writes a JSON snapshot to a local file every interval seconds"""
+    def __init__(self, path: str = "metrics.json", interval: float = 10.0):
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def dump(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(registry.snapshot(), file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.dump()
@@ -0,0 +1,194 @@
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+Sku = Tuple[str, int]  # (category, index) into the products dict
+
+
+class SalesWindow:
+    """Units sold for one SKU over a sliding time window"""
+    def __init__(self, window: float):
+        self.window = window
+        self.sales = deque()
+        self.units = 0
+
+    def add(self, when: float, quantity: int):
+        self.sales.append((when, quantity))
+        self.units += quantity
+        self.expire(when)
+
+    def expire(self, now: float):
+        while self.sales and self.sales[0][0] <= now - self.window:
+            _, quantity = self.sales.popleft()
+            self.units -= quantity
+
+    def daily_rate(self, now: float) -> float:
+        self.expire(now)
+        return self.units * SECONDS_PER_DAY / self.window
+
+
+class ReplenishmentEvent:
+    def __init__(self, sku: Sku, name: str, quantity: int, days_of_cover: float, order_quantity: int):
+        self.sku = sku
+        self.name = name
+        self.quantity = quantity
+        self.days_of_cover = days_of_cover
+        self.order_quantity = order_quantity
+        self.time_of_event = time.time()
+
+    def __repr__(self) -> str:
+        return (f"ReplenishmentEvent(SKU: {self.sku}, Name: {self.name}, Quantity: {self.quantity}, "
+                f"Cover: {self.days_of_cover:.1f} days, Order: {self.order_quantity})")
+
+
+class InventoryWatcher:
+    """Min-heap of SKUs by days of cover, updated only for the SKU that just sold"""
+    def __init__(self, inventory: dict, threshold_days: float = 3.0, target_days: float = 14.0,
+                 window: float = 7 * SECONDS_PER_DAY, min_order: int = 1,
+                 on_event: Optional[Callable[[ReplenishmentEvent], None]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.inventory = inventory
+        self.threshold_days = threshold_days
+        self.target_days = target_days
+        self.window = window
+        self.min_order = min_order
+        self.on_event = on_event
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.windows: Dict[Sku, SalesWindow] = {}
+        self.heap: List[Tuple[float, int, Sku]] = []
+        self.versions: Dict[Sku, int] = {}
+        self.pending: Dict[Sku, ReplenishmentEvent] = {}
+
+    def product(self, sku: Sku) -> dict:
+        category, index = sku
+        return self.inventory[category][index]
+
+    def days_of_cover(self, sku: Sku, now: float) -> float:
+        quantity = self.product(sku)["quantity"]
+        window = self.windows.get(sku)
+        rate = window.daily_rate(now) if window else 0.0
+        if quantity <= 0:
+            return 0.0
+        return quantity / rate if rate > 0 else math.inf
+
+    def _push(self, sku: Sku, cover: float):
+        # Old heap entries for this SKU are skipped once their version is stale
+        version = self.versions.get(sku, 0) + 1
+        self.versions[sku] = version
+        heapq.heappush(self.heap, (cover, version, sku))
+
+    def record_sale(self, sku: Sku, quantity: int):
+        """Call after the product's quantity has been reduced"""
+        with self.lock:
+            event = self._record(sku, quantity)
+        if event and self.on_event:
+            self.on_event(event)
+
+    def sell(self, sku: Sku, quantity: int) -> bool:
+        """Deduct quantity from stock and record the sale; False if too little is left
+
+        The check and the deduction happen under the same lock as restock(), so neither update is lost.
+        """
+        with self.lock:
+            product = self.product(sku)
+            if quantity > product["quantity"]:
+                return False
+            product["quantity"] -= quantity
+            event = self._record(sku, quantity)
+        if event and self.on_event:
+            self.on_event(event)
+        return True
+
+    def _record(self, sku: Sku, quantity: int) -> Optional[ReplenishmentEvent]:
+        now = self.clock()
+        if sku not in self.windows:
+            self.windows[sku] = SalesWindow(self.window)
+        self.windows[sku].add(now, quantity)
+        cover = self.days_of_cover(sku, now)
+        self._push(sku, cover)
+        return self._check(sku, cover, now)
+
+    def _check(self, sku: Sku, cover: float, now: float) -> Optional[ReplenishmentEvent]:
+        if cover >= self.threshold_days or sku in self.pending:
+            return None
+        product = self.product(sku)
+        rate = self.windows[sku].daily_rate(now)
+        wanted = math.ceil(rate * self.target_days) - product["quantity"]
+        event = ReplenishmentEvent(sku, product["name"], product["quantity"], cover,
+                                   max(self.min_order, wanted))
+        self.pending[sku] = event
+        return event
+
+    def most_at_risk(self, k: int = 10) -> List[Tuple[Sku, float]]:
+        """The k SKUs with the least cover, refreshing entries whose sales rate has decayed"""
+        with self.lock:
+            now = self.clock()
+            result = []
+            kept = []
+            while self.heap and len(result) < k:
+                cover, version, sku = heapq.heappop(self.heap)
+                if self.versions.get(sku) != version:
+                    continue
+                fresh = self.days_of_cover(sku, now)
+                if fresh != cover:
+                    self._push(sku, fresh)
+                    continue
+                result.append((sku, cover))
+                kept.append((cover, version, sku))
+            for entry in kept:
+                heapq.heappush(self.heap, entry)
+            return result
+
+    def restock(self, sku: Sku, quantity: int):
+        with self.lock:
+            self.product(sku)["quantity"] += quantity
+            self.pending.pop(sku, None)
+            self._push(sku, self.days_of_cover(sku, self.clock()))
+
+
+class ReplenishmentScheduler:
+    """Background thread that collects replenishment events and restocks them in batches"""
+    def __init__(self, watcher: InventoryWatcher, interval: float = 60.0,
+                 supplier: Optional[Callable[[List[ReplenishmentEvent]], None]] = None):
+        self.watcher = watcher
+        self.interval = interval
+        self.supplier = supplier
+        self.queue: List[ReplenishmentEvent] = []
+        self.queue_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="replenishment", daemon=True)
+        watcher.on_event = self.submit
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, event: ReplenishmentEvent):
+        with self.queue_lock:
+            self.queue.append(event)
+
+    def flush(self) -> List[ReplenishmentEvent]:
+        with self.queue_lock:
+            batch, self.queue = self.queue, []
+        if batch:
+            # The supplier sees the whole batch as one purchase order
+            if self.supplier:
+                self.supplier(batch)
+            for event in batch:
+                self.watcher.restock(event.sku, event.order_quantity)
+        return batch
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.flush()
@@ -0,0 +1,166 @@
+import atexit
+import json
+import queue
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+
+class OrderLog:
+    """Append orders to a JSONL file from a background writer thread"""
+    def __init__(self, path: str = "orders.jsonl", batch_size: int = 256,
+                 flush_interval: float = 0.5, max_pending: int = 10000, put_timeout: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.pending = queue.Queue(maxsize=max_pending)
+        # Held across the closed check and the put, so no order is queued after close() starts
+        self.lock = threading.Lock()
+        self.closed = False
+        self.writer = threading.Thread(target=self._run, name="order-log-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def record(self, order: dict):
+        # Only the queue put happens on the checkout path
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Order log is closed")
+            if not self.writer.is_alive():
+                raise RuntimeError("Order log writer has stopped")
+            try:
+                self.pending.put(order, timeout=self.put_timeout)
+            except queue.Full:
+                raise RuntimeError("Order log writer is not keeping up") from None
+
+    def _run(self):
+        with open(self.path, "a", buffering=1 << 16) as file:
+            done = False
+            while not done:
+                try:
+                    order = self.pending.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    file.flush()
+                    continue
+                batch = []
+                while order is not None:
+                    batch.append(json.dumps(order, separators=(",", ":")))
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        order = self.pending.get_nowait()
+                    except queue.Empty:
+                        break
+                if order is None:
+                    done = True
+                if batch:
+                    file.write("\n".join(batch) + "\n")
+            file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            # Once closed is set no record() can queue anything, so the stop marker can go last
+            self.closed = True
+        while self.writer.is_alive():
+            try:
+                self.pending.put(None, timeout=self.put_timeout)
+                break
+            except queue.Full:
+                continue
+        self.writer.join()
+
+
+def build_order(cart: dict, total_before_tax: float, total_after_tax: float,
+                timestamp: Optional[datetime] = None) -> dict:
+    """Turn a shopping cart into an order record"""
+    timestamp = timestamp or datetime.now()
+    items = []
+    for item_name, details in cart.items():
+        items.append({
+            "name": item_name,
+            "brand": details["brand"],
+            "category": details["category"],
+            "quantity": details["quantity"],
+            "subtotal": round(details["subtotal"], 2),
+            "tax": round(details["price"] - details["subtotal"], 2),
+            "total": round(details["price"], 2),
+        })
+    return {
+        "order_id": uuid.uuid4().hex,
+        "timestamp": timestamp.isoformat(timespec="seconds"),
+        "items": items,
+        "total_before_tax": round(total_before_tax, 2),
+        "total_after_tax": round(total_after_tax, 2),
+    }
+
+
+def read_orders(path: str = "orders.jsonl") -> Iterator[dict]:
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class OrderTotals:
+    def __init__(self):
+        self.revenue = 0.0
+        self.tax = 0.0
+        self.units = 0
+
+    def add(self, item: dict):
+        self.revenue += item["subtotal"]
+        self.tax += item["tax"]
+        self.units += item["quantity"]
+
+    def to_dict(self) -> dict:
+        return {"revenue": round(self.revenue, 2), "tax": round(self.tax, 2), "units": self.units}
+
+
+class OrderAggregator:
+    """Single-pass revenue, tax and unit totals per category, brand and day"""
+    def __init__(self):
+        self.orders = 0
+        self.overall = OrderTotals()
+        self.by_category: Dict[str, OrderTotals] = {}
+        self.by_brand: Dict[str, OrderTotals] = {}
+        self.by_day: Dict[str, OrderTotals] = {}
+
+    def add(self, order: dict):
+        self.orders += 1
+        day = order["timestamp"][:10]
+        for item in order["items"]:
+            self.overall.add(item)
+            for totals, key in ((self.by_category, item["category"]),
+                                (self.by_brand, item["brand"]),
+                                (self.by_day, day)):
+                if key not in totals:
+                    totals[key] = OrderTotals()
+                totals[key].add(item)
+
+    def consume(self, orders) -> "OrderAggregator":
+        for order in orders:
+            self.add(order)
+        return self
+
+    def summary(self) -> dict:
+        return {
+            "orders": self.orders,
+            "overall": self.overall.to_dict(),
+            "by_category": {key: totals.to_dict() for key, totals in self.by_category.items()},
+            "by_brand": {key: totals.to_dict() for key, totals in self.by_brand.items()},
+            "by_day": {key: totals.to_dict() for key, totals in sorted(self.by_day.items())},
+        }
+
+
+def aggregate_orders(path: str = "orders.jsonl") -> dict:
+    return OrderAggregator().consume(read_orders(path)).summary()
+
+
+if __name__ == "__main__":
+    import sys
+    print(json.dumps(aggregate_orders(sys.argv[1] if len(sys.argv) > 1 else "orders.jsonl"), indent=2))
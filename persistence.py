@@ -0,0 +1,167 @@
+import atexit
+import csv
+import os
+import stat
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from instrumentation import fsync, open_file, timed
+
+# Read once at import; os.umask can only be queried by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+Rows = Callable[[], Iterable[list]]
+
+
+def fsync_directory(directory: str):
+    # Makes the rename itself durable; not supported on Windows
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@timed("persistence.atomic_write")
+def atomic_write(path: str, rows: Iterable[list]):
+    """Write rows to a temp file next to path, fsync it and rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        # mkstemp creates the file as 0600; keep the mode the file had, or the one open() would give it
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(temp_path, mode)
+        with open_file(temp_path, "w", name=os.path.basename(path), newline="") as file:
+            csv.writer(file).writerows(rows)
+            fsync(file, os.path.basename(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+@timed("persistence.append")
+def append_rows(path: str, rows: Iterable[list]):
+    with open_file(path, "a", newline="") as file:
+        csv.writer(file).writerows(rows)
+        fsync(file, os.path.basename(path))
+
+
+class PendingFile:
+    __slots__ = ("rows", "appended")
+
+    def __init__(self):
+        self.rows: Optional[Rows] = None
+        self.appended: List[list] = []
+
+    def snapshot(self, attempts: int = 3) -> List[list]:
+        # rows() usually walks live dicts; a change of size mid-walk is retried,
+        # and the caller marks the file dirty again after any later change
+        for attempt in range(attempts):
+            try:
+                return [list(row) for row in self.rows()] + self.appended
+            except RuntimeError:
+                if attempt == attempts - 1:
+                    raise
+
+
+class CsvStore:
+    """Coalesces CSV rewrites and appends, writing each dirty file at most once per tick"""
+    def __init__(self, interval: float = 0.2, background: bool = True):
+        self.interval = interval
+        self.background = background
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending: Dict[str, PendingFile] = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        if background:
+            self.thread = threading.Thread(target=self._run, name="csv-flusher", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def replace(self, path: str, rows: Rows):
+        """Mark path dirty; rows() is called once by the flusher to produce the whole file"""
+        with self.lock:
+            pending = self.pending.setdefault(path, PendingFile())
+            # A newer snapshot already contains everything appended before it
+            pending.rows = rows
+            pending.appended = []
+        if not self.background:
+            self.flush()
+
+    def append(self, path: str, row: list):
+        with self.lock:
+            self.pending.setdefault(path, PendingFile()).appended.append(list(row))
+        if not self.background:
+            self.flush()
+
+    def extend(self, path: str, rows: Iterable[list]):
+        """Append a batch of rows under a single lock acquisition"""
+        batch = [list(row) for row in rows]
+        with self.lock:
+            self.pending.setdefault(path, PendingFile()).appended.extend(batch)
+        if not self.background:
+            self.flush()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            for path, changes in pending.items():
+                try:
+                    if changes.rows is not None:
+                        atomic_write(path, changes.snapshot())
+                    elif changes.appended:
+                        append_rows(path, changes.appended)
+                except Exception as error:
+                    # Any failure keeps the changes queued so the next tick retries them
+                    print(f"Error: could not save {path}: {error}")
+                    self._requeue(path, changes)
+
+    def _requeue(self, path: str, changes: PendingFile):
+        with self.lock:
+            newer = self.pending.get(path)
+            if newer is None:
+                self.pending[path] = changes
+            elif newer.rows is None:
+                newer.rows = changes.rows
+                newer.appended = changes.appended + newer.appended
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join()
+        self.flush()
+
+
+class NullStore:
+    """CsvStore stand-in that discards every write, for simulations and benchmarks"""
+    def replace(self, path: str, rows: Rows):
+        pass
+
+    def append(self, path: str, row: list):
+        pass
+
+    def extend(self, path: str, rows: Iterable[list]):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
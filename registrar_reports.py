@@ -0,0 +1,232 @@
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Iterable, List
+
+from course_times import DAY_NAMES, format_minutes, parse_meetings
+
+FILL_BUCKETS = 10
+
+
+class CourseInfo:
+    __slots__ = ("course_id", "name", "instructor", "max_students", "time", "roster")
+
+    def __init__(self, course_id: str, name: str, instructor: str, max_students: int, time: str):
+        self.course_id = course_id
+        self.name = name
+        self.instructor = instructor
+        self.max_students = max_students
+        self.time = time
+        self.roster: List[str] = []
+
+
+class RegistrarReport:
+    """Rosters, fill rates, instructor loads and time-slot demand built in one pass over students"""
+    def __init__(self):
+        self.courses: Dict[str, CourseInfo] = {}
+        self.students = 0
+        self.enrollments = 0
+        self.unknown_courses: Dict[str, int] = {}
+        # Malformed CSV rows per file; blank lines are not counted
+        self.skipped_rows: Dict[str, int] = {}
+
+    def skip_row(self, path: str):
+        self.skipped_rows[path] = self.skipped_rows.get(path, 0) + 1
+
+    def add_course(self, course_id: str, name: str, instructor: str, max_students: int, time: str = ""):
+        self.courses[course_id] = CourseInfo(course_id, name, instructor, max_students, time)
+
+    def add_student(self, student_id: str, registered_courses: Iterable[str]):
+        self.students += 1
+        for course_id in registered_courses:
+            course = self.courses.get(course_id)
+            if course is None:
+                self.unknown_courses[course_id] = self.unknown_courses.get(course_id, 0) + 1
+                continue
+            course.roster.append(student_id)
+            self.enrollments += 1
+
+    def rosters(self) -> Dict[str, List[str]]:
+        return {course_id: course.roster for course_id, course in self.courses.items()}
+
+    def fill_rates(self) -> dict:
+        rates = {}
+        buckets = [0] * (FILL_BUCKETS + 1)
+        for course_id, course in self.courses.items():
+            rate = len(course.roster) / course.max_students if course.max_students else 0.0
+            rates[course_id] = round(rate, 4)
+            # The last bucket only holds courses that are full or over capacity
+            buckets[min(int(rate * FILL_BUCKETS), FILL_BUCKETS)] += 1
+        labels = [f"{i * 10}-{i * 10 + 9}%" for i in range(FILL_BUCKETS)] + ["full"]
+        return {"courses": rates, "distribution": dict(zip(labels, buckets))}
+
+    def instructor_loads(self) -> Dict[str, dict]:
+        loads: Dict[str, dict] = {}
+        for course in self.courses.values():
+            load = loads.setdefault(course.instructor, {"courses": 0, "students": 0, "seats": 0})
+            load["courses"] += 1
+            load["students"] += len(course.roster)
+            load["seats"] += course.max_students
+        return loads
+
+    def time_slot_demand(self) -> Dict[str, dict]:
+        """Enrollments and seats per meeting block, e.g. "MWF 10:00 AM - 10:50 AM" """
+        demand: Dict[str, dict] = {}
+        for course in self.courses.values():
+            # Empty, "TBA" and unreadable times have no meetings and are counted under TBA
+            meetings = parse_meetings(course.time) or [None]
+            for meeting in meetings:
+                if meeting is None:
+                    key = "TBA"
+                else:
+                    days = "".join(DAY_NAMES[day] for day in meeting.days)
+                    key = f"{days} {format_minutes(meeting.start)} - {format_minutes(meeting.end)}"
+                slot = demand.setdefault(key, {"courses": 0, "students": 0, "seats": 0})
+                slot["courses"] += 1
+                slot["students"] += len(course.roster)
+                slot["seats"] += course.max_students
+        return demand
+
+    def summary(self) -> dict:
+        return {
+            "students": self.students,
+            "courses": len(self.courses),
+            "enrollments": self.enrollments,
+            "unknown_courses": self.unknown_courses,
+            "skipped_rows": self.skipped_rows,
+            "fill_rates": self.fill_rates(),
+            "instructor_loads": self.instructor_loads(),
+            "time_slot_demand": self.time_slot_demand(),
+        }
+
+    def export_json(self, path: str, include_rosters: bool = True):
+        report = self.summary()
+        if include_rosters:
+            report["rosters"] = self.rosters()
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    def export_csv(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "rosters.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["course_id", "student_id"])
+            for course_id, course in self.courses.items():
+                writer.writerows((course_id, student_id) for student_id in course.roster)
+        with open(os.path.join(directory, "fill_rates.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["course_id", "name", "instructor", "enrolled", "max_students", "fill_rate"])
+            rates = self.fill_rates()["courses"]
+            for course_id, course in self.courses.items():
+                writer.writerow([course_id, course.name, course.instructor, len(course.roster),
+                                 course.max_students, rates[course_id]])
+        for name, table in (("instructor_loads.csv", self.instructor_loads()),
+                            ("time_slot_demand.csv", self.time_slot_demand())):
+            with open(os.path.join(directory, name), "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["key", "courses", "students", "seats"])
+                for key, row in table.items():
+                    writer.writerow([key, row["courses"], row["students"], row["seats"]])
+
+
+def report_from_csv(students_path: str = "students.csv", courses_path: str = "courses.csv") -> RegistrarReport:
+    """Course metadata first, then one streaming pass over students.csv"""
+    report = RegistrarReport()
+    with open(courses_path, "r", newline="") as file:
+        for row in csv.reader(file):
+            if not row:
+                continue
+            if len(row) >= 6:
+                course_id, name, instructor, max_students, time = row[:5]
+            elif len(row) >= 4:  # Backward compatibility for files without time
+                course_id, name, instructor, max_students = row[:4]
+                time = ""
+            else:
+                report.skip_row(courses_path)
+                continue
+            try:
+                seats = int(max_students)
+            except ValueError:
+                report.skip_row(courses_path)
+                continue
+            report.add_course(course_id, name, instructor, seats, time)
+    with open(students_path, "r", newline="") as file:
+        for row in csv.reader(file):
+            if not row:
+                continue
+            if len(row) < 4:
+                report.skip_row(students_path)
+                continue
+            student_id, registered_courses = row[0], row[3]
+            report.add_student(student_id, registered_courses.split(',') if registered_courses else ())
+    return report
+
+
+def report_from_system(system) -> RegistrarReport:
+    report = RegistrarReport()
+    for course in system.courses.values():
+        report.add_course(course.course_id, course.name, course.instructor, course.max_students, course.time)
+    for student in system.students.values():
+        report.add_student(student.student_id, student.registered_courses)
+    return report
+
+
+def write_sample_data(directory: str, students: int, courses: int, per_student: int = 5, seed: int = 0):
+    rng = random.Random(seed)
+    patterns = ["MWF", "TTh", "MW"]
+    course_ids = [f"C{i:05d}" for i in range(courses)]
+    with open(os.path.join(directory, "courses.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        for i, course_id in enumerate(course_ids):
+            start = rng.randrange(8 * 60, 17 * 60, 60)
+            time = f"{rng.choice(patterns)} {format_minutes(start)} - {format_minutes(start + 50)}"
+            writer.writerow([course_id, f"Course {i}", f"Dr. {i % (courses // 3 or 1)}", 150, time, ""])
+    with open(os.path.join(directory, "students.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        for i in range(students):
+            writer.writerow([f"S{i:06d}", f"Student {i}", "x", ','.join(rng.sample(course_ids, per_student))])
+
+
+def benchmark(students: int = 50000, courses: int = 2000):
+    with tempfile.TemporaryDirectory() as directory:
+        write_sample_data(directory, students, courses)
+        start = time.perf_counter()
+        report = report_from_csv(os.path.join(directory, "students.csv"), os.path.join(directory, "courses.csv"))
+        loaded = time.perf_counter()
+        report.summary()
+        summarized = time.perf_counter()
+        report.export_csv(os.path.join(directory, "report"))
+        exported = time.perf_counter()
+    print(f"{students} students x {courses} courses, {report.enrollments} enrollments")
+    print(f"Streaming pass: {loaded - start:.3f} s")
+    print(f"Summaries:      {summarized - loaded:.3f} s")
+    print(f"CSV export:     {exported - summarized:.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registrar enrollment reports")
+    parser.add_argument("--students", default="students.csv")
+    parser.add_argument("--courses", default="courses.csv")
+    parser.add_argument("--json", help="write the full report to this JSON file")
+    parser.add_argument("--csv-dir", help="write one CSV per report into this directory")
+    parser.add_argument("--benchmark", action="store_true", help="time the 50k students x 2k courses case")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+    report = report_from_csv(args.students, args.courses)
+    if args.json:
+        report.export_json(args.json)
+    if args.csv_dir:
+        report.export_csv(args.csv_dir)
+    if not args.json and not args.csv_dir:
+        print(json.dumps(report.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import heapq
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from course_reg import EnrollmentSystem
+
+# Seniors register first, then juniors, sophomores and freshmen; unknown students go last
+CLASS_PRIORITY = {"senior": 0, "junior": 1, "sophomore": 2, "freshman": 3}
+
+
+def assign_time_tickets(student_ids: Iterable[str], opens_at: float, class_of: Callable[[str], str],
+                        class_spacing: float = 3600.0, rng: Optional[random.Random] = None) -> Dict[str, float]:
+    """Give every student a time ticket: priority class sets the window, order inside it is random"""
+    rng = rng or random.Random()
+    last = len(CLASS_PRIORITY)
+    return {student_id: opens_at + CLASS_PRIORITY.get(class_of(student_id), last) * class_spacing
+            + rng.random() * class_spacing
+            for student_id in student_ids}
+
+
+class Session:
+    __slots__ = ("student_id", "ticket_time", "rank", "arrived_at", "sequence", "admitted_at", "last_seen")
+
+    def __init__(self, student_id: str, ticket_time: float, arrived_at: float, sequence: int = 0,
+                 rank: int = 0):
+        self.student_id = student_id
+        self.ticket_time = ticket_time
+        # 1 for students without a time ticket, so they lose ties on ticket_time
+        self.rank = rank
+        self.arrived_at = arrived_at
+        self.sequence = sequence
+        self.admitted_at: Optional[float] = None
+        self.last_seen = arrived_at
+
+
+class AdmissionController:
+    """Bounded virtual queue in front of EnrollmentSystem, admitting sessions at a fixed rate"""
+    def __init__(self, system: EnrollmentSystem, rate: float = 50.0, burst: int = 50,
+                 max_queue: int = 10000, max_active: int = 500, idle_timeout: float = 900.0,
+                 tickets: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.time):
+        self.system = system
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_active = max_active
+        # Admitted sessions untouched for this long give their slot back
+        self.idle_timeout = idle_timeout
+        self.tickets = tickets or {}
+        # Students without a ticket queue behind the latest ticket, never ahead of a ticket holder
+        self.last_ticket = max(self.tickets.values(), default=float("-inf"))
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.refilled_at = clock()
+        self.queue: List[tuple] = []
+        self.waiting: Dict[str, Session] = {}
+        # Least recently seen first, so expiry only looks at the front
+        self.active: "OrderedDict[str, Session]" = OrderedDict()
+        self.sequence = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.waits = deque(maxlen=10000)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def arrive(self, student_id: str) -> bool:
+        """Join the queue; False when the queue is full and the student should retry later"""
+        with self.lock:
+            if student_id in self.waiting or student_id in self.active:
+                return True
+            if len(self.waiting) >= self.max_queue:
+                self.rejected += 1
+                return False
+            now = self.clock()
+            # Ties on ticket time go to whoever arrived first
+            self.sequence += 1
+            ticket_time = self.tickets.get(student_id)
+            if ticket_time is None:
+                session = Session(student_id, max(self.last_ticket, now), now, self.sequence, rank=1)
+            else:
+                session = Session(student_id, ticket_time, now, self.sequence)
+            self.waiting[student_id] = session
+            heapq.heappush(self.queue, (session.ticket_time, session.rank, session.sequence, session))
+            self._admit(now)
+            return True
+
+    def _is_stale(self, entry: tuple) -> bool:
+        # Left the queue before being admitted, or re-arrived with a newer session
+        session = entry[3]
+        return self.waiting.get(session.student_id) is not session
+
+    def _compact(self):
+        """Drop stale entries so the heap stays proportional to the number of waiting students"""
+        while self.queue and self._is_stale(self.queue[0]):
+            heapq.heappop(self.queue)
+        if len(self.queue) > 2 * len(self.waiting) + 16:
+            self.queue = [entry for entry in self.queue if not self._is_stale(entry)]
+            heapq.heapify(self.queue)
+
+    def _expire(self, now: float):
+        while self.active:
+            student_id, session = next(iter(self.active.items()))
+            if now - session.last_seen <= self.idle_timeout:
+                break
+            del self.active[student_id]
+            self.expired += 1
+
+    def _touch(self, student_id: str, now: float):
+        session = self.active.get(student_id)
+        if session is not None:
+            session.last_seen = now
+            self.active.move_to_end(student_id)
+
+    def _admit(self, now: float):
+        self._refill(now)
+        self._expire(now)
+        self._compact()
+        while (self.queue and self.tokens >= 1 and len(self.active) < self.max_active
+               and self.queue[0][0] <= now):
+            _, _, _, session = heapq.heappop(self.queue)
+            student_id = session.student_id
+            if self.waiting.get(student_id) is not session:
+                continue
+            del self.waiting[student_id]
+            session.admitted_at = session.last_seen = now
+            self.active[student_id] = session
+            self.tokens -= 1
+            self.admitted += 1
+            self.waits.append(now - session.arrived_at)
+
+    def poll(self, student_id: str) -> str:
+        """Return "admitted", "waiting" or "not queued" for a student's session"""
+        with self.lock:
+            now = self.clock()
+            self._admit(now)
+            if student_id in self.active:
+                self._touch(student_id, now)
+                return "admitted"
+            return "waiting" if student_id in self.waiting else "not queued"
+
+    def position(self, student_id: str) -> Optional[int]:
+        with self.lock:
+            session = self.waiting.get(student_id)
+            if session is None:
+                return None
+            # Same ordering as the heap
+            key = (session.ticket_time, session.rank, session.sequence)
+            return sum(1 for other in self.waiting.values()
+                       if (other.ticket_time, other.rank, other.sequence) < key) + 1
+
+    def enroll(self, student_id: str, course_id: str) -> bool:
+        if self.poll(student_id) != "admitted":
+            print("Error: Registration session has not been admitted yet")
+            return False
+        return self.system.enroll_student(student_id, course_id)
+
+    def drop(self, student_id: str, course_id: str) -> bool:
+        if self.poll(student_id) != "admitted":
+            print("Error: Registration session has not been admitted yet")
+            return False
+        return self.system.drop_course(student_id, course_id)
+
+    def leave(self, student_id: str):
+        with self.lock:
+            self.waiting.pop(student_id, None)
+            self.active.pop(student_id, None)
+            self._admit(self.clock())
+
+    def metrics(self) -> dict:
+        with self.lock:
+            self._admit(self.clock())
+            waits = sorted(self.waits)
+
+            def percentile(fraction: float) -> float:
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(fraction * len(waits)))]
+
+            return {
+                "queue_depth": len(self.waiting),
+                "active_sessions": len(self.active),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p50": percentile(0.50),
+                "wait_p95": percentile(0.95),
+                "wait_max": waits[-1] if waits else 0.0,
+            }
@@ -0,0 +1,405 @@
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from instrumentation import timed
+from persistence import CsvStore
+
+BID = "bid"
+ASK = "ask"
+DEFAULT_EVENT = "main"
+
+
+def valid_price(price: float) -> bool:
+    return math.isfinite(price) and price > 0
+
+
+def valid_quantity(quantity: int) -> bool:
+    return isinstance(quantity, int) and not isinstance(quantity, bool) and quantity > 0
+
+
+class Order:
+    __slots__ = ("order_id", "user_id", "side", "event_id", "ticket_type", "price", "quantity", "remaining", "seq", "active")
+
+    def __init__(self, order_id, user_id, side, event_id, ticket_type, price, quantity, seq):
+        self.order_id = order_id
+        self.user_id = user_id
+        self.side = side
+        self.event_id = event_id
+        self.ticket_type = ticket_type
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+        self.seq = seq
+        self.active = True
+
+    def __repr__(self) -> str:
+        return f"Order({self.order_id}, {self.side} {self.remaining}/{self.quantity} {self.ticket_type} @ {self.price:.2f} by {self.user_id})"
+
+
+class Fill:
+    __slots__ = ("event_id", "ticket_type", "price", "quantity", "buyer", "seller", "bid_id", "ask_id", "time")
+
+    def __init__(self, event_id, ticket_type, price, quantity, buyer, seller, bid_id, ask_id):
+        self.event_id = event_id
+        self.ticket_type = ticket_type
+        self.price = price
+        self.quantity = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.bid_id = bid_id
+        self.ask_id = ask_id
+        self.time = datetime.now()
+
+    def row(self) -> list:
+        return [self.event_id, self.ticket_type, f"{self.price:.2f}", self.quantity,
+                self.buyer, self.seller, self.bid_id, self.ask_id, self.time]
+
+
+class OrderBook:
+    """Bids and asks of one event and ticket type; best price first, then oldest first"""
+    def __init__(self):
+        # Bids are keyed on the negated price so both heaps pop the best order first
+        self.bids: List[Tuple[float, int, Order]] = []
+        self.asks: List[Tuple[float, int, Order]] = []
+
+    def add(self, order: Order):
+        if order.side == BID:
+            heapq.heappush(self.bids, (-order.price, order.seq, order))
+        else:
+            heapq.heappush(self.asks, (order.price, order.seq, order))
+
+    @staticmethod
+    def _best(heap) -> Optional[Order]:
+        # Cancelled and filled orders are dropped lazily when they reach the top
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def best_bid(self) -> Optional[Order]:
+        return self._best(self.bids)
+
+    def best_ask(self) -> Optional[Order]:
+        return self._best(self.asks)
+
+    def resting(self, side: str) -> Optional[Order]:
+        return self.best_ask() if side == BID else self.best_bid()
+
+    def depth(self, side: str) -> int:
+        heap = self.bids if side == BID else self.asks
+        return sum(entry[2].remaining for entry in heap if entry[2].active)
+
+
+class TicketSystemHoldings:
+    """Holdings of the single-event TicketSystem, read straight from User.tickets"""
+    def __init__(self, system):
+        self.system = system
+
+    def tickets(self, event_id: str, user_id: str) -> Optional[Dict[str, int]]:
+        user = self.system.users.get(user_id)
+        return user.tickets if user is not None else None
+
+    def account(self, event_id: str, user_id: str) -> Dict[str, int]:
+        return self.system.users[user_id].tickets
+
+    def limit(self, event_id: str) -> int:
+        return self.system.max_tickets
+
+    def ticket_types(self, event_id: str) -> Set[str]:
+        return set(self.system.ticket_types)
+
+    def commit(self, touched: Set[Tuple[str, str]]):
+        self.system.save_users()
+
+
+class CatalogHoldings:
+    """Holdings of an EventCatalog event"""
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def tickets(self, event_id: str, user_id: str) -> Optional[Dict[str, int]]:
+        if event_id not in self.catalog.events:
+            return None
+        # Looking a user up must not add an empty holding for them
+        return self.catalog.event(event_id).holdings.get(user_id, {})
+
+    def account(self, event_id: str, user_id: str) -> Dict[str, int]:
+        """Mutable ticket counts for a user about to receive tickets"""
+        return self.catalog.event(event_id).holdings.setdefault(user_id, {})
+
+    def limit(self, event_id: str) -> int:
+        return self.catalog.events[event_id].max_tickets
+
+    def ticket_types(self, event_id: str) -> Set[str]:
+        info = self.catalog.events.get(event_id)
+        return set(info.capacity) if info is not None else set()
+
+    def commit(self, touched: Set[Tuple[str, str]]):
+        for event_id in {event_id for event_id, _ in touched}:
+            self.catalog.event(event_id).save()
+        for event_id, user_id in touched:
+            inventory = self.catalog.event(event_id)
+            if not any(inventory.holdings.get(user_id, {}).values()):
+                inventory.holdings.pop(user_id, None)
+            self.catalog.holdings_changed(user_id, event_id, inventory.held(user_id))
+
+
+class ResaleExchange:
+    """Holders list tickets (asks) and buyers place bids, matched by price-time priority
+
+    Listed tickets and open bids are reserved up front so a user can never sell more tickets
+    than they hold or bid past the event's ticket limit. Matches move tickets between the two
+    holdings in one step under the exchange lock; fills and the changed holdings are written
+    out together every batch_size fills or on flush().
+    """
+    def __init__(self, holdings, store: Optional[CsvStore] = None, path: str = "resales.csv", batch_size: int = 100):
+        self.holdings = holdings
+        self.store = store or CsvStore()
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.RLock()
+        self.books: Dict[Tuple[str, str], OrderBook] = {}
+        self.orders: Dict[int, Order] = {}
+        self.listed: Dict[Tuple[str, str, str], int] = {}
+        self.bidding: Dict[Tuple[str, str], int] = {}
+        self.pending: List[Fill] = []
+        self.touched: Set[Tuple[str, str]] = set()
+        self.ids = itertools.count(1)
+        self.fills = 0
+
+    @classmethod
+    def for_ticket_system(cls, system, **kwargs):
+        return cls(TicketSystemHoldings(system), store=kwargs.pop("store", system.store), **kwargs)
+
+    @classmethod
+    def for_catalog(cls, catalog, **kwargs):
+        return cls(CatalogHoldings(catalog), store=kwargs.pop("store", catalog.store), **kwargs)
+
+    def book(self, event_id: str, ticket_type: str) -> OrderBook:
+        book = self.books.get((event_id, ticket_type))
+        if book is None:
+            book = self.books[(event_id, ticket_type)] = OrderBook()
+        return book
+
+    def _held(self, event_id: str, user_id: str) -> int:
+        tickets = self.holdings.tickets(event_id, user_id)
+        return sum(tickets.values()) if tickets else 0
+
+    def _reserve(self, order: Order, quantity: int):
+        if order.side == ASK:
+            key = (order.event_id, order.user_id, order.ticket_type)
+            self.listed[key] = self.listed.get(key, 0) + quantity
+            if not self.listed[key]:
+                del self.listed[key]
+        else:
+            key = (order.event_id, order.user_id)
+            self.bidding[key] = self.bidding.get(key, 0) + quantity
+            if not self.bidding[key]:
+                del self.bidding[key]
+
+    def _close(self, order: Order):
+        self._reserve(order, -order.remaining)
+        order.active = False
+        self.orders.pop(order.order_id, None)
+
+    @timed("resale.list")
+    def list_tickets(self, user_id: str, ticket_type: str, quantity: int, price: float,
+                     event_id: str = DEFAULT_EVENT) -> Optional[Order]:
+        with self.lock:
+            tickets = self.holdings.tickets(event_id, user_id)
+            if tickets is None or not valid_quantity(quantity):
+                print(f"{user_id}, you cannot list {quantity} {ticket_type} tickets.")
+                return None
+            if not valid_price(price):
+                print(f"{user_id}, {price} is not a valid price.")
+                return None
+            unlisted = tickets.get(ticket_type, 0) - self.listed.get((event_id, user_id, ticket_type), 0)
+            if unlisted < quantity:
+                print(f"{user_id}, you only have {unlisted} unlisted {ticket_type} tickets.")
+                return None
+            return self._submit(user_id, ASK, event_id, ticket_type, price, quantity)
+
+    @timed("resale.bid")
+    def place_bid(self, user_id: str, ticket_type: str, quantity: int, price: float,
+                  event_id: str = DEFAULT_EVENT) -> Optional[Order]:
+        with self.lock:
+            if self.holdings.tickets(event_id, user_id) is None or not valid_quantity(quantity):
+                print(f"{user_id}, you cannot bid for {quantity} {ticket_type} tickets.")
+                return None
+            if ticket_type not in self.holdings.ticket_types(event_id):
+                print(f"{user_id}, this event has no {ticket_type} tickets.")
+                return None
+            if not valid_price(price):
+                print(f"{user_id}, {price} is not a valid price.")
+                return None
+            committed = self._held(event_id, user_id) + self.bidding.get((event_id, user_id), 0)
+            if committed + quantity > self.holdings.limit(event_id):
+                print(f"{user_id}, this bid would take you past the max tickets limit.")
+                return None
+            return self._submit(user_id, BID, event_id, ticket_type, price, quantity)
+
+    def _submit(self, user_id, side, event_id, ticket_type, price, quantity) -> Order:
+        order_id = next(self.ids)
+        order = Order(order_id, user_id, side, event_id, ticket_type, price, quantity, order_id)
+        self._reserve(order, quantity)
+        self._match(order, self.book(event_id, ticket_type))
+        if order.active and order.remaining:
+            self.orders[order_id] = order
+            self.book(event_id, ticket_type).add(order)
+        else:
+            order.active = False
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return order
+
+    def _match(self, order: Order, book: OrderBook):
+        while order.remaining:
+            resting = book.resting(order.side)
+            if resting is None:
+                break
+            if order.side == BID and resting.price > order.price:
+                break
+            if order.side == ASK and resting.price < order.price:
+                break
+            if resting.user_id == order.user_id:
+                # Never trade with yourself; the older order is withdrawn
+                self._close(resting)
+                continue
+            bid, ask = (order, resting) if order.side == BID else (resting, order)
+            quantity = min(order.remaining, resting.remaining)
+            if not self._transfer(bid, ask, quantity, resting.price):
+                # The seller no longer holds the listed tickets (e.g. cancelled them)
+                self._close(ask)
+                if ask is order:
+                    break
+                continue
+            for filled in (order, resting):
+                filled.remaining -= quantity
+                self._reserve(filled, -quantity)
+            if not resting.remaining:
+                self._close(resting)
+
+    def _transfer(self, bid: Order, ask: Order, quantity: int, price: float) -> bool:
+        """Move quantity tickets from seller to buyer, changing neither if the seller falls short"""
+        seller = self.holdings.tickets(ask.event_id, ask.user_id)
+        if (seller is None or self.holdings.tickets(bid.event_id, bid.user_id) is None
+                or seller.get(ask.ticket_type, 0) < quantity):
+            return False
+        buyer = self.holdings.account(bid.event_id, bid.user_id)
+        seller[ask.ticket_type] -= quantity
+        buyer[bid.ticket_type] = buyer.get(bid.ticket_type, 0) + quantity
+        self.pending.append(Fill(ask.event_id, ask.ticket_type, price, quantity,
+                                 bid.user_id, ask.user_id, bid.order_id, ask.order_id))
+        self.touched.update(((ask.event_id, ask.user_id), (bid.event_id, bid.user_id)))
+        self.fills += 1
+        return True
+
+    def cancel(self, order_id: int) -> bool:
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return False
+            self._close(order)
+            return True
+
+    def open_orders(self, user_id: str) -> List[Order]:
+        with self.lock:
+            return sorted((order for order in self.orders.values() if order.user_id == user_id),
+                          key=lambda order: order.seq)
+
+    def quote(self, ticket_type: str, event_id: str = DEFAULT_EVENT) -> Tuple[Optional[float], Optional[float]]:
+        with self.lock:
+            book = self.book(event_id, ticket_type)
+            bid, ask = book.best_bid(), book.best_ask()
+            return (bid.price if bid else None, ask.price if ask else None)
+
+    @timed("resale.flush")
+    def flush(self):
+        """Persist pending fills together with the holdings they changed"""
+        with self.lock:
+            if not self.pending:
+                return
+            fills, self.pending = self.pending, []
+            touched, self.touched = self.touched, set()
+            self.holdings.commit(touched)
+            self.store.extend(self.path, (fill.row() for fill in fills))
+
+
+class DictHoldings:
+    """In-memory holdings for the benchmark"""
+    def __init__(self, users: Dict[str, Dict[str, int]], max_tickets: int, ticket_types=("VIP", "Regular")):
+        self.users = users
+        self.max_tickets = max_tickets
+        self.types = set(ticket_types)
+        self.commits = 0
+
+    def tickets(self, event_id: str, user_id: str) -> Optional[Dict[str, int]]:
+        return self.users.get(user_id)
+
+    def account(self, event_id: str, user_id: str) -> Dict[str, int]:
+        return self.users[user_id]
+
+    def limit(self, event_id: str) -> int:
+        return self.max_tickets
+
+    def ticket_types(self, event_id: str) -> Set[str]:
+        return self.types
+
+    def commit(self, touched: Set[Tuple[str, str]]):
+        self.commits += 1
+
+
+def benchmark(orders: int = 200000, users: int = 5000, batch_size: int = 500, seed: int = 1):
+    rng = random.Random(seed)
+    holdings = DictHoldings({f"user{i}": {"VIP": rng.randint(0, 4), "Regular": rng.randint(0, 4)}
+                             for i in range(users)}, max_tickets=10 ** 9)
+    names = list(holdings.users)
+    script = [(rng.choice(names), rng.random() < 0.5, rng.choice(("VIP", "Regular")),
+               rng.randint(1, 3), round(rng.gauss(100, 10), 2)) for _ in range(orders)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = CsvStore(background=False)
+        exchange = ResaleExchange(holdings, store=store, path=os.path.join(directory, "resales.csv"),
+                                  batch_size=batch_size)
+        accepted = 0
+        start = time.perf_counter()
+        # Rejected orders print a message, which would otherwise dominate the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            for user_id, selling, ticket_type, quantity, price in script:
+                if selling:
+                    order = exchange.list_tickets(user_id, ticket_type, quantity, price)
+                else:
+                    order = exchange.place_bid(user_id, ticket_type, quantity, price)
+                accepted += order is not None
+            exchange.flush()
+        elapsed = time.perf_counter() - start
+        store.close()
+    return {"orders": orders, "accepted": accepted, "fills": exchange.fills,
+            "writes": holdings.commits, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ticket resale matching engine")
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    result = benchmark(args.orders, args.users, args.batch_size, args.seed)
+    seconds = result["seconds"]
+    print(f"{result['orders']} orders ({result['accepted']} accepted), {result['fills']} fills, "
+          f"{result['writes']} batched writes")
+    print(f"{seconds:.3f}s, {result['accepted'] / seconds:,.0f} orders/s, {result['fills'] / seconds:,.0f} fills/s")
+
+
+if __name__ == "__main__":
+    main()
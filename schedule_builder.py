@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional
+
+from conflict_matrix import ConflictMatrix
+from course_reg import EnrollmentSystem
+
+
+class Schedule:
+    def __init__(self, course_ids: List[str], priority: float, skipped: Dict[str, str]):
+        self.course_ids = course_ids
+        self.priority = priority
+        self.skipped = skipped
+
+    def __repr__(self) -> str:
+        return f"Schedule(Courses: {self.course_ids}, Priority: {self.priority}, Skipped: {self.skipped})"
+
+
+class ScheduleBuilder:
+    """Pick the highest-priority conflict-free set of open courses from a wish list"""
+    def __init__(self, system: EnrollmentSystem, cache_size: int = 1024):
+        self.system = system
+        self.cache_size = cache_size
+        self.cache: Dict[tuple, Schedule] = {}
+        self.matrix: Optional[ConflictMatrix] = None
+        self.matrix_times: Dict[str, str] = {}
+
+    def conflict_matrix(self, course_ids) -> ConflictMatrix:
+        """The catalog's conflict matrix, rebuilt when any of these courses is new or was retimed"""
+        courses = self.system.courses
+        if self.matrix is None or any(self.matrix_times.get(course_id) != courses[course_id].time
+                                      for course_id in course_ids):
+            # Same rule as EnrollmentSystem.get_time_conflict; courses without a time never conflict
+            self.matrix = ConflictMatrix.from_courses(courses, same_course_conflicts=False)
+            self.matrix_times = {course_id: course.time for course_id, course in courses.items()}
+        return self.matrix
+
+    def build(self, student_id: Optional[str], wish_list: Dict[str, float],
+              max_courses: Optional[int] = None) -> Schedule:
+        """wish_list maps course ID to priority; higher priorities are preferred"""
+        key = (student_id, frozenset(wish_list.items()), max_courses, self.system.version)
+        if key in self.cache:
+            return self.cache[key]
+        schedule = self._build(student_id, wish_list, max_courses)
+        if len(self.cache) >= self.cache_size:
+            # Entries for older availability versions can never be hit again
+            self.cache = {k: v for k, v in self.cache.items() if k[-1] == self.system.version}
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+        self.cache[key] = schedule
+        return schedule
+
+    def _build(self, student_id, wish_list, max_courses) -> Schedule:
+        registered = set()
+        if student_id is not None:
+            registered = self.system.students[student_id].registered_courses
+        known = [course_id for course_id in wish_list if course_id in self.system.courses]
+        matrix = self.conflict_matrix(list(registered) + known)
+        fixed = matrix.schedule_mask(registered)
+
+        skipped = {}
+        candidates = []
+        for course_id, priority in wish_list.items():
+            course = self.system.courses.get(course_id)
+            if course is None:
+                skipped[course_id] = "not found"
+            elif course_id in registered:
+                skipped[course_id] = "already enrolled"
+            elif len(course.enrolled_students) >= course.max_students:
+                skipped[course_id] = "full"
+            elif matrix.conflicts(fixed, course_id):
+                skipped[course_id] = "time conflict with a registered course"
+            else:
+                candidates.append((priority, course_id))
+        candidates.sort(reverse=True)
+
+        count = len(candidates)
+        priorities = [priority for priority, _ in candidates]
+        # Each candidate's matrix row, renumbered to candidate positions for the search below
+        positions = [matrix.index[course_id] for _, course_id in candidates]
+        conflicts = [0] * count
+        for i in range(count):
+            row = matrix.rows[positions[i]]
+            for j in range(count):
+                if j != i and row >> positions[j] & 1:
+                    conflicts[i] |= 1 << j
+        limit = count if max_courses is None else max_courses
+
+        best = [0.0, 0, 0]  # priority, number of courses, chosen mask
+
+        def bound(index, blocked, taken):
+            # Candidates are sorted by priority, so the best case takes the next open ones;
+            # zero-priority courses add nothing to the total but still count towards the course tiebreak
+            total = 0.0
+            extra = 0
+            for i in range(index, count):
+                if taken + extra == limit:
+                    break
+                if not blocked >> i & 1:
+                    total += max(priorities[i], 0)
+                    extra += 1
+            return total, extra
+
+        def search(index, chosen, blocked, total, taken):
+            if (total, taken) > (best[0], best[1]):
+                best[:] = [total, taken, chosen]
+            if index == count or taken == limit:
+                return
+            extra_priority, extra_courses = bound(index, blocked, taken)
+            if (total + extra_priority, taken + extra_courses) <= (best[0], best[1]):
+                return
+            bit = 1 << index
+            if not blocked & bit:
+                search(index + 1, chosen | bit, blocked | conflicts[index], total + priorities[index], taken + 1)
+            search(index + 1, chosen, blocked, total, taken)
+
+        search(0, 0, 0, 0.0, 0)
+        chosen = [candidates[i][1] for i in range(count) if best[2] >> i & 1]
+        for i in range(count):
+            if not best[2] >> i & 1:
+                skipped[candidates[i][1]] = "not in best schedule"
+        return Schedule(chosen, best[0], skipped)
+
+    def enroll(self, student_id: str, schedule: Schedule) -> List[str]:
+        """Enroll in every course of a built schedule, returning the ones that succeeded"""
+        return [course_id for course_id in schedule.course_ids
+                if self.system.enroll_student(student_id, course_id)]
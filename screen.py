@@ -0,0 +1,142 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Home the cursor, then clear the screen; same effect as `clear` without starting a shell
+CLEAR = "\033[H\033[2J"
+
+
+def enable_ansi():
+    # An empty os.system call switches the Windows console into ANSI escape mode
+    if os.name == "nt":
+        os.system("")
+
+
+class Screen:
+    """Builds one screen in a private buffer and writes it to the terminal with a single call
+
+    Code inside frame() prints with file= set to the buffer it yields; sys.stdout itself is never
+    swapped, so output from other threads still goes straight to the terminal.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.ansi = False
+        self.frames = 0
+        self.writes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def render(self, text: str, stream=None):
+        if not text:
+            return
+        stream = stream or self.stream or sys.stdout
+        if not self.ansi:
+            enable_ansi()
+            self.ansi = True
+        start = time.perf_counter()
+        stream.write(text)
+        stream.flush()
+        self.seconds += time.perf_counter() - start
+        self.frames += 1
+        self.writes += 1
+        self.bytes += len(text)
+
+    @contextlib.contextmanager
+    def frame(self, clear: bool = True, stream=None):
+        buffer = io.StringIO()
+        if clear:
+            buffer.write(CLEAR)
+        try:
+            yield buffer
+        finally:
+            self.render(buffer.getvalue(), stream)
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "writes": self.writes, "bytes": self.bytes,
+                "seconds_per_frame": self.seconds / self.frames if self.frames else 0.0}
+
+
+# Shared by the course registration and ticket menus
+screen = Screen()
+
+
+class CountingRaw(io.RawIOBase):
+    """Raw stream that counts write() calls, i.e. the write syscalls a real terminal would see"""
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self.calls += 1
+        self.bytes += len(data)
+        return len(data)
+
+
+def terminal_stream():
+    # stdout on a terminal is line buffered, so every print() ends in its own write
+    raw = CountingRaw()
+    return raw, io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8", line_buffering=True)
+
+
+@contextlib.contextmanager
+def quiet_fd(fd: int):
+    """Point a file descriptor at /dev/null so child processes like `clear` stay silent"""
+    saved = os.dup(fd)
+    null = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(null, fd)
+        yield
+    finally:
+        os.dup2(saved, fd)
+        os.close(saved)
+        os.close(null)
+
+
+def benchmark(frames: int = 200):
+    """Time the course listing screen drawn the old way and through a Screen frame"""
+    from course_reg import EnrollmentSystem
+    from persistence import NullStore
+
+    with tempfile.TemporaryDirectory() as directory:
+        system = EnrollmentSystem(NullStore(), directory=directory)
+
+    results = {}
+    raw, stream = terminal_stream()
+    with quiet_fd(1), quiet_fd(2), contextlib.redirect_stdout(stream):
+        start = time.perf_counter()
+        for _ in range(frames):
+            os.system('cls' if os.name == 'nt' else 'clear')
+            system.view_available_courses()
+        stream.flush()
+        results["os.system + print"] = (time.perf_counter() - start, raw.calls, frames)
+
+    raw, stream = terminal_stream()
+    buffered = Screen(stream)
+    start = time.perf_counter()
+    for _ in range(frames):
+        with buffered.frame() as out:
+            system.view_available_courses(file=out)
+    results["Screen.frame"] = (time.perf_counter() - start, raw.calls, 0)
+
+    print(f"Course listing screen, {frames} redraws")
+    print(f"{'Method':<20} {'ms/screen':>10} {'writes/screen':>14} {'spawns/screen':>14}")
+    for name, (elapsed, writes, spawned) in results.items():
+        print(f"{name:<20} {elapsed / frames * 1000:>10.3f} {writes / frames:>14.1f} {spawned / frames:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure redraw cost of the menu screens")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.frames)
+
+
+if __name__ == "__main__":
+    main()
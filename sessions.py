@@ -0,0 +1,174 @@
+import argparse
+import secrets
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+
+
+class Session:
+    __slots__ = ("token", "user_id", "created_at", "last_seen")
+
+    def __init__(self, token: str, user_id: str, now: float):
+        self.token = token
+        self.user_id = user_id
+        self.created_at = now
+        self.last_seen = now
+
+
+class SessionManager:
+    """Opaque login tokens with idle expiry and a hard cap on live sessions
+
+    Sessions are kept in least-recently-used order, so both idle expiry and capacity eviction
+    only ever look at the front of the table. A background sweeper drops idle sessions every
+    sweep_interval seconds; it starts with the first login.
+    """
+    def __init__(self, idle_ttl: float = 1800.0, max_sessions: int = 50000,
+                 sweep_interval: Optional[float] = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.by_user: Dict[str, Set[str]] = {}
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def start(self):
+        if self.thread is None and self.sweep_interval:
+            self.thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+            self.thread.start()
+        return self
+
+    def create(self, user_id: str) -> str:
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            now = self.clock()
+            self._sweep(now)
+            while len(self.sessions) >= self.max_sessions:
+                _, oldest = self.sessions.popitem(last=False)
+                self._forget(oldest)
+                self.evicted += 1
+            self.sessions[token] = Session(token, user_id, now)
+            self.by_user.setdefault(user_id, set()).add(token)
+            self.created += 1
+        self.start()
+        return token
+
+    def get(self, token: Optional[str]) -> Optional[str]:
+        """The session's user ID, refreshing its idle timer; None if unknown or expired"""
+        if token is None:
+            return None
+        with self.lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return None
+            now = self.clock()
+            if now - session.last_seen > self.idle_ttl:
+                del self.sessions[token]
+                self._forget(session)
+                self.expired += 1
+                return None
+            session.last_seen = now
+            self.sessions.move_to_end(token)
+            return session.user_id
+
+    def end(self, token: Optional[str]) -> bool:
+        with self.lock:
+            session = self.sessions.pop(token, None)
+            if session is None:
+                return False
+            self._forget(session)
+            return True
+
+    def end_user(self, user_id: str) -> int:
+        """Log a user out everywhere; returns how many sessions were ended"""
+        with self.lock:
+            tokens = self.by_user.pop(user_id, set())
+            for token in tokens:
+                del self.sessions[token]
+            return len(tokens)
+
+    def active_for(self, user_id: str) -> int:
+        with self.lock:
+            return len(self.by_user.get(user_id, ()))
+
+    def _forget(self, session: Session):
+        tokens = self.by_user.get(session.user_id)
+        if tokens is not None:
+            tokens.discard(session.token)
+            if not tokens:
+                del self.by_user[session.user_id]
+
+    def _sweep(self, now: float) -> int:
+        # The front of the table is the least recently seen, so stop at the first live session
+        removed = 0
+        while self.sessions:
+            token, session = next(iter(self.sessions.items()))
+            if now - session.last_seen <= self.idle_ttl:
+                break
+            del self.sessions[token]
+            self._forget(session)
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def sweep(self) -> int:
+        with self.lock:
+            return self._sweep(self.clock())
+
+    def _run(self):
+        while not self.stopped.wait(self.sweep_interval):
+            self.sweep()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"active": len(self.sessions), "users": len(self.by_user), "created": self.created,
+                    "expired": self.expired, "evicted": self.evicted}
+
+
+def benchmark(sessions: int = 50000, lookups: int = 500000):
+    manager = SessionManager(max_sessions=sessions, sweep_interval=None)
+    tracemalloc.start()
+    start = time.perf_counter()
+    tokens = [manager.create(f"user{i}") for i in range(sessions)]
+    created = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(lookups):
+        manager.get(tokens[(i * 7919) % sessions])
+    looked_up = time.perf_counter() - start
+
+    # Past the cap, every login evicts the least recently used session instead of growing
+    for i in range(sessions // 10):
+        manager.create(f"extra{i}")
+    print(f"{sessions} sessions: {size / 2 ** 20:.1f} MiB, {size / sessions:.0f} bytes each")
+    print(f"create: {sessions / created:,.0f}/s, lookup: {lookups / looked_up:,.0f}/s")
+    print(f"after {sessions // 10} more logins: {manager.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure session table memory and lookup speed")
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=500000)
+    args = parser.parse_args()
+    benchmark(args.sessions, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import contextlib
+import copy
+import random
+import time
+import tracemalloc
+
+from assignment2 import products, shopping
+
+ACTIONS = ["browse", "add", "out_of_stock", "cancel"]
+
+
+class NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def bench_inventory():
+    # Plenty of stock so adds never run dry, plus one sold-out item per category
+    inventory = copy.deepcopy(products)
+    for category, product_list in inventory.items():
+        for product in product_list:
+            product["quantity"] = 10 ** 9
+        product_list.append({"index": len(product_list), "name": "Sold Out Item",
+                             "brand": "Nobody", "price": 1.00, "quantity": 0})
+    return inventory
+
+
+def make_session(rng, inventory, mix, steps):
+    """Build the prompt answers for one session; every session ends with a checkout"""
+    categories = list(inventory)
+    answers = []
+    kinds = rng.choices(ACTIONS, weights=[mix[action] for action in ACTIONS], k=steps)
+    for kind in kinds:
+        category = rng.choice(categories)
+        in_stock = [p["index"] for p in inventory[category] if p["quantity"] > 0]
+        sold_out = [p["index"] for p in inventory[category] if p["quantity"] <= 0]
+        if kind == "browse":
+            answers += [category, "c"]
+        elif kind == "add":
+            answers += [category, str(rng.choice(in_stock)), str(rng.randint(1, 3)), "yes"]
+        elif kind == "out_of_stock" and sold_out:
+            answers += [category, str(rng.choice(sold_out)), "item"]
+        else:
+            # Asking for more than is in stock and backing out
+            index = rng.choice(in_stock)
+            too_many = inventory[category][index]["quantity"] + 1
+            answers += [category, str(index), str(too_many), "c"]
+    category = rng.choice(categories)
+    in_stock = [p["index"] for p in inventory[category] if p["quantity"] > 0]
+    answers += [category, str(rng.choice(in_stock)), "1", "no"]
+    return answers
+
+
+class TimedScript:
+    """Feed scripted answers to shopping() and time the work between prompts"""
+    def __init__(self, answers, latencies):
+        self.answers = iter(answers)
+        self.latencies = latencies
+        self.last = time.perf_counter()
+
+    def __call__(self, prompt=""):
+        now = time.perf_counter()
+        self.latencies.append(now - self.last)
+        answer = next(self.answers)
+        self.last = time.perf_counter()
+        return answer
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run(sessions, mix, steps, seed, allocations):
+    rng = random.Random(seed)
+    inventory = bench_inventory()
+    scripts = [make_session(rng, inventory, mix, steps) for _ in range(sessions)]
+    latencies = []
+
+    with contextlib.redirect_stdout(NullWriter()):
+        start = time.perf_counter()
+        for answers in scripts:
+            shopping(TimedScript(answers, latencies), inventory)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Sessions: {sessions} ({steps} steps each, mix {mix})")
+    print(f"Sessions per second: {sessions / elapsed:.1f}")
+    print(f"Prompts answered: {len(latencies)}")
+    for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        print(f"Step latency {label}: {percentile(latencies, fraction) * 1e6:.1f} us")
+
+    if allocations:
+        # Separate pass, tracemalloc slows everything down
+        sample = scripts[:min(len(scripts), 200)]
+        with contextlib.redirect_stdout(NullWriter()):
+            tracemalloc.start()
+            for answers in sample:
+                shopping(TimedScript(answers, []), inventory)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"Allocations: peak {peak / 1024:.1f} KiB, retained {current / len(sample):.0f} B/session")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic shopping sessions")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--browse", type=float, default=0.4)
+    parser.add_argument("--add", type=float, default=0.4)
+    parser.add_argument("--out-of-stock", type=float, default=0.1)
+    parser.add_argument("--cancel", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--allocations", action="store_true")
+    args = parser.parse_args()
+    mix = {"browse": args.browse, "add": args.add,
+           "out_of_stock": args.out_of_stock, "cancel": args.cancel}
+    run(args.sessions, mix, args.steps, args.seed, args.allocations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import MutableMapping
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ticket_analytics import COUNTERS, SalesCounters
+
+MAGIC = b"RSNP"
+VERSION = 1
+KIND_ENROLLMENT = 1
+KIND_TICKETS = 2
+
+HEADER = struct.Struct("<4sHHI")        # magic, version, kind, number of sections
+SECTION = struct.Struct("<8sQQ")        # name, byte offset, size in bytes
+
+# Fixed-width records, every field a uint32 (strings are indexes into the string table)
+STUDENT_FIELDS = 5   # id, name, password, first course link, course link count
+COURSE_FIELDS = 7    # id, name, instructor, max students, time, first student link, link count
+USER_FIELDS = 4      # name, password, first ticket entry, ticket entry count
+TICKET_FIELDS = 2    # ticket type, count
+AVAILABILITY_FIELDS = 2
+SALES_FIELDS = 1 + len(COUNTERS)  # ticket type, then one count per counter
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class StringTable:
+    """Interns strings while writing; each distinct string is stored once"""
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def __call__(self, text: str) -> int:
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.strings)
+            self.strings.append(text.encode())
+        return position
+
+    def sections(self) -> Dict[str, bytes]:
+        offsets = array("I", [0])
+        for encoded in self.strings:
+            offsets.append(offsets[-1] + len(encoded))
+        return {"stroffs": to_bytes(offsets), "strings": b"".join(self.strings)}
+
+
+def uint32(value: int, what: str) -> int:
+    # array("I") would raise a bare OverflowError; say which field was out of range instead
+    if not 0 <= value <= 0xFFFFFFFF:
+        raise SnapshotError(f"{what} {value} does not fit in an unsigned 32-bit field")
+    return value
+
+
+def snapshot_is_current(path: str, sources) -> bool:
+    """True if the snapshot exists and was written after every source CSV; ties go to the CSVs"""
+    if not os.path.exists(path):
+        return False
+    written = os.path.getmtime(path)
+    return all(not os.path.exists(source) or os.path.getmtime(source) < written for source in sources)
+
+
+def to_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_snapshot(path: str, kind: int, sections: Dict[str, bytes]):
+    """Write sections after a header and section table, then atomically replace path"""
+    names = list(sections)
+    position = HEADER.size + SECTION.size * len(names)
+    table = []
+    for name in names:
+        # Keep every section 8-byte aligned so uint32 views never straddle a boundary
+        position += -position % 8
+        table.append((name, position, len(sections[name])))
+        position += len(sections[name])
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, kind, len(names)))
+            for name, offset, size in table:
+                file.write(SECTION.pack(name.encode(), offset, size))
+            for name, offset, size in table:
+                file.write(b"\0" * (offset - file.tell()))
+                file.write(sections[name])
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class SnapshotReader:
+    """Memory-mapped snapshot; pages are only read when a record is touched"""
+    def __init__(self, path: str, kind: int):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, found_kind, count = HEADER.unpack_from(self.view, 0)
+        if magic != MAGIC or version != VERSION or found_kind != kind:
+            raise SnapshotError(f"{path} is not a version {VERSION} snapshot of the expected kind")
+        self.sections = {}
+        for i in range(count):
+            name, offset, size = SECTION.unpack_from(self.view, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode()] = self.view[offset:offset + size]
+        self.offsets = self.uints("stroffs")
+        self.blob = self.sections["strings"]
+
+    def uints(self, name: str):
+        section = self.sections[name]
+        if sys.byteorder == "little":
+            return section.cast("I")
+        values = array("I", section.tobytes())
+        values.byteswap()
+        return values
+
+    def string(self, index: int) -> str:
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+
+class LazyRecords(MutableMapping):
+    """Dict-like view over sorted snapshot records that builds objects on first access"""
+    def __init__(self, count: int, key_of: Callable[[int], str], build: Callable[[int], object]):
+        self.count = count
+        self.key_of = key_of
+        self.build = build
+        self.loaded: Dict[str, object] = {}
+        self.added: Dict[str, None] = {}
+        self.removed = set()
+
+    def find(self, key: str) -> int:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_of(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.count and self.key_of(low) == key else -1
+
+    def __getitem__(self, key):
+        if key in self.loaded:
+            return self.loaded[key]
+        if key in self.removed:
+            raise KeyError(key)
+        index = self.find(key)
+        if index < 0:
+            raise KeyError(key)
+        value = self.loaded[key] = self.build(index)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.loaded and key not in self.removed and self.find(key) < 0:
+            self.added[key] = None
+        self.removed.discard(key)
+        self.loaded[key] = value
+
+    def __delitem__(self, key):
+        self[key]
+        del self.loaded[key]
+        if key in self.added:
+            del self.added[key]
+        else:
+            self.removed.add(key)
+
+    def __contains__(self, key):
+        if key in self.loaded:
+            return True
+        return key not in self.removed and self.find(key) >= 0
+
+    def __iter__(self):
+        for index in range(self.count):
+            key = self.key_of(index)
+            if key not in self.removed:
+                yield key
+        yield from list(self.added)
+
+    def __len__(self):
+        return self.count - len(self.removed) + len(self.added)
+
+
+def save_enrollment_snapshot(system, path: str):
+    strings = StringTable()
+    student_ids = sorted(system.students)
+    course_ids = sorted(system.courses)
+    student_index = {student_id: i for i, student_id in enumerate(student_ids)}
+    course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+
+    students, student_links = array("I"), array("I")
+    for student_id in student_ids:
+        student = system.students[student_id]
+        links = [course_index[c] for c in sorted(student.registered_courses) if c in course_index]
+        students.extend([strings(student_id), strings(student.name), strings(student.password),
+                         len(student_links), len(links)])
+        student_links.extend(links)
+
+    courses, course_links = array("I"), array("I")
+    for course_id in course_ids:
+        course = system.courses[course_id]
+        links = [student_index[s] for s in sorted(course.enrolled_students) if s in student_index]
+        courses.extend([strings(course_id), strings(course.name), strings(course.instructor),
+                        uint32(course.max_students, f"{course_id} max_students"), strings(course.time),
+                        len(course_links), len(links)])
+        course_links.extend(links)
+
+    sections = strings.sections()
+    sections.update({"students": to_bytes(students), "courses": to_bytes(courses),
+                     "s_links": to_bytes(student_links), "c_links": to_bytes(course_links)})
+    write_snapshot(path, KIND_ENROLLMENT, sections)
+
+
+def load_enrollment_snapshot(path: str, graph=None):
+    """(students, courses) mappings backed by the memory-mapped snapshot; links go into graph"""
+    from course_reg import Course, Student
+    from enrollment_graph import EnrollmentGraph
+
+    graph = graph if graph is not None else EnrollmentGraph()
+
+    reader = SnapshotReader(path, KIND_ENROLLMENT)
+    students, courses = reader.uints("students"), reader.uints("courses")
+    student_links, course_links = reader.uints("s_links"), reader.uints("c_links")
+    student_count = len(students) // STUDENT_FIELDS
+    course_count = len(courses) // COURSE_FIELDS
+
+    def student_id(i):
+        return reader.string(students[i * STUDENT_FIELDS])
+
+    def course_id(i):
+        return reader.string(courses[i * COURSE_FIELDS])
+
+    def build_student(i):
+        base = i * STUDENT_FIELDS
+        student = Student(reader.string(students[base]), reader.string(students[base + 1]),
+                          reader.string(students[base + 2]), graph)
+        first, count = students[base + 3], students[base + 4]
+        student.registered_courses = {course_id(c) for c in student_links[first:first + count]}
+        return student
+
+    def build_course(i):
+        base = i * COURSE_FIELDS
+        course = Course(reader.string(courses[base]), reader.string(courses[base + 1]),
+                        reader.string(courses[base + 2]), courses[base + 3], reader.string(courses[base + 4]), graph)
+        first, count = courses[base + 5], courses[base + 6]
+        course.enrolled_students = {student_id(s) for s in course_links[first:first + count]}
+        return course
+
+    return (LazyRecords(student_count, student_id, build_student),
+            LazyRecords(course_count, course_id, build_course))
+
+
+def save_ticket_snapshot(system, path: str, log_size: int = 0):
+    """log_size is the size of transactions.csv the sales counters were built from"""
+    strings = StringTable()
+    users, tickets = array("I"), array("I")
+    for name in sorted(system.users):
+        user = system.users[name]
+        users.extend([strings(name), strings(user.password), len(tickets) // TICKET_FIELDS, len(user.tickets)])
+        for ticket_type, count in user.tickets.items():
+            tickets.extend([strings(ticket_type), uint32(count, f"{name} {ticket_type} tickets")])
+    availability = array("I")
+    for ticket_type, count in system.ticket_availability.items():
+        availability.extend([strings(ticket_type), uint32(count, f"{ticket_type} availability")])
+
+    sales = array("I")
+    for ticket_type, counts in system.sales.counts.items():
+        sales.append(strings(ticket_type))
+        sales.extend(uint32(counts[counter], f"{ticket_type} {counter}") for counter in COUNTERS)
+
+    sections = strings.sections()
+    sections.update({"users": to_bytes(users), "tickets": to_bytes(tickets),
+                     "avail": to_bytes(availability), "sales": to_bytes(sales),
+                     "logsize": to_bytes(array("Q", [log_size]))})
+    write_snapshot(path, KIND_TICKETS, sections)
+
+
+def load_ticket_snapshot(path: str):
+    """(users mapping backed by the snapshot, ticket availability dict)"""
+    from temp_term_project import User
+
+    reader = SnapshotReader(path, KIND_TICKETS)
+    users, tickets, availability = reader.uints("users"), reader.uints("tickets"), reader.uints("avail")
+
+    def user_name(i):
+        return reader.string(users[i * USER_FIELDS])
+
+    def build_user(i):
+        base = i * USER_FIELDS
+        user = User(reader.string(users[base]), reader.string(users[base + 1]))
+        first, count = users[base + 2], users[base + 3]
+        user.tickets = {reader.string(tickets[(first + t) * TICKET_FIELDS]): tickets[(first + t) * TICKET_FIELDS + 1]
+                        for t in range(count)}
+        return user
+
+    ticket_availability = {reader.string(availability[i]): availability[i + 1]
+                           for i in range(0, len(availability), AVAILABILITY_FIELDS)}
+    return LazyRecords(len(users) // USER_FIELDS, user_name, build_user), ticket_availability
+
+
+def load_ticket_sales(path: str) -> Optional[Tuple[SalesCounters, int]]:
+    """(sales counters, transactions.csv size they cover), or None for snapshots saved without them"""
+    reader = SnapshotReader(path, KIND_TICKETS)
+    if "sales" not in reader.sections or "logsize" not in reader.sections:
+        return None
+    sales = reader.uints("sales")
+    counters = SalesCounters()
+    for base in range(0, len(sales), SALES_FIELDS):
+        counters.counts[reader.string(sales[base])] = dict(zip(COUNTERS, sales[base + 1:base + SALES_FIELDS]))
+    log_size = array("Q", reader.sections["logsize"].tobytes())
+    if sys.byteorder != "little":
+        log_size.byteswap()
+    return counters, log_size[0]
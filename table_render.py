@@ -0,0 +1,141 @@
+import sys
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class ColumnWidth:
+    """Track the widest value of a column as rows are added and removed"""
+    def __init__(self, fixed: Optional[int] = None):
+        self.fixed = fixed
+        self.counts: Dict[int, int] = {}
+        self.width = fixed or 0
+
+    def add(self, length: int):
+        if self.fixed is not None:
+            return
+        self.counts[length] = self.counts.get(length, 0) + 1
+        if length > self.width:
+            self.width = length
+
+    def remove(self, length: int):
+        if self.fixed is not None or length not in self.counts:
+            return
+        self.counts[length] -= 1
+        if self.counts[length] == 0:
+            del self.counts[length]
+            # Only shrink when the widest value is gone
+            if length == self.width:
+                self.width = max(self.counts) if self.counts else 0
+
+
+class Column:
+    def __init__(self, title: str, key: str, width: Optional[int] = None,
+                 fmt: Callable[[object], str] = str):
+        self.title = title
+        self.key = key
+        self.fmt = fmt
+        self.width = ColumnWidth(width)
+
+
+class Table:
+    """Column layout with cached widths, rendered to a stream in a single pass"""
+    def __init__(self, columns: List[Column], separator: str = " | ", pad_last: bool = True):
+        self.columns = columns
+        self.separator = separator
+        # Whether row cells of the last column are padded to its width; the header always is
+        self.pad_last = pad_last
+
+    def cells(self, row: dict) -> List[str]:
+        return [column.fmt(row[column.key]) for column in self.columns]
+
+    def add_row(self, row: dict):
+        for column, cell in zip(self.columns, self.cells(row)):
+            column.width.add(len(cell))
+
+    def remove_row(self, row: dict):
+        for column, cell in zip(self.columns, self.cells(row)):
+            column.width.remove(len(cell))
+
+    def header(self) -> str:
+        return self.separator.join(column.title.ljust(column.width.width) for column in self.columns)
+
+    def format_row(self, row: dict) -> str:
+        cells = [column.fmt(row[column.key]).ljust(column.width.width) for column in self.columns[:-1]]
+        last = self.columns[-1]
+        cell = last.fmt(row[last.key])
+        cells.append(cell.ljust(last.width.width) if self.pad_last else cell)
+        return self.separator.join(cells)
+
+    def render(self, rows: Iterable[dict], stream=None, page: int = 0,
+               page_size: Optional[int] = None, flush_every: int = 500):
+        """Write the header and one page of rows, flushing the buffer every flush_every rows"""
+        stream = stream or sys.stdout
+        if page_size is not None:
+            rows = islice(rows, page * page_size, (page + 1) * page_size)
+
+        header = self.header()
+        buffer = [header, "\n", "-" * len(header), "\n"]
+        pending = 0
+        for row in rows:
+            buffer.append(self.format_row(row))
+            buffer.append("\n")
+            pending += 1
+            if pending >= flush_every:
+                stream.write("".join(buffer))
+                buffer.clear()
+                pending = 0
+        if buffer:
+            stream.write("".join(buffer))
+        stream.flush()
+
+
+def product_table() -> Table:
+    return Table([
+        Column("Index", "index", 5),
+        Column("Name", "name"),
+        Column("Brand", "brand"),
+        Column("Price", "price", 8, lambda price: f"${price:.2f}"),
+        Column("Quantity", "quantity", 8),
+    ])
+
+
+def receipt_table() -> Table:
+    # Receipt rows have always ended right after the price
+    return Table([
+        Column("Item", "name"),
+        Column("Brand", "brand"),
+        Column("Quantity", "quantity", 8),
+        Column("Price", "price", 10, lambda price: f"${price:.2f}"),
+    ], pad_last=False)
+
+
+class ProductTableCache:
+    """Keep one product table per category, growing its widths as products are appended"""
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.lists: Dict[str, List[dict]] = {}
+        self.seen: Dict[str, int] = {}
+
+    def get(self, category: str, product_list: List[dict]) -> Table:
+        table = self.tables.get(category)
+        seen = self.seen.get(category, 0)
+        # A different list or a shrunken one means the cached widths can't be trusted
+        if table is None or self.lists.get(category) is not product_list or len(product_list) < seen:
+            table = product_table()
+            seen = 0
+        for product in islice(product_list, seen, None):
+            table.add_row(product)
+        self.tables[category] = table
+        self.lists[category] = product_list
+        self.seen[category] = len(product_list)
+        return table
+
+    def invalidate(self, category: Optional[str] = None):
+        if category is None:
+            self.tables.clear()
+            self.lists.clear()
+            self.seen.clear()
+        else:
+            self.tables.pop(category, None)
+            self.lists.pop(category, None)
+            self.seen.pop(category, None)
@@ -6,6 +6,14 @@ import os
 import random
 import time
 
+from instrumentation import timed
+from persistence import CsvStore
+from screen import screen
+from sessions import SessionManager
+from snapshot import load_ticket_sales, load_ticket_snapshot, save_ticket_snapshot, snapshot_is_current
+from ticket_analytics import SalesCounters, analyze_transactions
+
+@timed("tickets.hash_password")
 def hash_password(password):
     #Hash a password using SHA-256
     return hashlib.sha256(password.encode()).hexdigest()
@@ -31,20 +39,42 @@ class TicketRequest():
 
 
 class TicketSystem():
-    def __init__(self):
+    def __init__(self, store=None, snapshot=None, sessions=None, catalog=None):
+        #Writes are coalesced and flushed atomically by the store's background thread
+        self.store = store or CsvStore()
+        self.sessions = sessions or SessionManager()
+        #Other events live in an EventCatalog; event_id=None below means the built-in event
+        self.catalog = catalog
         self.users = dict()
         self.ticket_types = ["VIP", "Regular"]
         self.max_tickets = 10
-        self.ticket_availability = {
+        #Starting capacity of each ticket type, sold counts are derived from it
+        self.ticket_capacity = {
             "VIP": 30,
             "Regular": 200
         }
+        self.ticket_availability = dict(self.ticket_capacity)
         self.ticket_requests = {
             "VIP": deque(),
             "Regular": deque()
         }
-        self.load_users()
-        self.load_availability()
+        #Live sales counters; the snapshot saves them with the log size they cover,
+        #so startup only replays transactions appended after it
+        self.sales = SalesCounters()
+        if os.path.exists("transactions.csv"):
+            start = 0
+            checkpoint = load_ticket_sales(snapshot) if snapshot and os.path.exists(snapshot) else None
+            #A log shorter than the checkpoint was rewritten, so it is read from the start
+            if checkpoint and checkpoint[1] <= os.path.getsize("transactions.csv"):
+                self.sales, start = checkpoint
+            self.sales = analyze_transactions("transactions.csv", None, self.sales, start)[0]
+        #A snapshot older than the CSVs would lose every change saved since it was taken
+        if snapshot and snapshot_is_current(snapshot, ("users.csv", "availability.csv")):
+            #Users are decoded from the memory-mapped file on first access
+            self.users, self.ticket_availability = load_ticket_snapshot(snapshot)
+        else:
+            self.load_users()
+            self.load_availability()
 
     def add_user(self, name, password):
         if name in self.users:
@@ -56,13 +86,39 @@ class TicketSystem():
         return True
     
 
+    @timed("tickets.authenticate_user")
     def authenticate_user(self, name, password):
         if name in self.users and verify_password(self.users[name].password, password):
             return True
         else:
             return False
 
-    def request_ticket(self, user_id, requested_tickets):
+    def login(self, name, password):
+        #Returns a session token, or None if the credentials are wrong
+        if self.authenticate_user(name, password):
+            return self.sessions.create(name)
+        return None
+
+    def logout(self, token):
+        return self.sessions.end(token)
+
+    def current_user(self, token):
+        return self.sessions.get(token)
+
+    def availability(self, event_id=None):
+        if event_id is None:
+            return self.ticket_availability
+        return self.catalog.event(event_id).ticket_availability
+
+    def held_tickets(self, user_id, event_id=None):
+        if event_id is None:
+            return self.users[user_id].tickets
+        return self.catalog.event(event_id).holdings.get(user_id, {})
+
+    @timed("tickets.request_ticket")
+    def request_ticket(self, user_id, requested_tickets, event_id=None):
+        if event_id is not None:
+            return self.catalog.event(event_id).request_tickets(user_id, requested_tickets)
         ticket_count =  (self.users[user_id].tickets["VIP"] + self.users[user_id].tickets["Regular"])
         if ticket_count >= self.max_tickets:
             print(f"{user_id}, you have reached the max tickets limit.\n")
@@ -94,7 +150,12 @@ class TicketSystem():
 
         return True
 
-    def approve_ticket(self, user_id):
+    @timed("tickets.approve_ticket")
+    def approve_ticket(self, user_id, event_id=None):
+        if event_id is not None:
+            if self.catalog.event(event_id).approve_tickets():
+                print("Ticket request approved.")
+            return True
         # if user_id not in self.ticket_requests:
         #     return False
         # ticket_request = self.ticket_requests[user_id]
@@ -132,7 +193,10 @@ class TicketSystem():
             return True
         return True
 
-    def cancel_ticket(self, user_id, cancelled_tickets):
+    @timed("tickets.cancel_ticket")
+    def cancel_ticket(self, user_id, cancelled_tickets, event_id=None):
+        if event_id is not None:
+            return self.catalog.event(event_id).cancel_tickets(user_id, cancelled_tickets)
         while cancelled_tickets["VIP"] > 0:
             ticket_type = "VIP"
             if self.users[user_id].tickets[ticket_type] == 0:
@@ -158,11 +222,17 @@ class TicketSystem():
             self.save_availability()
             self.log_transaction(user_id, ticket_type, "cancelled")
 
-        self.log_transaction(user_id, ticket_type, "cancelled")
         self.save_users()
         return True
     
 
+    def save_snapshot(self, path="tickets.snap"):
+        #Pending CSV writes land first, so the snapshot is the newest file
+        self.store.flush()
+        log_size = os.path.getsize("transactions.csv") if os.path.exists("transactions.csv") else 0
+        save_ticket_snapshot(self, path, log_size)
+
+    @timed("tickets.load_users")
     def load_users(self):
         if os.path.exists("users.csv"):
             with open("users.csv", "r") as file:
@@ -182,6 +252,7 @@ class TicketSystem():
             print("No user data found. Starting fresh.")
     
 
+    @timed("tickets.load_availability")
     def load_availability(self):
         if os.path.exists("availability.csv"):
             with open("availability.csv", "r") as file:
@@ -195,58 +266,120 @@ class TicketSystem():
         else:
             print("No ticket availability data found. Starting fresh.")
     
+    @timed("tickets.log_transaction")
     def log_transaction(self, user_id, ticket_type, action):
-        with open("transactions.csv", "a") as file:
-            writer = csv.writer(file)
-            writer.writerow([user_id, ticket_type, action, datetime.now()])
+        self.sales.record(ticket_type, action)
+        self.store.append("transactions.csv", [user_id, ticket_type, action, datetime.now()])
 
         
+    @timed("tickets.save_users")
     def save_users(self):
-        with open("users.csv", "w") as file:
-            writer = csv.writer(file)
-            for user in self.users.values():
-                writer.writerow([user.name, user.password, "VIP:" + str(user.tickets["VIP"]), "Regular:" + str(user.tickets["Regular"])])
+        self.store.replace("users.csv", lambda: ([user.name, user.password, "VIP:" + str(user.tickets["VIP"]), "Regular:" + str(user.tickets["Regular"])]
+                                                 for user in self.users.values()))
 
+    @timed("tickets.save_availability")
     def save_availability(self):
-        with open("availability.csv", "w") as file:
-            writer = csv.writer(file)
-            for ticket_type, availability in self.ticket_availability.items():
-                writer.writerow([ticket_type, availability])
+        self.store.replace("availability.csv", lambda: ([ticket_type, availability]
+                                                        for ticket_type, availability in self.ticket_availability.items()))
     
+def choose_event(system):
+    #Returns None for the built-in event; catalog events are only loaded once chosen
+    if system.catalog is None or not system.catalog.events:
+        return None
+    print("\n🎪 **Events:**")
+    for info in system.catalog.events.values():
+        print(f"   - {info.event_id}: {info.name}")
+    while True:
+        event_id = input("🎪 Enter an event ID, or press Enter for the main event: ").strip()
+        if not event_id:
+            return None
+        if event_id in system.catalog.events:
+            return event_id
+        print("❌ Unknown event. Please try again.")
+
+
+def ask_ticket_counts(ticket_types, limit, action):
+    #One count per ticket type, each between 0 and limit(ticket_type); None if the user enters 'E'
+    counts = {}
+    for ticket_type in ticket_types:
+        while True:
+            answer = input(f"🎫 Enter number of {ticket_type} tickets to {action} or 'E' to exit this page: ").strip()
+            if answer == "E":
+                return None
+            try:
+                number = int(answer)
+            except ValueError:
+                print("❌ Invalid input. Please enter a number.")
+                continue
+            if number < 0:
+                print("❌ Number of tickets must be at least 0.")
+                continue
+            if number > limit(ticket_type):
+                print(f"❌ Only {limit(ticket_type)} {ticket_type} tickets available to {action}.")
+                continue
+            counts[ticket_type] = number
+            break
+    return counts
+
+
 def main():
-    system = TicketSystem()
-    cur_student = None
+    from event_catalog import EventCatalog
+
+    #The snapshot carries the sales counters, so startup only replays newer transactions
+    store = CsvStore()
+    system = TicketSystem(store, snapshot="tickets.snap", catalog=EventCatalog(store=store))
+    token = None
 
     while True:
+        cur_student = system.current_user(token)
+        if token and not cur_student:
+            token = None
+            print("\n⌛ Your session expired. Please log in again.")
 
-        if cur_student:
-            print("\n🎟️  **Ticket Management System** 🎟️\n")
-            print(f"👋 Welcome, {cur_student}!\n")
-            print(f"🔑 Logged in as: {system.users[cur_student].name}")
-            print("\n[ **Main Menu** ]")
-            print("1️⃣  View Available Tickets")
-            print("2️⃣  Request a Ticket")
-            print("3️⃣  Cancel a Ticket")
-            print("4️⃣  View My Tickets")
-            print("5️⃣  View Ticket History")
-            print("6️⃣  Log Out")
-            print("7️⃣  Exit")
-        else:
-            print("\n🎟️  **Ticket Management System** 🎟️\n")
-            print("1️⃣  Register New User")
-            print("2️⃣  Log In")
-            print("3️⃣  Exit")
+        # Each screen is built in memory and written to the terminal at once
+        with screen.frame(clear=False) as out:
+            if cur_student:
+                print("\n🎟️  **Ticket Management System** 🎟️\n", file=out)
+                print(f"👋 Welcome, {cur_student}!\n", file=out)
+                print(f"🔑 Logged in as: {system.users[cur_student].name}", file=out)
+                print("\n[ **Main Menu** ]", file=out)
+                print("1️⃣  View Available Tickets", file=out)
+                print("2️⃣  Request a Ticket", file=out)
+                print("3️⃣  Cancel a Ticket", file=out)
+                print("4️⃣  View My Tickets", file=out)
+                print("5️⃣  View Ticket History", file=out)
+                print("6️⃣  Log Out", file=out)
+                print("7️⃣  Exit", file=out)
+            else:
+                print("\n🎟️  **Ticket Management System** 🎟️\n", file=out)
+                print("1️⃣  Register New User", file=out)
+                print("2️⃣  Log In", file=out)
+                print("3️⃣  Exit", file=out)
 
         choice = input("\n👉 Enter your choice: ").strip()
+        # The session may have expired while the menu sat waiting for input
+        if token and system.current_user(token) is None:
+            continue
 
         if cur_student:
             if choice == "1":
-                print("\n📋 **Available Tickets:**")
-                for ticket_type, availability in system.ticket_availability.items():
-                    print(f"   - {ticket_type}: {availability} available ✅")
+                event_id = choose_event(system)
+                with screen.frame(clear=False) as out:
+                    print("\n📋 **Available Tickets:**", file=out)
+                    for ticket_type, availability in system.availability(event_id).items():
+                        print(f"   - {ticket_type}: {availability} available ✅", file=out)
                 input("\n🔄 Press any key to continue...")
                 time.sleep(1)
             elif choice == "2":
+                event_id = choose_event(system)
+                if event_id is not None:
+                    availability = system.availability(event_id)
+                    requested = ask_ticket_counts(availability, availability.get, "request")
+                    if requested is None or system.current_user(token) is None:
+                        continue
+                    system.request_ticket(cur_student, requested, event_id)
+                    system.approve_ticket(cur_student, event_id)
+                    continue
                 while True:
                     try:
                         req_vip = input(f"🎫 Enter number of VIP tickets or 'E' to exit this page: ").strip()
@@ -291,9 +424,23 @@ def main():
                         continue
                 if req_regular == "E" or req_vip == "E":
                     continue
+                if system.current_user(token) is None:
+                    continue
                 system.request_ticket(cur_student, {"VIP": vip, "Regular": regular})
                 system.approve_ticket(cur_student)
             elif choice == "3":
+                event_id = choose_event(system)
+                if event_id is not None:
+                    held = system.held_tickets(cur_student, event_id)
+                    if not held:
+                        print("❌ You have no tickets for this event.")
+                        continue
+                    cancelled = ask_ticket_counts(dict(held), lambda ticket_type: held.get(ticket_type, 0), "cancel")
+                    if cancelled is None or system.current_user(token) is None:
+                        continue
+                    if system.cancel_ticket(cur_student, cancelled, event_id):
+                        print("✅ Ticket cancellation request submitted.")
+                    continue
                 while True:
                     try:
                         req_vip = input(f"❌ Enter number of VIP tickets to cancel or 'E' to exit this page: ").strip()
@@ -332,28 +479,45 @@ def main():
                         continue
                 if req_regular == "E" or req_vip == "E":
                     continue
+                if system.current_user(token) is None:
+                    continue
                 print("🔄 Cancelling tickets...")
                 system.cancel_ticket(cur_student, {"VIP": vip, "Regular": regular})
                 print("✅ Ticket cancellation request submitted.")
             elif choice == "4":
-                print("\n🎟️ **My Tickets:**")
-                for ticket_type in system.users[cur_student].tickets:
-                    print(f"   - {ticket_type}: {system.users[cur_student].tickets[ticket_type]} 🎫")
+                with screen.frame(clear=False) as out:
+                    print("\n🎟️ **My Tickets:**", file=out)
+                    for ticket_type in system.users[cur_student].tickets:
+                        print(f"   - {ticket_type}: {system.users[cur_student].tickets[ticket_type]} 🎫", file=out)
+                    if system.catalog is not None:
+                        for event_id, tickets in system.catalog.tickets_for(cur_student).items():
+                            print(f"   {system.catalog.events[event_id].name}:", file=out)
+                            for ticket_type, count in tickets.items():
+                                print(f"   - {ticket_type}: {count} 🎫", file=out)
                 input("\n🔄 Press any key to continue...")
                 time.sleep(1)
             elif choice == "5":
-                print("\n📜 **Ticket Sales Summary:**")
-                print("   - VIP Tickets Sold: ", 30 - system.ticket_availability["VIP"])
-                print("   - Regular Tickets Sold: ", 200 - system.ticket_availability["Regular"])
-                print("   - Total Tickets Sold: ", (30 - system.ticket_availability["VIP"]) + (200 - system.ticket_availability["Regular"]))
-                print()
-                print("   - VIP Tickets Available: ", system.ticket_availability["VIP"])
-                print("   - Regular Tickets Available: ", 200 - system.ticket_availability["Regular"])
-                print("\n")
+                with screen.frame(clear=False) as out:
+                    print("\n📜 **Ticket Sales Summary:**", file=out)
+                    vip_sold = system.ticket_capacity["VIP"] - system.ticket_availability["VIP"]
+                    regular_sold = system.ticket_capacity["Regular"] - system.ticket_availability["Regular"]
+                    print("   - VIP Tickets Sold: ", vip_sold, file=out)
+                    print("   - Regular Tickets Sold: ", regular_sold, file=out)
+                    print("   - Total Tickets Sold: ", vip_sold + regular_sold, file=out)
+                    print(file=out)
+                    print("   - VIP Tickets Available: ", system.ticket_availability["VIP"], file=out)
+                    print("   - Regular Tickets Available: ", system.ticket_availability["Regular"], file=out)
+                    print(file=out)
+                    totals = system.sales.totals()
+                    print("   - Tickets Cancelled: ", totals["cancelled"], file=out)
+                    print("   - Requests Denied: ", totals["denied"], file=out)
+                    print("   - Max Limit Reached: ", totals["max_limit"], file=out)
+                    print("\n", file=out)
                 input("\n🔄 Press any key to continue...")
                 time.sleep(1)
             elif choice == "6":
-                cur_student = None
+                system.logout(token)
+                token = None
                 print("\n✅ Logged out successfully.")
                 time.sleep(1)
                 print("🔄 Returning to the main menu...\n")
@@ -384,7 +548,8 @@ def main():
                     time.sleep(1)
                     print("🔄 Exiting the Login page...\n")
                     continue
-                while name != "E" and password != "E" and not system.authenticate_user(name, password):
+                token = system.login(name, password)
+                while name != "E" and password != "E" and not token:
                     print("❌ Invalid credentials. Please try again or enter 'E' to exit the Login page.\n")
                     name = input("🔑 Enter your name: ").strip()
                     if name == "E":
@@ -396,15 +561,16 @@ def main():
                         time.sleep(1)
                         print("🔄 Exiting the Login page...\n")
                         break
-                if name == "E" or password == "E":
+                    token = system.login(name, password)
+                if not token:
                     continue
-                cur_student = name
                 print("\n✅ Logged in successfully.\n")
             elif choice == "3":
                 break
             else:
                 print("❌ Invalid choice. Please try again.")
     
+    system.save_snapshot()
     print("\n👋 Exiting the system. Goodbye!")
     time.sleep(1.3)
 
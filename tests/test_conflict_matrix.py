@@ -0,0 +1,40 @@
+import pytest
+
+from conflict_matrix import ConflictMatrix
+from course_times import Section, meetings_conflict, parse_block, parse_days, parse_meetings
+
+
+def sections(*times):
+    return [Section.from_time(f"C{i}", "01", time) for i, time in enumerate(times)]
+
+
+@pytest.mark.parametrize("first, second", [
+    ("MWF 10:00 AM - 10:50 AM", "MWF 10:50 AM - 11:40 AM"),
+    ("TTh 9:02 AM - 9:58 AM", "TTh 9:58 AM - 10:30 AM"),
+    ("MWF 10:00 AM - 10:52 AM", "TTh 10:51 AM - 11:40 AM"),
+])
+def test_adjacent_meetings_do_not_conflict(first, second):
+    matrix = ConflictMatrix(sections(first, second))
+    assert meetings_conflict(matrix.sections[0].meetings, matrix.sections[1].meetings) is None
+    assert not matrix.conflicts(matrix.schedule_mask(["C0-01"]), "C1-01")
+
+
+def test_one_minute_overlap_is_a_conflict():
+    matrix = ConflictMatrix(sections("MWF 10:00 AM - 10:52 AM", "W 10:51 AM - 11:40 AM"))
+    assert matrix.conflicts(matrix.schedule_mask(["C0-01"]), "C1-01")
+
+
+def test_tu_is_tuesday_and_bad_blocks_raise():
+    assert parse_days("TuTh") == (1, 3)
+    assert parse_meetings("Tu 1:00 PM - 2:15 PM")[0].days == (1,)
+    with pytest.raises(ValueError):
+        parse_block("Xy 1:00 PM - 2:00 PM")
+    # An unreadable or TBA time has no known meetings rather than breaking every caller
+    assert parse_meetings("MWF 10:00 AM - 10:50 AM; Xy 1:00 PM - 2:00 PM") == []
+    assert parse_meetings("TBA") == []
+
+
+def test_tba_course_is_in_the_matrix_and_conflicts_with_nothing():
+    matrix = ConflictMatrix(sections("TBA", "MWF 10:00 AM - 10:50 AM", "garbage"))
+    assert len(matrix) == 3
+    assert not matrix.conflicts(matrix.schedule_mask(["C1-01", "C2-01"]), "C0-01")
@@ -0,0 +1,50 @@
+import pytest
+
+import course_reg
+from persistence import CsvStore
+from sessions import SessionManager
+
+
+@pytest.fixture
+def run_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    now = [0.0]
+    monkeypatch.setattr(course_reg, "SessionManager",
+                        lambda: SessionManager(idle_ttl=60, sweep_interval=None, clock=lambda: now[0]))
+    # Synchronous writes, so nothing is flushed after the test has left tmp_path
+    monkeypatch.setattr(course_reg, "CsvStore", lambda: CsvStore(background=False))
+    systems = []
+    original = course_reg.EnrollmentSystem
+
+    def build():
+        systems.append(original())
+        return systems[-1]
+
+    monkeypatch.setattr(course_reg, "EnrollmentSystem", build)
+
+    def run(answers):
+        answers = iter(answers)
+
+        def ask(prompt=""):
+            now[0], answer = next(answers)
+            return answer
+
+        monkeypatch.setattr("builtins.input", ask)
+        course_reg.main()
+        return systems[-1]
+    return run
+
+
+LOGIN = [(0, "1"), (0, "s1"), (0, "Sam"), (0, "pw"), (0, ""), (0, "2"), (0, "s1"), (0, "pw"), (0, "")]
+
+
+def test_session_expiring_at_the_menu_cannot_enroll(run_main, capsys):
+    system = run_main(LOGIN + [(120, "2"), (120, ""), (120, "3")])
+    assert "Your session expired" in capsys.readouterr().out
+    assert not system.students["s1"].registered_courses
+
+
+def test_session_expiring_at_the_course_prompt_cannot_enroll(run_main, capsys):
+    system = run_main(LOGIN + [(0, "2"), (120, "CS101"), (120, ""), (120, "3")])
+    assert "Your session expired" in capsys.readouterr().out
+    assert not system.students["s1"].registered_courses
@@ -0,0 +1,52 @@
+import io
+import os
+import sys
+
+from course_reg import EnrollmentSystem
+from demand_simulator import REASONS, DemandConfig, run_trial
+from persistence import CsvStore
+
+
+def test_trial_runs_in_its_own_directory_without_chdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(os, "chdir", None)
+    result = run_trial(DemandConfig(students=40, persist=True), 0)
+    assert result["enrolled"] > 0
+    assert set(result["rejections"]) <= set(REASONS) | {"unknown"}
+    assert os.listdir(tmp_path) == []
+
+
+def test_system_reads_and_writes_its_directory(tmp_path, capsys):
+    store = CsvStore(background=False)
+    system = EnrollmentSystem(store, directory=str(tmp_path))
+    system.register_student("s1", "Sam", "pw")
+    assert system.enroll_student("s1", "CS101")
+    assert (tmp_path / "students.csv").exists()
+    reloaded = EnrollmentSystem(store, directory=str(tmp_path))
+    assert "CS101" in reloaded.students["s1"].registered_courses
+
+
+def test_trial_is_quiet_without_swapping_stdout(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    stdout = sys.stdout
+    seen = []
+    original = EnrollmentSystem.enroll_student
+
+    def enroll(self, student_id, course_id):
+        seen.append(sys.stdout is stdout)
+        return original(self, student_id, course_id)
+
+    monkeypatch.setattr(EnrollmentSystem, "enroll_student", enroll)
+    run_trial(DemandConfig(students=40), 0)
+    assert seen and all(seen)
+    assert capsys.readouterr().out == ""
+
+
+def test_messages_go_to_the_output_stream(tmp_path, capsys):
+    output = io.StringIO()
+    system = EnrollmentSystem(CsvStore(background=False), directory=str(tmp_path), output=output)
+    system.register_student("s1", "Sam", "pw")
+    assert not system.enroll_student("s1", "NOPE")
+    assert "Successfully registered student: Sam" in output.getvalue()
+    assert "Error: Course not found" in output.getvalue()
+    assert capsys.readouterr().out == ""
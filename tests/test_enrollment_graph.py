@@ -0,0 +1,74 @@
+import random
+
+from course_reg import EnrollmentSystem
+from enrollment_graph import COURSE, STUDENT, EnrollmentGraph, LinkSet
+from persistence import NullStore
+
+
+def check_against(graph, pairs, students, courses):
+    # Both directions must match the set of (student, course) pairs and stay sorted
+    for student in students:
+        row = graph.links[STUDENT][graph.ids[STUDENT].get(student)]
+        assert list(row) == sorted(row)
+        assert set(LinkSet(graph, STUDENT, graph.ids[STUDENT].get(student))) == {c for s, c in pairs if s == student}
+    for course in courses:
+        row = graph.links[COURSE][graph.ids[COURSE].get(course)]
+        assert list(row) == sorted(row)
+        assert set(LinkSet(graph, COURSE, graph.ids[COURSE].get(course))) == {s for s, c in pairs if c == course}
+    assert graph.enrollments() == len(pairs)
+
+
+def test_random_links_and_unlinks_match_a_set_of_pairs():
+    rng = random.Random(7)
+    students = [f"S{i}" for i in range(30)]
+    courses = [f"C{i}" for i in range(12)]
+    graph = EnrollmentGraph()
+    for name in courses:
+        graph.intern(COURSE, name)
+    for name in students:
+        graph.intern(STUDENT, name)
+    pairs = set()
+    for _ in range(3000):
+        student, course = rng.choice(students), rng.choice(courses)
+        s, c = graph.ids[STUDENT].get(student), graph.ids[COURSE].get(course)
+        if rng.random() < 0.6:
+            assert graph.link(s, c) == ((student, course) not in pairs)
+            pairs.add((student, course))
+        else:
+            assert graph.unlink(s, c) == ((student, course) in pairs)
+            pairs.discard((student, course))
+        assert graph.has(s, c) == ((student, course) in pairs)
+    check_against(graph, pairs, students, courses)
+
+
+def test_link_sets_update_both_sides():
+    graph = EnrollmentGraph()
+    alice = LinkSet(graph, STUDENT, graph.intern(STUDENT, "alice"))
+    cs101 = LinkSet(graph, COURSE, graph.intern(COURSE, "CS101"))
+    alice.add("CS101")
+    alice.add("CS101")
+    cs101.add("bob")
+    assert set(cs101) == {"alice", "bob"}
+    assert "CS101" in alice and "CS999" not in alice
+    cs101.discard("alice")
+    cs101.discard("nobody")
+    assert set(alice) == set()
+    assert len(cs101) == 1
+
+    graph.set_links(STUDENT, graph.ids[STUDENT].get("bob"), ["CS102", "CS101"])
+    graph.set_links(COURSE, graph.ids[COURSE].get("CS101"), ["alice"])
+    check_against(graph, {("alice", "CS101"), ("bob", "CS102")}, ["alice", "bob"], ["CS101", "CS102"])
+
+
+def test_student_and_course_views_agree_after_enroll_and_drop(tmp_path, capsys):
+    system = EnrollmentSystem(NullStore(), directory=str(tmp_path))
+    for student_id in ("s1", "s2"):
+        system.register_student(student_id, student_id, "pw")
+    assert system.enroll_student("s1", "CS101")
+    assert system.enroll_student("s2", "CS101")
+    assert system.enroll_student("s1", "CS103")
+    assert system.drop_course("s1", "CS101")
+    assert set(system.courses["CS101"].enrolled_students) == {"s2"}
+    assert set(system.courses["CS103"].enrolled_students) == {"s1"}
+    assert set(system.students["s1"].registered_courses) == {"CS103"}
+    assert system.graph.enrollments() == 2
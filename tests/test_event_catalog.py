@@ -0,0 +1,52 @@
+import pytest
+
+from event_catalog import EventCatalog
+from persistence import CsvStore
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    catalog = EventCatalog(store=CsvStore(background=False))
+    catalog.create_event("e1", "Show", {"VIP": 5, "Regular": 5})
+    inventory = catalog.event("e1")
+    inventory.request_tickets("a", {"VIP": 2})
+    inventory.approve_tickets()
+    return catalog
+
+
+def test_cancel_with_zero_count_of_unheld_type(catalog):
+    inventory = catalog.event("e1")
+    assert inventory.cancel_tickets("a", {"VIP": 1, "Regular": 0})
+    assert inventory.holdings["a"] == {"VIP": 1}
+    assert inventory.ticket_availability == {"VIP": 4, "Regular": 5}
+
+    reloaded = EventCatalog(store=catalog.store).event("e1")
+    assert reloaded.holdings["a"] == {"VIP": 1}
+    assert reloaded.ticket_availability == {"VIP": 4, "Regular": 5}
+
+
+def test_rejected_cancel_changes_nothing(catalog):
+    inventory = catalog.event("e1")
+    assert not inventory.cancel_tickets("a", {"VIP": 1, "Regular": 1})
+    assert not inventory.cancel_tickets("a", {"VIP": -1})
+    assert inventory.holdings["a"] == {"VIP": 2}
+    assert inventory.ticket_availability == {"VIP": 3, "Regular": 5}
+
+
+def test_ticket_system_routes_event_ids_to_the_catalog(catalog):
+    from temp_term_project import TicketSystem
+
+    system = TicketSystem(catalog.store, catalog=catalog)
+    system.add_user("b", "hash")
+    assert system.request_ticket("b", {"Regular": 3}, "e1")
+    assert system.approve_ticket("b", "e1")
+    assert system.availability("e1") == {"VIP": 3, "Regular": 2}
+    assert system.held_tickets("b", "e1") == {"Regular": 3}
+    assert catalog.tickets_for("b") == {"e1": {"Regular": 3}}
+
+    assert system.cancel_ticket("b", {"Regular": 1}, "e1")
+    assert system.availability("e1")["Regular"] == 3
+    # The built-in event is untouched
+    assert system.availability() == {"VIP": 30, "Regular": 200}
+    assert system.held_tickets("b") == {"VIP": 0, "Regular": 0}
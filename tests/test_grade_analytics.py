@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from grade_analytics import grade_histogram, validate
+
+
+def test_whole_number_floats_are_accepted():
+    assert validate(np.array([0.0, 87.0, 100.0])).tolist() == [0, 87, 100]
+    assert grade_histogram([]).sum() == 0
+
+
+@pytest.mark.parametrize("grades", [[87.5], [float("nan")], [float("inf")], [True, False], ["90"]])
+def test_fractional_nan_and_non_numeric_grades_are_rejected(grades):
+    with pytest.raises(ValueError):
+        validate(grades)
@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from grade_ingest import ErrorLog, GradeError, ingest, iter_json_array, read_grades, run
+
+
+def write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_malformed_jsonl_lines_are_logged(tmp_path):
+    source = write_lines(tmp_path / "grades.jsonl", [
+        json.dumps({"name": "Ann", "grade": 91}),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"name": 5, "grade": 80}),
+        json.dumps({"name": "Bob", "grade": 89.9}),
+        json.dumps({"name": "Cy", "grade": True}),
+        json.dumps({"name": "Di", "grade": 70.0}),
+        json.dumps({"name": "Ed", "grade": "65"}),
+    ])
+    output = tmp_path / "out.jsonl"
+    count, errors = run(source, str(output), "jsonl")
+    names = [json.loads(line)["name"] for line in output.read_text().splitlines()]
+    assert names == ["Ann", "Di", "Ed"]
+    assert count == 3
+    assert errors.count == 5
+    assert errors.samples[0].startswith("line 2: invalid JSON")
+
+
+def test_strict_mode_stops_at_malformed_line(tmp_path):
+    source = write_lines(tmp_path / "grades.jsonl", ["{bad"])
+    with pytest.raises(GradeError):
+        list(ingest(read_grades(source, strict=True), strict=True))
+
+
+def test_json_array_is_not_read_as_jsonl(tmp_path):
+    source = tmp_path / "grades.json"
+    source.write_text(json.dumps([{"name": "Ann", "grade": 91}, {"name": "Bob", "grade": 75}], indent=2))
+    errors = ErrorLog()
+    chunks = list(ingest(read_grades(str(source), errors=errors), errors=errors))
+    assert [name for chunk in chunks for name, _, _ in chunk] == ["Ann", "Bob"]
+    assert errors.count == 0
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 16, 1 << 16])
+def test_json_array_is_decoded_across_read_boundaries(read_size):
+    records = [{"name": "Ann", "grade": 91}, -12.5e1, "a,]b", [1, [2]], None, {"name": "Bob", "grade": 100}]
+    text = json.dumps(records, indent=2)
+    assert list(iter_json_array(io.StringIO(text), read_size)) == records
+
+
+def test_json_array_is_streamed_not_loaded_whole(tmp_path, monkeypatch):
+    source = tmp_path / "grades.json"
+    source.write_text(json.dumps([{"name": "Ann", "grade": 91}]))
+
+    def whole_file(*args, **kwargs):
+        raise AssertionError("json.load reads the whole file")
+
+    monkeypatch.setattr(json, "load", whole_file)
+    assert list(read_grades(str(source))) == [(1, "Ann", 91)]
+
+
+def test_broken_json_array_keeps_earlier_records(tmp_path):
+    source = tmp_path / "grades.json"
+    source.write_text('[\n{"name": "Ann", "grade": 91},\n{"name": "Bob", "grade": 75}\n{"name": "Cy"}]')
+    errors = ErrorLog()
+    assert [name for _, name, _ in read_grades(str(source), errors=errors)] == ["Ann", "Bob"]
+    assert errors.samples == ["line 4: invalid JSON (Expecting ',' delimiter)"]
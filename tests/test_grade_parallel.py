@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+
+from grade_parallel import categorize_files, shard_histogram
+
+
+def test_bad_lines_in_a_shard_are_counted_not_fatal(tmp_path):
+    good = tmp_path / "a.csv"
+    good.write_text("name,grade\nAnn,95\nBob,72\n")
+    bad = tmp_path / "b.jsonl"
+    bad.write_text("\n".join([json.dumps({"name": "Cy", "grade": 85}), "{oops", json.dumps({"name": 3, "grade": 1})]) + "\n")
+
+    histogram, rows, invalid = shard_histogram(str(bad))
+    assert (rows, invalid) == (1, 2)
+    assert histogram[85] == 1 and histogram.sum() == 1
+
+    summary = categorize_files([str(good), str(bad)], workers=2)
+    assert summary["rows"] == 3
+    assert summary["invalid"] == 2
+
+
+def test_empty_chunks_are_fine(tmp_path):
+    source = tmp_path / "bad.csv"
+    source.write_text("Ann,x\nBob,200\n")
+    histogram, rows, invalid = shard_histogram(str(source), chunk_size=1)
+    assert (rows, invalid) == (0, 2)
+    assert not np.any(histogram)
@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+from grade_rank import GradeIndex, build_index, print_report
+
+
+def test_rank_percentile_and_top():
+    index = build_index(["Ann", "Bob", "Cy", "Di"], [90, 75, 90, 60])
+    assert [index.rank(i) for i in range(4)] == [1, 3, 1, 4]
+    assert index.percentile(3) == 0.0
+    assert index.percentile(0) == 50.0
+    assert index.grade_at_rank(1) == 90 and index.grade_at_rank(4) == 60
+    assert index.count_range(70, 95) == 3
+    assert index.top(3) == [("Ann", 90), ("Cy", 90), ("Bob", 75)]
+
+
+def test_updates_move_a_student_between_buckets():
+    index = build_index(["Ann", "Bob"], [80, 70])
+    index.set(1, 95, "Bob")
+    assert index.rank(1) == 1 and index.rank(0) == 2
+    assert index.count_range(70, 79) == 0
+    index.remove(0)
+    assert len(index) == 1 and index.top(5) == [("Bob", 95)]
+
+
+def test_duplicate_names_keep_their_own_rows():
+    index = build_index(["Ann", "Ann"], [95, 60])
+    out = io.StringIO()
+    print_report(index, out)
+    rows = out.getvalue().splitlines()[3:]
+    assert rows[0].split() == ["Ann", "95", "Excellent", "1/2"]
+    assert rows[1].split() == ["Ann", "60", "Needs", "Improvement", "2/2"]
+
+
+@pytest.mark.parametrize("grade", [85.5, "85", True, 101, -1])
+def test_invalid_grade_leaves_the_index_unchanged(grade):
+    index = build_index(["Ann"], [80])
+    with pytest.raises(ValueError):
+        index.set(0, grade)
+    assert index.grades == {0: 80} and index.count_range(0, 100) == 1
+    assert index.buckets[80] == {0: None}
@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+import instrumentation
+from instrumentation import BUCKETS, Histogram, registry, timed, timer
+from persistence import atomic_write
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    registry.reset()
+    monkeypatch.setattr(registry, "enabled", True)
+    yield registry
+    registry.reset()
+
+
+@timed("test.operation")
+def operation(fail=False):
+    if fail:
+        raise ValueError("boom")
+    return 42
+
+
+def test_disabled_hooks_record_nothing(monkeypatch):
+    registry.reset()
+    monkeypatch.setattr(registry, "enabled", False)
+    assert operation() == 42
+    with timer("test.block"):
+        pass
+    assert registry.snapshot()["counters"] == {}
+    assert registry.snapshot()["latency"] == {}
+
+
+def test_timed_counts_calls_and_latency_even_when_the_call_raises(metrics):
+    operation()
+    with pytest.raises(ValueError):
+        operation(fail=True)
+    with timer("test.block"):
+        pass
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"test.operation.calls": 2, "test.block.calls": 1}
+    assert snapshot["latency"]["test.operation"]["count"] == 2
+    assert sum(snapshot["latency"]["test.operation"]["buckets"].values()) == 2
+
+
+def test_histogram_buckets_are_upper_bounds():
+    histogram = Histogram()
+    histogram.observe(BUCKETS[0])
+    histogram.observe(BUCKETS[0] * 2)
+    histogram.observe(BUCKETS[-1] * 2)
+    assert histogram.counts[0] == 1
+    assert histogram.counts[1] == 1
+    assert histogram.counts[-1] == 1
+    assert histogram.count == 3
+
+
+def test_atomic_write_counts_bytes_and_fsyncs(metrics, tmp_path):
+    path = tmp_path / "courses.csv"
+    atomic_write(str(path), [["CS101", "Intro"]])
+    counters = metrics.snapshot()["counters"]
+    assert counters["courses.csv.bytes_written"] == len(path.read_bytes())
+    assert counters["courses.csv.fsyncs"] == 1
+    assert counters["persistence.atomic_write.calls"] == 1
+
+
+def test_reads_are_not_counted_as_writes(metrics, tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text("s1\n")
+    with instrumentation.open_file(str(path)) as file:
+        file.read()
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_prometheus_buckets_are_cumulative(metrics):
+    metrics.observe("op", BUCKETS[0])
+    metrics.observe("op", BUCKETS[-1] * 2)
+    metrics.increment("op.calls", 2)
+    text = metrics.prometheus_text()
+    assert "op_calls_total 2" in text
+    assert f'operation_seconds_bucket{{operation="op",le="{BUCKETS[0]}"}} 1' in text
+    assert f'operation_seconds_bucket{{operation="op",le="{BUCKETS[-1]}"}} 1' in text
+    assert 'operation_seconds_bucket{operation="op",le="+Inf"} 2' in text
+    assert 'operation_seconds_count{operation="op"} 2' in text
+
+
+def test_enrollment_operations_are_counted(metrics, tmp_path):
+    from course_reg import EnrollmentSystem
+    from persistence import NullStore
+
+    system = EnrollmentSystem(NullStore(), directory=str(tmp_path), output=io.StringIO())
+    system.register_student("s1", "Sam", "pw")
+    system.enroll_student("s1", "CS101")
+    system.enroll_student("s1", "NOPE")
+    counters = metrics.snapshot()["counters"]
+    assert counters["enrollment.register_student.calls"] == 1
+    assert counters["enrollment.enroll_student.calls"] == 2
+    assert counters["enrollment.save_students.calls"] >= 2
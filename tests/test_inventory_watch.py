@@ -0,0 +1,77 @@
+import threading
+
+from inventory_watch import SECONDS_PER_DAY, InventoryWatcher, ReplenishmentScheduler
+
+
+def inventory(quantity=100):
+    return {"groceries": [{"index": 0, "name": "Apple", "brand": "Fresh Farms", "price": 1.99,
+                           "quantity": quantity}]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_event_fires_once_below_the_threshold():
+    events = []
+    # One-day window: selling 10 a day leaves 100 units with 10 days of cover
+    watcher = InventoryWatcher(inventory(110), threshold_days=3, target_days=14, window=SECONDS_PER_DAY,
+                               on_event=events.append, clock=Clock())
+    sku = ("groceries", 0)
+    assert watcher.sell(sku, 10)
+    assert events == []
+    assert watcher.sell(sku, 75)  # 25 left, 85 sold a day: well under 3 days of cover
+    assert len(events) == 1
+    assert events[0].order_quantity == 85 * 14 - 25
+    assert watcher.sell(sku, 5)
+    assert len(events) == 1  # already pending
+    assert watcher.most_at_risk(1)[0][0] == sku
+
+
+def test_sell_refuses_more_than_is_left():
+    watcher = InventoryWatcher(inventory(3), clock=Clock())
+    assert not watcher.sell(("groceries", 0), 4)
+    assert watcher.product(("groceries", 0))["quantity"] == 3
+
+
+def test_flush_restocks_a_whole_batch_at_once():
+    stock = {"groceries": inventory(20)["groceries"] + [dict(inventory(20)["groceries"][0], index=1)]}
+    watcher = InventoryWatcher(stock, window=SECONDS_PER_DAY, clock=Clock())
+    orders = []
+    scheduler = ReplenishmentScheduler(watcher, supplier=orders.append)
+    watcher.sell(("groceries", 0), 15)
+    watcher.sell(("groceries", 1), 18)
+    batch = scheduler.flush()
+    assert len(orders) == 1 and orders[0] == batch and len(batch) == 2
+    for event in batch:
+        assert watcher.product(event.sku)["quantity"] == event.quantity + event.order_quantity
+    assert watcher.pending == {}
+    assert scheduler.flush() == []
+
+
+def test_concurrent_sales_and_restocks_lose_no_updates():
+    watcher = InventoryWatcher(inventory(1000), threshold_days=0)
+    sku = ("groceries", 0)
+    sold = []
+
+    def sell():
+        count = 0
+        for _ in range(2000):
+            if watcher.sell(sku, 1):
+                count += 1
+        sold.append(count)
+
+    def restock():
+        for _ in range(2000):
+            watcher.restock(sku, 1)
+
+    threads = [threading.Thread(target=sell) for _ in range(3)] + [threading.Thread(target=restock)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert watcher.product(sku)["quantity"] == 1000 + 2000 - sum(sold)
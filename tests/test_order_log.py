@@ -0,0 +1,34 @@
+import pytest
+
+from order_log import OrderLog, read_orders
+
+
+def test_record_after_close_is_rejected(tmp_path):
+    path = tmp_path / "orders.jsonl"
+    log = OrderLog(str(path), flush_interval=0.01)
+    log.record({"order_id": "a"})
+    log.close()
+    with pytest.raises(RuntimeError):
+        log.record({"order_id": "b"})
+    assert [order["order_id"] for order in read_orders(str(path))] == ["a"]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_record_fails_when_the_writer_has_died(tmp_path):
+    log = OrderLog(str(tmp_path / "missing" / "orders.jsonl"), put_timeout=0.1)
+    log.writer.join()
+    with pytest.raises(RuntimeError):
+        log.record({"order_id": "a"})
+    log.close()
+
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_close_returns_when_the_writer_dies_with_a_full_queue(tmp_path):
+    log = OrderLog(str(tmp_path / "orders.jsonl"), max_pending=1, put_timeout=0.05)
+    # An order that cannot be serialized kills the writer thread
+    log.record({"order_id": object()})
+    log.writer.join(5)
+    log.pending.put_nowait({"order_id": "stuck"})
+    log.close()
+    assert not log.writer.is_alive()
@@ -0,0 +1,102 @@
+import csv
+import os
+import stat
+
+import pytest
+
+import persistence
+from persistence import CsvStore
+
+
+def read_rows(path):
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+def test_replaces_coalesce_into_one_write_of_the_latest_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "users.csv")
+    writes = []
+    original = persistence.atomic_write
+
+    def counted(target, rows):
+        writes.append(target)
+        original(target, rows)
+
+    monkeypatch.setattr(persistence, "atomic_write", counted)
+    table = {"alice": 1}
+    calls = []
+
+    def rows():
+        calls.append(1)
+        return ([name, count] for name, count in table.items())
+
+    store = CsvStore(interval=60)
+    for count in range(2, 5):
+        table["alice"] = count
+        store.replace(path, rows)
+    # close() is what atexit runs; it flushes whatever the flusher has not written yet
+    store.close()
+    assert writes == [path]
+    assert len(calls) == 1
+    assert read_rows(path) == [["alice", "4"]]
+
+
+def test_appends_after_a_replace_follow_its_rows(tmp_path):
+    path = str(tmp_path / "log.csv")
+    store = CsvStore(interval=60)
+    store.append(path, ["old"])
+    store.replace(path, lambda: [["base"]])
+    store.append(path, ["new"])
+    store.close()
+    assert read_rows(path) == [["base"], ["new"]]
+
+
+def test_crash_before_rename_keeps_the_original_and_requeues(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "courses.csv"
+    path.write_text("original\n")
+    store = CsvStore(background=False)
+
+    def crash(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(persistence.os, "replace", crash)
+    store.replace(str(path), lambda: [["updated"]])
+    assert path.read_text() == "original\n"
+    assert os.listdir(tmp_path) == ["courses.csv"]
+    assert "disk full" in capsys.readouterr().out
+
+    monkeypatch.undo()
+    store.flush()
+    assert read_rows(path) == [["updated"]]
+
+
+def test_any_flush_error_is_logged_and_requeued(tmp_path, capsys):
+    path = str(tmp_path / "students.csv")
+    store = CsvStore(background=False)
+    failures = [ValueError("bad row")]
+
+    def rows():
+        if failures:
+            raise failures.pop()
+        return [["S1"]]
+
+    store.replace(path, rows)
+    assert "bad row" in capsys.readouterr().out
+    assert path in store.pending
+    store.flush()
+    assert read_rows(path) == [["S1"]]
+    assert not store.pending
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_rewrite_keeps_the_file_mode(tmp_path):
+    path = tmp_path / "availability.csv"
+    path.write_text("VIP,1\n")
+    os.chmod(path, 0o644)
+    store = CsvStore(background=False)
+    store.replace(str(path), lambda: [["VIP", 2]])
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+    fresh = tmp_path / "holdings.csv"
+    store.replace(str(fresh), lambda: [["alice"]])
+    assert stat.S_IMODE(os.stat(fresh).st_mode) == 0o666 & ~persistence.UMASK
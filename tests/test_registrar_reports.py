@@ -0,0 +1,32 @@
+from registrar_reports import report_from_csv
+
+
+def test_short_and_blank_rows_are_skipped_and_counted(tmp_path):
+    courses = tmp_path / "courses.csv"
+    students = tmp_path / "students.csv"
+    courses.write_text('CS101,Intro,Dr. Smith,30,MWF 10:00 AM - 10:50 AM,\n'
+                       '\n'
+                       'CS102,Broken\n'
+                       'CS103,Algorithms,Dr. Lee,lots,,\n')
+    students.write_text('S1,Ann,x,CS101\n'
+                        '\n'
+                        'S2,Bob\n')
+    report = report_from_csv(str(students), str(courses))
+    summary = report.summary()
+    assert summary["students"] == 1
+    assert summary["enrollments"] == 1
+    assert list(report.courses) == ["CS101"]
+    assert summary["skipped_rows"] == {str(courses): 2, str(students): 1}
+
+
+def test_tba_and_unreadable_times_are_bucketed_as_tba(tmp_path):
+    courses = tmp_path / "courses.csv"
+    students = tmp_path / "students.csv"
+    courses.write_text('CS101,Intro,Dr. Smith,30,TBA,\n'
+                       'CS102,Lab,Dr. Lee,20,sometime,\n'
+                       'CS103,Algorithms,Dr. Lee,25,,\n'
+                       'CS104,Systems,Dr. Wu,10,MWF 10:00 AM - 10:50 AM,\n')
+    students.write_text('S1,Ann,x,"CS101,CS104"\n')
+    demand = report_from_csv(str(students), str(courses)).time_slot_demand()
+    assert demand["TBA"] == {"courses": 3, "students": 1, "seats": 75}
+    assert demand["MWF 10:00 AM - 10:50 AM"]["students"] == 1
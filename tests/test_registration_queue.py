@@ -0,0 +1,69 @@
+import pytest
+
+from course_reg import EnrollmentSystem
+from persistence import NullStore
+from registration_queue import AdmissionController
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    return EnrollmentSystem(NullStore())
+
+
+def test_heap_stays_bounded_under_arrive_leave_churn(system):
+    clock = Clock()
+    # No admission tokens, so every student stays in the queue until they leave
+    controller = AdmissionController(system, rate=0.0, burst=0, max_queue=2, clock=clock)
+    for i in range(10000):
+        assert controller.arrive(f"s{i}")
+        controller.leave(f"s{i}")
+    assert len(controller.waiting) == 0
+    assert len(controller.queue) <= 16
+
+
+def test_idle_active_session_releases_its_slot(system):
+    clock = Clock()
+    controller = AdmissionController(system, rate=100.0, burst=10, max_active=1,
+                                     idle_timeout=60.0, clock=clock)
+    controller.arrive("a")
+    controller.arrive("c")
+    assert controller.poll("a") == "admitted"
+    assert controller.poll("c") == "waiting"
+    clock.now = 1e9
+    assert controller.poll("c") == "admitted"
+    assert controller.poll("a") == "not queued"
+    assert controller.metrics()["expired"] == 1
+
+
+def test_position_breaks_ties_in_arrival_order(system):
+    clock = Clock()
+    controller = AdmissionController(system, rate=0.0, burst=0, tickets={"a": 5.0, "b": 5.0}, clock=clock)
+    controller.arrive("b")
+    controller.arrive("a")
+    assert controller.position("b") == 1
+    assert controller.position("a") == 2
+
+
+def test_student_without_a_ticket_queues_after_ticketed_students(system):
+    clock = Clock()
+    controller = AdmissionController(system, rate=100.0, burst=10, tickets={"senior": 5.0, "junior": 10.0},
+                                     clock=clock)
+    clock.now = 6.0
+    controller.arrive("stranger")
+    controller.arrive("junior")
+    # The senior's window is open, but the stranger may not jump ahead of the junior
+    assert controller.poll("stranger") == "waiting"
+    assert controller.position("junior") == 1
+    assert controller.position("stranger") == 2
+    clock.now = 10.0
+    assert controller.poll("junior") == "admitted"
+    assert controller.poll("stranger") == "admitted"
@@ -0,0 +1,54 @@
+import pytest
+
+from event_catalog import EventCatalog
+from persistence import CsvStore
+from resale_exchange import ResaleExchange
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    catalog = EventCatalog(store=CsvStore(background=False))
+    catalog.create_event("e1", "Show", {"VIP": 5, "Regular": 5})
+    inventory = catalog.event("e1")
+    inventory.request_tickets("seller", {"VIP": 2})
+    inventory.approve_tickets()
+    return catalog
+
+
+def test_lookups_do_not_create_empty_holdings(catalog):
+    exchange = ResaleExchange.for_catalog(catalog)
+    assert exchange.list_tickets("nobody", "VIP", 1, 50.0, "e1") is None
+    assert exchange.place_bid("buyer", "VIP", 1, 40.0, "e1") is not None
+    assert set(catalog.event("e1").holdings) == {"seller"}
+
+
+def test_matched_bid_gives_the_buyer_a_holding(catalog):
+    exchange = ResaleExchange.for_catalog(catalog)
+    exchange.list_tickets("seller", "VIP", 1, 50.0, "e1")
+    exchange.place_bid("buyer", "VIP", 1, 60.0, "e1")
+    exchange.flush()
+    assert catalog.event("e1").holdings == {"seller": {"VIP": 1}, "buyer": {"VIP": 1}}
+    assert catalog.tickets_for("buyer") == {"e1": {"VIP": 1}}
+
+
+@pytest.mark.parametrize("price", [0.0, -5.0, float("nan"), float("inf")])
+def test_non_positive_prices_are_rejected(catalog, price):
+    exchange = ResaleExchange.for_catalog(catalog)
+    assert exchange.list_tickets("seller", "VIP", 1, price, "e1") is None
+    assert exchange.place_bid("buyer", "VIP", 1, price, "e1") is None
+    assert not exchange.orders
+
+
+@pytest.mark.parametrize("ticket_type, quantity", [("Balcony", 1), ("VIP", 1.5), ("VIP", 0), ("VIP", True)])
+def test_bids_need_a_known_ticket_type_and_a_whole_quantity(catalog, ticket_type, quantity):
+    exchange = ResaleExchange.for_catalog(catalog)
+    assert exchange.place_bid("buyer", ticket_type, quantity, 40.0, "e1") is None
+    assert exchange.list_tickets("seller", ticket_type, quantity, 40.0, "e1") is None
+    assert not exchange.orders
+    assert not exchange.bidding
+
+
+def test_bid_for_unknown_event_is_rejected(catalog):
+    exchange = ResaleExchange.for_catalog(catalog)
+    assert exchange.place_bid("buyer", "VIP", 1, 40.0, "nope") is None
@@ -0,0 +1,41 @@
+import pytest
+
+from course_reg import EnrollmentSystem
+from persistence import NullStore
+from schedule_builder import ScheduleBuilder
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    return EnrollmentSystem(NullStore())
+
+
+def test_all_zero_priorities_still_build_a_schedule(system):
+    schedule = ScheduleBuilder(system).build(None, {"CS101": 0, "CS102": 0, "CS103": 0, "CS105": 0})
+    # CS101 and CS102 overlap, so at most three of the four fit
+    assert len(schedule.course_ids) == 3
+    assert "CS103" in schedule.course_ids and "CS105" in schedule.course_ids
+
+
+def test_zero_priority_courses_fill_out_a_schedule(system):
+    schedule = ScheduleBuilder(system).build(None, {"CS101": 5, "CS103": 0, "CS105": 0})
+    assert sorted(schedule.course_ids) == ["CS101", "CS103", "CS105"]
+    assert schedule.priority == 5
+
+
+def test_registered_course_conflicts_are_skipped(system):
+    system.register_student("s1", "Sam", "pw")
+    system.enroll_student("s1", "CS101")
+    schedule = ScheduleBuilder(system).build("s1", {"CS104": 3, "CS103": 1})
+    assert schedule.course_ids == ["CS103"]
+    assert schedule.skipped["CS104"] == "time conflict with a registered course"
+
+
+def test_tba_course_does_not_break_enroll_or_build(system):
+    system.courses["CS101"].time = "TBA"
+    system.register_student("a", "Ann", "pw")
+    assert system.enroll_student("a", "CS101")
+    assert system.enroll_student("a", "CS104")
+    schedule = ScheduleBuilder(system).build("a", {"CS103": 1})
+    assert schedule.course_ids == ["CS103"]
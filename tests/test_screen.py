@@ -0,0 +1,26 @@
+import io
+import sys
+
+from screen import CLEAR, Screen
+
+
+def test_frame_writes_once_and_leaves_stdout_alone(capsys):
+    stream = io.StringIO()
+    screen = Screen(stream)
+    with screen.frame() as out:
+        assert sys.stdout is not out
+        print("menu", file=out)
+        print("from elsewhere")
+        print("options", file=out)
+    assert stream.getvalue() == CLEAR + "menu\noptions\n"
+    assert capsys.readouterr().out == "from elsewhere\n"
+    assert screen.stats()["writes"] == 1
+
+
+def test_empty_frame_writes_nothing():
+    stream = io.StringIO()
+    screen = Screen(stream)
+    with screen.frame(clear=False):
+        pass
+    assert stream.getvalue() == ""
+    assert screen.stats()["frames"] == 0
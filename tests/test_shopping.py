@@ -0,0 +1,51 @@
+import copy
+import io
+
+from assignment2 import products, run_session
+from inventory_watch import InventoryWatcher
+from order_log import OrderAggregator
+
+
+class ListLog:
+    def __init__(self):
+        self.orders = []
+
+    def record(self, order):
+        self.orders.append(order)
+
+
+def test_buying_an_item_twice_logs_one_consistent_line(capsys):
+    inventory = copy.deepcopy(products)
+    log = ListLog()
+    order = run_session(["groceries", "0", "2", "yes", "groceries", "0", "3", "no"], inventory, log)
+    assert inventory["groceries"][0]["quantity"] == 5
+    (item,) = order["items"]
+    assert item["quantity"] == 5
+    assert item["subtotal"] == order["total_before_tax"] == 9.95
+    assert item["total"] == order["total_after_tax"]
+    summary = OrderAggregator().consume(log.orders).summary()
+    assert summary["overall"]["units"] == 5
+    assert summary["overall"]["revenue"] == 9.95
+
+
+def test_checkout_deducts_through_the_watcher(capsys):
+    inventory = copy.deepcopy(products)
+    watcher = InventoryWatcher(inventory)
+    run_session(["groceries", "0", "4", "no"], inventory, ListLog(), watcher)
+    assert inventory["groceries"][0]["quantity"] == 6
+    assert watcher.windows[("groceries", 0)].units == 4
+
+
+def test_product_tables_and_receipt_go_to_the_injected_stream(capsys):
+    inventory = copy.deepcopy(products)
+    stream = io.StringIO()
+    run_session(["clothes", "1", "2", "no"], inventory, ListLog(), stream=stream)
+    shown = stream.getvalue()
+    assert "----------- CLOTHES ----------" in shown
+    assert "Index | Name" in shown
+    assert "Walmart Receipt" in shown
+    assert "Jeans" in shown and "Levi's" in shown
+    assert "Thank you for shopping with Walmart!" in shown
+    terminal = capsys.readouterr().out
+    assert "Walmart Receipt" not in terminal
+    assert "Index | Name" not in terminal
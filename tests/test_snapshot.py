@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from course_reg import EnrollmentSystem
+from persistence import CsvStore
+from snapshot import SnapshotError
+from temp_term_project import TicketSystem
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    return CsvStore(background=False)
+
+
+def test_stale_enrollment_snapshot_is_ignored(store):
+    system = EnrollmentSystem(store)
+    system.register_student("b", "B", "pw")
+    system.save_snapshot()
+    system.enroll_student("b", "CS103")
+
+    restarted = EnrollmentSystem(store, snapshot="enrollment.snap")
+    assert set(restarted.students["b"].registered_courses) == {"CS103"}
+
+
+def test_current_enrollment_snapshot_is_used(store):
+    system = EnrollmentSystem(store)
+    system.register_student("b", "B", "pw")
+    system.enroll_student("b", "CS103")
+    system.save_snapshot()
+
+    restarted = EnrollmentSystem(store, snapshot="enrollment.snap")
+    assert type(restarted.students).__name__ == "LazyRecords"
+    assert set(restarted.students["b"].registered_courses) == {"CS103"}
+
+
+def test_stale_ticket_snapshot_is_ignored(store):
+    system = TicketSystem(store)
+    system.add_user("a", "hash")
+    system.save_snapshot()
+    system.request_ticket("a", {"VIP": 2, "Regular": 0})
+    system.approve_ticket("a")
+
+    restarted = TicketSystem(store, snapshot="tickets.snap")
+    assert restarted.users["a"].tickets["VIP"] == 2
+
+
+def test_negative_value_is_rejected_and_temp_file_removed(store):
+    system = EnrollmentSystem(store)
+    system.courses["CS101"].max_students = -1
+    with pytest.raises(SnapshotError):
+        system.save_snapshot()
+    assert not [name for name in os.listdir(".") if name.endswith(".tmp")]
+
+
+def test_write_snapshot_removes_temp_file_on_error(store, monkeypatch):
+    import snapshot
+
+    def fail(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshot.os, "replace", fail)
+    with pytest.raises(OSError):
+        snapshot.write_snapshot("x.snap", snapshot.KIND_TICKETS, {"strings": b"abc"})
+    assert os.listdir(".") == []
+
+
+def test_ticket_snapshot_saves_sales_and_startup_replays_only_newer_rows(store, monkeypatch):
+    import temp_term_project
+    from ticket_analytics import analyze_transactions
+
+    system = TicketSystem(store)
+    system.add_user("a", "hash")
+    system.request_ticket("a", {"VIP": 2, "Regular": 1})
+    system.approve_ticket("a")
+    system.save_snapshot()
+    saved_size = os.path.getsize("transactions.csv")
+    system.cancel_ticket("a", {"VIP": 1, "Regular": 0})
+    store.flush()
+
+    starts = []
+    original = temp_term_project.analyze_transactions
+
+    def replay(path, bucket_seconds, counters=None, start=0):
+        starts.append(start)
+        return original(path, bucket_seconds, counters, start)
+
+    monkeypatch.setattr(temp_term_project, "analyze_transactions", replay)
+    restarted = TicketSystem(store, snapshot="tickets.snap")
+    assert starts == [saved_size]
+    assert restarted.sales.counts == analyze_transactions("transactions.csv", None)[0].counts
+    assert restarted.sales.net_sold("VIP") == 1
+
+
+def test_rewritten_log_is_replayed_from_the_start(store):
+    system = TicketSystem(store)
+    system.add_user("a", "hash")
+    system.request_ticket("a", {"VIP": 3, "Regular": 0})
+    system.approve_ticket("a")
+    system.save_snapshot()
+    with open("transactions.csv", "w") as file:
+        file.write("a,VIP,approved,2024-01-01T00:00:00\n")
+
+    restarted = TicketSystem(store, snapshot="tickets.snap")
+    assert restarted.sales.get("VIP", "sold") == 1
@@ -0,0 +1,28 @@
+import io
+
+from table_render import product_table, receipt_table
+
+
+def render(table, rows):
+    for row in rows:
+        table.add_row(row)
+    stream = io.StringIO()
+    table.render(rows, stream)
+    return stream.getvalue().splitlines()
+
+
+def test_receipt_rows_match_the_old_layout():
+    rows = [{"name": "Milk", "brand": "Horizon", "quantity": 2, "price": 7.5},
+            {"name": "Eggs", "brand": "Vital", "quantity": 1, "price": 12.25}]
+    header, rule, *lines = render(receipt_table(), rows)
+    assert header == "Item | Brand   | Quantity | Price     "
+    assert rule == "-" * len(header)
+    assert lines == ["Milk | Horizon | 2        | $7.50",
+                     "Eggs | Vital   | 1        | $12.25"]
+
+
+def test_product_rows_keep_padding_on_every_column():
+    rows = [{"index": 0, "name": "Milk", "brand": "Horizon", "price": 3.75, "quantity": 12}]
+    header, _, line = render(product_table(), rows)
+    assert line == "0     | Milk | Horizon | $3.75    | 12      "
+    assert len(line) == len(header)
@@ -0,0 +1,18 @@
+import pytest
+
+from ticket_analytics import VelocitySeries, analyze_transactions
+
+
+def test_rows_with_extra_columns_are_counted(tmp_path):
+    path = tmp_path / "transactions.csv"
+    path.write_text("bob,VIP,approved,2026-10-19T10:00:00,web\n"
+                    "amy,Regular,approved,2026-10-19T10:30:00\n"
+                    "short,row\n")
+    counters, velocity = analyze_transactions(str(path), 3600)
+    assert counters.totals()["sold"] == 2
+    assert len(velocity.series()) == 1
+
+
+def test_non_positive_bucket_is_rejected():
+    with pytest.raises(ValueError):
+        VelocitySeries(-60)
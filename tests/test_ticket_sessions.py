@@ -0,0 +1,26 @@
+import temp_term_project
+from persistence import CsvStore
+from sessions import SessionManager
+
+
+def test_session_expiring_at_the_menu_blocks_the_next_action(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    now = [0.0]
+    monkeypatch.setattr(temp_term_project, "SessionManager",
+                        lambda: SessionManager(idle_ttl=60, sweep_interval=None, clock=lambda: now[0]))
+    # Synchronous writes, so nothing is flushed after the test has left tmp_path
+    monkeypatch.setattr(temp_term_project, "CsvStore", lambda: CsvStore(background=False))
+    monkeypatch.setattr(temp_term_project.time, "sleep", lambda seconds: None)
+    # Register, log in, then leave the main menu open past the idle timeout before choosing 2
+    answers = iter([(0, "1"), (0, "bob"), (0, "pw"), (0, "2"), (0, "bob"), (0, "pw"), (120, "2"), (120, "3")])
+
+    def ask(prompt=""):
+        now[0], answer = next(answers)
+        return answer
+
+    monkeypatch.setattr("builtins.input", ask)
+    temp_term_project.main()
+    out = capsys.readouterr().out
+    assert "Logged in successfully" in out
+    assert "Your session expired" in out
+    assert "Enter number of VIP tickets" not in out
@@ -0,0 +1,105 @@
+import argparse
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+# transactions.csv actions mapped to counter names
+ACTIONS = {"approved": "sold", "cancelled": "cancelled", "denied": "denied", "Max limit reached": "max_limit"}
+COUNTERS = ("sold", "cancelled", "denied", "max_limit")
+
+
+class SalesCounters:
+    """Per ticket type counts of sold, cancelled, denied and max-limit events, O(1) per transaction"""
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, ticket_type: str, action: str, amount: int = 1):
+        counter = ACTIONS.get(action)
+        if counter is None:
+            return
+        counts = self.counts.get(ticket_type)
+        if counts is None:
+            counts = self.counts[ticket_type] = dict.fromkeys(COUNTERS, 0)
+        counts[counter] += amount
+
+    def get(self, ticket_type: str, counter: str) -> int:
+        return self.counts.get(ticket_type, {}).get(counter, 0)
+
+    def net_sold(self, ticket_type: str) -> int:
+        return self.get(ticket_type, "sold") - self.get(ticket_type, "cancelled")
+
+    def totals(self) -> Dict[str, int]:
+        return {counter: sum(counts[counter] for counts in self.counts.values()) for counter in COUNTERS}
+
+    def to_dict(self) -> dict:
+        return {"by_type": {ticket_type: dict(counts) for ticket_type, counts in self.counts.items()},
+                "totals": self.totals()}
+
+
+class VelocitySeries:
+    """Sold and cancelled tickets per time bucket; memory grows with buckets, not transactions"""
+    def __init__(self, bucket_seconds: int = 3600):
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+        self.buckets: Dict[int, Dict[str, Dict[str, int]]] = {}
+
+    def record(self, when: datetime, ticket_type: str, action: str):
+        counter = ACTIONS.get(action)
+        if counter not in ("sold", "cancelled"):
+            return
+        bucket = int(when.timestamp()) // self.bucket_seconds * self.bucket_seconds
+        by_type = self.buckets.setdefault(bucket, {})
+        counts = by_type.setdefault(ticket_type, {"sold": 0, "cancelled": 0})
+        counts[counter] += 1
+
+    def series(self) -> list:
+        return [{"start": datetime.fromtimestamp(bucket).isoformat(timespec="seconds"), "by_type": by_type}
+                for bucket, by_type in sorted(self.buckets.items())]
+
+
+def read_transactions(path: str = "transactions.csv", start: int = 0) -> Iterable[list]:
+    """Rows from byte offset start on; start must be a line boundary, e.g. an earlier file size"""
+    with open(path, "r", newline="") as file:
+        file.seek(start)
+        for row in csv.reader(file):
+            if len(row) >= 4:
+                yield row
+
+
+def analyze_transactions(path: str = "transactions.csv", bucket_seconds: Optional[int] = 3600,
+                         counters: Optional[SalesCounters] = None, start: int = 0):
+    """Rebuild the counters, and optionally a velocity series, in one pass over the log
+
+    Pass counters saved at byte offset start to replay only the rows appended since.
+    """
+    if counters is None:
+        counters = SalesCounters()
+    velocity = VelocitySeries(bucket_seconds) if bucket_seconds else None
+    for row in read_transactions(path, start):
+        # Rows may carry extra trailing columns
+        user_id, ticket_type, action, timestamp = row[:4]
+        counters.record(ticket_type, action)
+        if velocity is not None:
+            try:
+                when = datetime.fromisoformat(timestamp)
+            except ValueError:
+                continue
+            velocity.record(when, ticket_type, action)
+    return counters, velocity
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize transactions.csv")
+    parser.add_argument("path", nargs="?", default="transactions.csv")
+    parser.add_argument("--bucket", type=int, default=3600, help="velocity bucket size in seconds")
+    args = parser.parse_args()
+    if args.bucket <= 0:
+        parser.error("--bucket must be a positive number of seconds")
+    counters, velocity = analyze_transactions(args.path, args.bucket)
+    print(json.dumps({"counters": counters.to_dict(), "velocity": velocity.series()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()